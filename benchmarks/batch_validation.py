@@ -0,0 +1,76 @@
+"""
+Inline versus process pool validation of a bulk import.
+
+Validates the same `UserCreate` records as models in the calling thread, as plain dicts in the
+calling thread, and as plain dicts across the validation process pool (`schemas.validate_batch`
+with `as_dicts`). Reports the wall time and the CPU time of the calling process, which is what
+the GIL of the application pays, best of --repeat runs.
+
+    python -m benchmarks.batch_validation [--records 100000] [--processes 4] [--repeat 3]
+"""
+
+import argparse
+import os
+import time
+
+from reactions.core import pools, settings
+from reactions.domains.users import schemas
+
+
+def records(count: int) -> list:
+    return [
+        {
+            "username": f"user_{index}",
+            "role": ("admin", "internal", "external")[index % 3],
+            "reactions": {"heart": index % 50, "plus_one": index % 7, "eyes": index % 3},
+            "last_reaction_at": "2026-01-01T00:00:00Z",
+        }
+        for index in range(count)
+    ]
+
+
+def best(func, repeat: int) -> tuple:
+    timings = []
+
+    for _ in range(repeat):
+        wall, cpu = time.perf_counter(), time.process_time()
+        func()
+        timings.append((time.perf_counter() - wall, time.process_time() - cpu))
+
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=100_000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = records(args.records)
+    settings.VALIDATION_PROCESSES = max(args.processes, 2)
+    settings.VALIDATION_PARALLEL_THRESHOLD = 1
+    settings.VALIDATION_CHUNK_SIZE = -(-args.records // settings.VALIDATION_PROCESSES)
+    modes = [
+        ("models, inline", lambda: schemas.validate_batch(schemas.UserCreate, data)),
+        ("dicts, inline", lambda: schemas._validate_dicts(schemas.UserCreate, data)),
+        (
+            f"dicts, {settings.VALIDATION_PROCESSES} processes",
+            lambda: schemas.validate_batch(schemas.UserCreate, data, as_dicts=True),
+        ),
+    ]
+
+    # Starts the workers, so that their start-up is not timed.
+    schemas.validate_batch(schemas.UserCreate, data[: settings.VALIDATION_PROCESSES], as_dicts=True)
+    print(f"{args.records} records, {os.cpu_count()} cores, best of {args.repeat}")
+
+    try:
+        for name, validate in modes:
+            wall, cpu = best(validate, args.repeat)
+            print(f"{name:>20}: wall {wall * 1000:8.1f} ms | caller CPU {cpu * 1000:8.1f} ms")
+    finally:
+        pools.shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Per-object loop versus vectorized reaction analytics.
+
+Builds the same random users twice: as `UserRetrieve` objects processed with the plain Python
+loop the analytics scripts used to run, and as chunks of counter arrays folded by
+`analytics.ReactionStatistics`. Both compute totals, role breakdown, ratios and percentiles.
+
+    python -m benchmarks.reaction_analytics [--users 200000] [--chunk-size 100000]
+"""
+
+import argparse
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from reactions.domains.users import analytics, schemas
+
+
+def loop_summary(users) -> dict:
+    totals = defaultdict(int)
+    per_role = defaultdict(lambda: defaultdict(int))
+    values = defaultdict(list)
+
+    for user in users:
+        reactions = user.reactions.model_dump()
+        values["total"].append(sum(reactions.values()))
+
+        for kind, count in reactions.items():
+            totals[kind] += count
+            per_role[user.role][kind] += count
+            values[kind].append(count)
+
+    percentiles = {}
+
+    for kind, counts in values.items():
+        counts.sort()
+        percentiles[kind] = [counts[int(q / 100 * (len(counts) - 1))] for q in (50, 90, 99)]
+
+    ratio = totals["plus_one"] / max(totals["plus_one"] + totals["minus_one"], 1)
+    return {"totals": totals, "per_role": per_role, "percentiles": percentiles, "ratio": ratio}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    generator = np.random.default_rng(0)
+    counters = generator.poisson(3, size=(args.users, len(analytics.REACTION_KINDS)))
+    roles = generator.integers(0, len(analytics.ROLES), size=args.users)
+
+    users = [
+        schemas.UserRetrieve(
+            id=str(index),
+            username=f"user_{index}",
+            role=analytics.ROLES[roles[index]],
+            reactions=dict(zip(analytics.REACTION_KINDS, map(int, counters[index]))),
+            created_at="",
+            updated_at="",
+        )
+        for index in range(args.users)
+    ]
+
+    started = time.perf_counter()
+    loop_summary(users)
+    loop_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    analytics.summarize(
+        (roles[start : start + args.chunk_size], counters[start : start + args.chunk_size])
+        for start in range(0, args.users, args.chunk_size)
+    )
+    vectorized_elapsed = time.perf_counter() - started
+
+    print(f"      loop: {loop_elapsed:8.3f} s")
+    print(f"vectorized: {vectorized_elapsed:8.3f} s ({loop_elapsed / vectorized_elapsed:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
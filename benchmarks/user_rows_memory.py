@@ -0,0 +1,95 @@
+"""
+Memory and time of listing users as ORM entities versus read-only rows.
+
+Loads the same users through `queries.fetch_users` (ORM entities in the identity map) and
+`queries.fetch_user_rows` (core select, plain rows) and reports the peak memory allocated while
+materializing them, measured with tracemalloc.
+
+    python -m benchmarks.user_rows_memory [--database-url URL] [--rows 100000]
+
+Without --database-url a temporary SQLite file is seeded with --rows users.
+"""
+
+import argparse
+import gc
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from reactions.apps.users import constants, models
+from reactions.core import database
+from reactions.domains.users import queries, schemas
+
+
+def seed(database_url: str, rows: int) -> None:
+    engine = create_engine(database_url)
+    database.Base.metadata.create_all(bind=engine)
+    now = datetime.now(timezone.utc)
+    reactions = schemas.Reactions(plus_one=3, heart=1).model_dump()
+
+    with engine.begin() as connection:
+        for start in range(0, rows, 10_000):
+            connection.execute(
+                insert(models.User),
+                [
+                    {
+                        "id": str(uuid.uuid4()),
+                        "username": f"user_{index}",
+                        "role": constants.Role.EXTERNAL,
+                        "reactions": reactions,
+                        "last_reaction_at": now,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for index in range(start, min(start + 10_000, rows))
+                ],
+            )
+
+    engine.dispose()
+
+
+def measure(engine, fetch) -> tuple:
+    with Session(engine) as db:
+        gc.collect()
+        tracemalloc.start()
+        started = time.perf_counter()
+        users = fetch(db=db)
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return len(users), peak, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url")
+    parser.add_argument("--rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    database_url = args.database_url
+
+    if database_url is None:
+        database_url = f"sqlite:///{tempfile.mkdtemp()}/rows.db"
+        seed(database_url, args.rows)
+
+    engine = create_engine(database_url)
+
+    for name, fetch in (
+        ("orm entities", queries.fetch_users),
+        ("rows", queries.fetch_user_rows),
+    ):
+        count, peak, elapsed = measure(engine, fetch)
+        print(
+            f"{name:>12}: {count} users | peak {peak / 2**20:8.1f} MiB "
+            f"({peak / max(count, 1) * 100_000 / 2**20:8.1f} MiB per 100k) | {elapsed:6.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Cold vs warm latency of the first requests served by a fresh worker.
+
+Every mode runs in its own interpreter so that no statement or connection is shared: the cold
+worker starts serving right away, the warm one waits until its warm-up is done. The same mix of
+reads and writes is then timed request by request.
+
+    python -m benchmarks.warmup_latency [--database-url URL] [--requests 200]
+
+Without --database-url a temporary SQLite file is used; pass a PostgreSQL URL to include the
+cost of opening connections.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def serve(requests: int) -> list:
+    from fastapi.testclient import TestClient
+
+    from reactions.interfaces import routes
+
+    app = routes.create_app()
+    latencies = []
+
+    with TestClient(app) as client:
+        while not app.state.ready:
+            time.sleep(0.01)
+
+        for index in range(requests):
+            username = f"bench_{os.getpid()}_{index}"
+            calls = [
+                lambda: client.post("/api/v1/users/", json={"username": username}),
+                lambda: client.get("/api/v1/users/", params={"username": username}),
+                lambda: client.put("/api/v1/users/", json={"username": username, "role": "admin"}),
+            ]
+
+            for call in calls:
+                started = time.perf_counter()
+                call()
+                latencies.append(time.perf_counter() - started)
+
+    return latencies
+
+
+def run(mode: str, database_url: str, requests: int) -> list:
+    env = dict(
+        os.environ,
+        DATABASE_URL=database_url,
+        WARMUP_ENABLED="true" if mode == "warm" else "false",
+        ADMISSION_ENABLED="false",
+    )
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.warmup_latency", "--serve", str(requests)],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+
+    return json.loads(output.splitlines()[-1])
+
+
+def report(mode: str, latencies: list) -> None:
+    milliseconds = [latency * 1000 for latency in latencies]
+    print(
+        f"{mode:>5}: first {milliseconds[0]:8.2f} ms | "
+        f"first 30 mean {statistics.mean(milliseconds[:30]):7.2f} ms | "
+        f"all mean {statistics.mean(milliseconds):7.2f} ms | "
+        f"p99 {statistics.quantiles(milliseconds, n=100)[98]:7.2f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--serve", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        print(json.dumps(serve(args.serve)))
+        return
+
+    database_url = args.database_url
+
+    if database_url is None:
+        database_url = f"sqlite:///{tempfile.mkdtemp()}/warmup.db"
+
+    from sqlalchemy import create_engine
+
+    from reactions.apps.users import models  # noqa: F401
+    from reactions.core import database
+
+    engine = create_engine(database_url)
+    database.Base.metadata.create_all(bind=engine)
+    engine.dispose()
+
+    for mode in ("cold", "warm"):
+        report(mode, run(mode, database_url, args.requests))
+
+
+if __name__ == "__main__":
+    main()
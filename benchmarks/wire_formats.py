@@ -0,0 +1,102 @@
+"""
+Size and CPU cost of the wire formats of the user listing.
+
+Builds a page of users as served by `GET /api/v1/users/` and compares the current
+`JSONResponse` encoding with the formats negotiated by `reactions.interfaces.negotiation`: the
+encoded size (raw and gzipped), the server-side encoding time and the client-side decoding time,
+best of --repeat runs.
+
+    python -m benchmarks.wire_formats [--users 10000] [--repeat 5]
+"""
+
+import argparse
+import gzip
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import msgpack
+from fastapi import responses
+
+from reactions.apps.users import constants, models
+from reactions.domains.users import schemas
+from reactions.interfaces import negotiation
+
+
+def page(users: int) -> dict:
+    generator = random.Random(0)
+    now = datetime.now(timezone.utc)
+    data = []
+
+    for index in range(users):
+        reactions = {
+            kind: generator.choice((0, 0, 1, generator.randint(2, 5000)))
+            for kind in schemas.Reactions.model_fields
+        }
+        data.append(
+            schemas.UserRetrieve(
+                id=str(uuid.uuid4()),
+                username=f"user_{index}",
+                role=generator.choice(list(constants.Role)),
+                reactions=reactions,
+                last_reaction_at=str(now - timedelta(minutes=index)),
+                created_at=str(now),
+                updated_at=str(now),
+                **models.reaction_scores(reactions),
+            ).model_dump(mode="json")
+        )
+
+    return {"code_transaction": "OK", "data": data, "next_after": None}
+
+
+def best(func, repeat: int) -> float:
+    timings = []
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    content = page(args.users)
+    formats = [
+        ("JSONResponse", lambda: responses.JSONResponse(content=content).body, json.loads),
+        *(
+            (
+                media_type,
+                lambda media_type=media_type: negotiation.render(
+                    content, media_type, schemas.UserRetrieve
+                ),
+                msgpack.unpackb if "msgpack" in media_type else json.loads,
+            )
+            for media_type in negotiation.MEDIA_TYPES
+        ),
+    ]
+    baseline = None
+
+    print(f"{args.users} users, best of {args.repeat}")
+
+    for name, encode, decode in formats:
+        body = encode()
+        baseline = baseline or len(body)
+        encoding = best(encode, args.repeat)
+        decoding = best(lambda: decode(body), args.repeat)
+        print(
+            f"{name:>42}: {len(body) / 2**10:9.1f} KiB ({len(body) / baseline:5.0%}) | "
+            f"gzip {len(gzip.compress(body, 6)) / 2**10:8.1f} KiB | "
+            f"encode {encoding * 1000:7.1f} ms | decode {decoding * 1000:7.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
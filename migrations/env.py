@@ -3,8 +3,9 @@ from logging.config import fileConfig
 from alembic import context
 from sqlalchemy import engine_from_config, pool
 
-from reactions.core import database
+from reactions.core import database, events, settings
 
+from reactions.apps.jobs import models as jobs_models
 from reactions.apps.users import models as users_models
 
 # this is the Alembic Config object, which provides
@@ -26,7 +27,13 @@ target_metadata = database.Base.metadata
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
-config.set_main_option("sqlalchemy.url", database.DATABASE_URL)
+# Every shard is migrated on its own, by pointing DATABASE_URL at it.
+if not settings.DATABASE_URL:
+    raise RuntimeError(
+        "The DATABASE_URL environment variable is not set; point it at the database to migrate."
+    )
+
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
 
 
 def run_migrations_offline() -> None:
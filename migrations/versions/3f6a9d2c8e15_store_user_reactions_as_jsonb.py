@@ -0,0 +1,72 @@
+"""store user reactions as jsonb
+
+Revision ID: 3f6a9d2c8e15
+Revises: 7b3e1f9c2a64
+Create Date: 2026-10-19 10:12:41.903577
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f6a9d2c8e15'
+down_revision: Union[str, None] = '7b3e1f9c2a64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXED_REACTIONS = ("plus_one", "minus_one", "heart", "confused")
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column(
+            'users',
+            'reactions',
+            type_=postgresql.JSONB(),
+            existing_type=sa.JSON(),
+            existing_nullable=False,
+            postgresql_using='reactions::jsonb',
+        )
+        op.create_index(
+            'ix_users_reactions',
+            'users',
+            ['reactions'],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={'reactions': 'jsonb_path_ops'},
+        )
+        for kind in INDEXED_REACTIONS:
+            op.create_index(
+                f'ix_users_reactions_{kind}',
+                'users',
+                [sa.text(f"((reactions ->> '{kind}')::bigint)")],
+                unique=False,
+            )
+    else:
+        for kind in INDEXED_REACTIONS:
+            op.create_index(
+                f'ix_users_reactions_{kind}',
+                'users',
+                [sa.text(f"CAST(json_extract(reactions, '$.{kind}') AS BIGINT)")],
+                unique=False,
+            )
+
+
+def downgrade() -> None:
+    for kind in INDEXED_REACTIONS:
+        op.drop_index(f'ix_users_reactions_{kind}', table_name='users')
+
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index('ix_users_reactions', table_name='users')
+        op.alter_column(
+            'users',
+            'reactions',
+            type_=sa.JSON(),
+            existing_type=postgresql.JSONB(),
+            existing_nullable=False,
+            postgresql_using='reactions::json',
+        )
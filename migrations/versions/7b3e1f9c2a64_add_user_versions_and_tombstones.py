@@ -0,0 +1,43 @@
+"""add user versions and tombstones
+
+Revision ID: 7b3e1f9c2a64
+Revises: d4acb0d25a90
+Create Date: 2026-10-19 09:40:12.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3e1f9c2a64'
+down_revision: Union[str, None] = 'd4acb0d25a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('version', sa.BigInteger(), nullable=True))
+    # Existing users are reported to the first synchronization as one change.
+    op.execute("UPDATE users SET version = 1")
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('version', existing_type=sa.BigInteger(), nullable=False)
+    op.create_index(op.f('ix_users_version'), 'users', ['version'], unique=False)
+
+    op.create_table('user_tombstones',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_user_tombstones_version'), 'user_tombstones', ['version'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_tombstones_version'), table_name='user_tombstones')
+    op.drop_table('user_tombstones')
+    op.drop_index(op.f('ix_users_version'), table_name='users')
+    op.drop_column('users', 'version')
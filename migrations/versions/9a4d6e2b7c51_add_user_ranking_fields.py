@@ -0,0 +1,81 @@
+"""add user ranking fields
+
+Revision ID: 9a4d6e2b7c51
+Revises: 5c8e2a7d1f30
+Create Date: 2026-10-19 16:05:12.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4d6e2b7c51'
+down_revision: Union[str, None] = '5c8e2a7d1f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Frozen copies of `constants.POSITIVE_REACTIONS` and `constants.NEGATIVE_REACTIONS`, and of
+# the reaction kinds of `schemas.Reactions`.
+REACTIONS = (
+    "plus_one", "minus_one", "laugh", "hooray", "confused", "heart", "rocket", "eyes",
+)
+POSITIVE_REACTIONS = ("plus_one", "laugh", "heart", "hooray", "rocket")
+NEGATIVE_REACTIONS = ("minus_one", "confused")
+RANKING_FIELDS = ("total_reactions", "sentiment_score")
+# Frozen copy of the expression indexes of 3f6a9d2c8e15, which a SQLite table rebuild drops.
+INDEXED_REACTIONS = ("plus_one", "minus_one", "heart", "confused")
+
+
+def _counter(dialect: str, kind: str) -> str:
+    if dialect == "postgresql":
+        return f"coalesce((reactions ->> '{kind}')::bigint, 0)"
+
+    return f"coalesce(json_extract(reactions, '$.{kind}'), 0)"
+
+
+def upgrade() -> None:
+    for field in RANKING_FIELDS:
+        op.add_column(
+            'users',
+            sa.Column(field, sa.BigInteger(), nullable=False, server_default='0'),
+        )
+
+    dialect = op.get_bind().dialect.name
+    total = " + ".join(_counter(dialect, kind) for kind in REACTIONS)
+    positive = " + ".join(_counter(dialect, kind) for kind in POSITIVE_REACTIONS)
+    negative = " + ".join(_counter(dialect, kind) for kind in NEGATIVE_REACTIONS)
+    op.execute(
+        f"UPDATE users SET total_reactions = {total}, "
+        f"sentiment_score = ({positive}) - ({negative})"
+    )
+
+    # Values are computed by the application on write; the default only served the backfill.
+    # SQLite would rebuild the table to drop it, so it keeps the harmless default there.
+    if dialect == "postgresql":
+        for field in RANKING_FIELDS:
+            op.alter_column('users', field, existing_type=sa.BigInteger(), server_default=None)
+
+    for field in RANKING_FIELDS:
+        op.create_index(f'ix_users_{field}', 'users', [field, 'username'], unique=False)
+
+
+def downgrade() -> None:
+    for field in RANKING_FIELDS:
+        op.drop_index(f'ix_users_{field}', table_name='users')
+
+    with op.batch_alter_table('users') as batch_op:
+        for field in RANKING_FIELDS:
+            batch_op.drop_column(field)
+
+    if op.get_bind().dialect.name != "postgresql":
+        # The rebuild of the table does not carry its expression indexes over.
+        for kind in INDEXED_REACTIONS:
+            op.create_index(
+                f'ix_users_reactions_{kind}',
+                'users',
+                [sa.text(f"CAST(json_extract(reactions, '$.{kind}') AS BIGINT)")],
+                unique=False,
+            )
@@ -0,0 +1,42 @@
+"""sort usernames by code point
+
+Revision ID: a8d2f6b4c917
+Revises: f7c3a9e1d2b4
+Create Date: 2026-10-19 21:47:09.518264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d2f6b4c917'
+down_revision: Union[str, None] = 'f7c3a9e1d2b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The keyset pagination of the listing compares usernames in SQL and merges shard pages in
+    # Python: both must sort by code point whatever the collation of the database.
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column(
+            'users',
+            'username',
+            type_=sa.String(collation='C'),
+            existing_type=sa.String(),
+            existing_nullable=False,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column(
+            'users',
+            'username',
+            type_=sa.String(collation='default'),
+            existing_type=sa.String(collation='C'),
+            existing_nullable=False,
+        )
@@ -0,0 +1,34 @@
+"""add archived username prefix index
+
+Revision ID: b5e9c3f7a1d8
+Revises: a8d2f6b4c917
+Create Date: 2026-10-20 09:14:52.306817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e9c3f7a1d8'
+down_revision: Union[str, None] = 'a8d2f6b4c917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Searches including the archived users match their prefix like those of `users`.
+    if op.get_bind().dialect.name == "postgresql":
+        op.create_index(
+            'ix_users_archive_username_prefix',
+            'users_archive',
+            [sa.text('lower(username) text_pattern_ops')],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index('ix_users_archive_username_prefix', table_name='users_archive')
@@ -0,0 +1,57 @@
+"""create users archive
+
+Revision ID: c2e7f4a1b983
+Revises: 9a4d6e2b7c51
+Create Date: 2026-10-19 18:21:37.550912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e7f4a1b983'
+down_revision: Union[str, None] = '9a4d6e2b7c51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The columns of `users`, whose role type already exists.
+    op.create_table('users_archive',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('username', sa.String(), nullable=False),
+    sa.Column(
+        'role',
+        sa.Enum('ADMIN', 'INTERNAL', 'EXTERNAL', name='user_role').with_variant(
+            postgresql.ENUM(name='user_role', create_type=False), 'postgresql'
+        ),
+        nullable=False,
+    ),
+    sa.Column('reactions', sa.JSON().with_variant(postgresql.JSONB(), 'postgresql'), nullable=False),
+    sa.Column('last_reaction_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('total_reactions', sa.BigInteger(), nullable=False),
+    sa.Column('sentiment_score', sa.BigInteger(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_archive_username'), 'users_archive', ['username'], unique=True)
+    op.create_index(op.f('ix_users_archive_version'), 'users_archive', ['version'], unique=False)
+
+
+def downgrade() -> None:
+    # Archived users go back to `users` so that none is lost.
+    columns = (
+        "id, username, role, reactions, last_reaction_at, created_at, updated_at, version, "
+        "total_reactions, sentiment_score"
+    )
+    op.execute(f"INSERT INTO users ({columns}) SELECT {columns} FROM users_archive")
+    op.drop_index(op.f('ix_users_archive_version'), table_name='users_archive')
+    op.drop_index(op.f('ix_users_archive_username'), table_name='users_archive')
+    op.drop_table('users_archive')
@@ -0,0 +1,34 @@
+"""add username prefix index
+
+Revision ID: e5b1d8c3a742
+Revises: c2e7f4a1b983
+Create Date: 2026-10-19 20:02:15.774309
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b1d8c3a742'
+down_revision: Union[str, None] = 'c2e7f4a1b983'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Only PostgreSQL needs it: the LIKE optimization of SQLite does not apply to lower().
+    if op.get_bind().dialect.name == "postgresql":
+        op.create_index(
+            'ix_users_username_prefix',
+            'users',
+            [sa.text('lower(username) text_pattern_ops')],
+            unique=False,
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.drop_index('ix_users_username_prefix', table_name='users')
@@ -0,0 +1,29 @@
+"""create change event sequence
+
+Revision ID: f7c3a9e1d2b4
+Revises: e5b1d8c3a742
+Create Date: 2026-10-19 21:14:52.306118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7c3a9e1d2b4'
+down_revision: Union[str, None] = 'e5b1d8c3a742'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Only the PostgreSQL broker numbers events from the database.
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(sa.schema.CreateSequence(sa.Sequence('change_events_id_seq')))
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(sa.schema.DropSequence(sa.Sequence('change_events_id_seq')))
@@ -0,0 +1,18 @@
+"""
+Constants and enums for background jobs.
+
+Defines the lifecycle statuses of a job.
+"""
+
+from enum import Enum
+
+
+class JobStatus(str, Enum):
+    """
+    Represents the statuses a job goes through.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
@@ -0,0 +1,127 @@
+"""
+SQLAlchemy models for the Jobs module.
+
+Defines the database structure of background jobs.
+"""
+
+import uuid
+from datetime import datetime, timezone
+
+from sqlalchemy import JSON, BigInteger, DateTime, Enum, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from reactions.apps.jobs import constants
+from reactions.core import database
+
+
+class Job(database.Base):
+    """
+    Represents a background job in the database.
+    Attributes:
+        id (str): Unique identifier for the job (UUID).
+        kind (str): Name of the handler running the job (e.g., "import_users").
+        status (constants.JobStatus): Where the job is in its lifecycle.
+        params (dict): Parameters of the job, validated by its handler on submission.
+        checkpoint (dict | None): Progress saved by the handler after every chunk; a job claimed
+            again after a crash resumes from it.
+        progress_done (int): Units of work done (records, rows...).
+        progress_total (int | None): Units of work expected, when known.
+        result (dict | None): Outcome of a succeeded job.
+        error (str | None): Reason of a failed job.
+        attempts (int): Number of times the job was claimed.
+        worker (str | None): Worker holding the job while it runs.
+        created_at (datetime): When the job was submitted.
+        started_at (datetime | None): When the job was first claimed.
+        heartbeat_at (datetime | None): Last sign of life of the worker running the job.
+        finished_at (datetime | None): When the job succeeded or failed.
+    """
+
+    __tablename__ = "jobs"
+
+    id: Mapped[str] = mapped_column(
+        String,
+        primary_key=True,
+        default=lambda: str(uuid.uuid4()),
+    )
+    kind: Mapped[str] = mapped_column(
+        String,
+        nullable=False,
+    )
+    status: Mapped[constants.JobStatus] = mapped_column(
+        Enum(constants.JobStatus, name="job_status"),
+        nullable=False,
+        default=constants.JobStatus.PENDING,
+    )
+    params: Mapped[dict] = mapped_column(
+        JSON,
+        nullable=False,
+    )
+    checkpoint: Mapped[dict] = mapped_column(
+        JSON,
+        nullable=True,
+    )
+    progress_done: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+    )
+    progress_total: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=True,
+    )
+    result: Mapped[dict] = mapped_column(
+        JSON,
+        nullable=True,
+    )
+    error: Mapped[str] = mapped_column(
+        String,
+        nullable=True,
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+    worker: Mapped[str] = mapped_column(
+        String,
+        nullable=True,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+    )
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=True,
+    )
+    heartbeat_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=True,
+    )
+    finished_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=True,
+    )
+
+    __table_args__ = (Index("ix_jobs_status_created_at", "status", "created_at"),)
+
+    @classmethod
+    def new(cls, kind: str, params: dict) -> "Job":
+        """
+        Creates a new pending Job instance ready to be added to the database.
+        Args:
+            kind (str): Name of the handler running the job.
+            params (dict): Validated parameters of the job.
+
+        Returns:
+            Job: A new pending Job instance.
+        """
+
+        return cls(
+            kind=kind,
+            status=constants.JobStatus.PENDING,
+            params=params,
+            progress_done=0,
+            attempts=0,
+            created_at=datetime.now(timezone.utc).replace(tzinfo=None),
+        )
@@ -15,3 +15,9 @@ class Role(str, Enum):
     ADMIN = "admin"
     INTERNAL = "internal"
     EXTERNAL = "external"
+
+
+# Reaction kinds counted positively and negatively by the sentiment score of a user; the other
+# kinds (eyes) only count towards the total.
+POSITIVE_REACTIONS = ("plus_one", "laugh", "heart", "hooray", "rocket")
+NEGATIVE_REACTIONS = ("minus_one", "confused")
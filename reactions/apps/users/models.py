@@ -6,12 +6,39 @@ Defines the database structure for user-related entities.
 
 import uuid
 from datetime import datetime, timezone
+from typing import Dict
 
-from sqlalchemy import JSON, DateTime, Enum, String
+from sqlalchemy import JSON, BigInteger, DateTime, Enum, Index, String, column, func, table
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Mapped, mapped_column
 
 from reactions.apps.users import constants
-from reactions.core import database
+from reactions.core import database, documents, versions
+
+# Users, their tombstones and archived users share one sequence of change versions.
+NEXT_VERSION = versions.next_version(
+    table("users", column("version")).c.version,
+    table("user_tombstones", column("version")).c.version,
+    table("users_archive", column("version")).c.version,
+)
+
+
+def reaction_scores(reactions: Dict[str, int]) -> Dict[str, int]:
+    """
+    Compute the ranking fields derived from reaction counters.
+
+    Args:
+        reactions (Dict[str, int]): Reaction counters by kind.
+
+    Returns:
+        Dict[str, int]: `total_reactions`, the sum of every counter, and `sentiment_score`, the
+            positive counters minus the negative ones (see `constants.POSITIVE_REACTIONS`).
+    """
+    return {
+        "total_reactions": sum(reactions.values()),
+        "sentiment_score": sum(reactions.get(kind, 0) for kind in constants.POSITIVE_REACTIONS)
+        - sum(reactions.get(kind, 0) for kind in constants.NEGATIVE_REACTIONS),
+    }
 
 
 class User(database.Base):
@@ -21,10 +48,14 @@ class User(database.Base):
         id (str): Unique identifier for the user (UUID).
         username (str): username (e.g., "valentinc94"). Must be unique.
         role (constants.Role): Classification of the user (e.g., EXTERNAL, INTERNAL, ADMIN).
-        reactions (list[dict] | dict): Aggregated reaction counts given by the user (stored as JSON).
+        reactions (list[dict] | dict): Aggregated reaction counts given by the user (stored as JSON,
+            JSONB on PostgreSQL).
         last_reaction_at (datetime | None): Timestamp of the user's most recent reaction.
         created_at (datetime): When the user record was first created in our DB.
         updated_at (datetime): When the user record was last updated.
+        version (int): Change version of the last write (see `reactions.core.versions`).
+        total_reactions (int): Sum of the reaction counters, maintained on write.
+        sentiment_score (int): Positive minus negative reaction counters, maintained on write.
     """
 
     __tablename__ = "users"
@@ -36,8 +67,10 @@ class User(database.Base):
         unique=True,
         nullable=False,
     )
+    # Sorted by code point on PostgreSQL too, the order in which shard pages are merged (see
+    # `queries.fetch_user_rows`); SQLite compares strings that way already.
     username: Mapped[str] = mapped_column(
-        String,
+        String().with_variant(String(collation="C"), "postgresql"),
         unique=True,
         index=True,
         nullable=False,
@@ -47,7 +80,7 @@ class User(database.Base):
         nullable=False,
     )
     reactions: Mapped[list] = mapped_column(
-        JSON,
+        JSON().with_variant(JSONB(), "postgresql"),
         nullable=False,
     )
     last_reaction_at: Mapped[datetime] = mapped_column(
@@ -61,6 +94,24 @@ class User(database.Base):
     updated_at: Mapped[datetime] = mapped_column(
         DateTime,
         nullable=False,
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+    version: Mapped[int] = mapped_column(
+        BigInteger,
+        index=True,
+        nullable=False,
+        default=NEXT_VERSION,
+        onupdate=NEXT_VERSION,
+    )
+    total_reactions: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+    )
+    sentiment_score: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
     )
 
     @classmethod
@@ -89,7 +140,166 @@ class User(database.Base):
             username=username,
             role=role,
             reactions=reactions,
+            **reaction_scores(reactions),
             last_reaction_at=last_reaction_at,
             created_at=datetime.now(timezone.utc),
             updated_at=datetime.now(timezone.utc),
         )
+
+    def set_reactions(self, reactions: dict) -> None:
+        """
+        Replaces the reaction counters and the ranking fields derived from them.
+        Args:
+            reactions (dict): New reaction counters by kind.
+        """
+
+        self.reactions = reactions
+
+        for field, value in reaction_scores(reactions).items():
+            setattr(self, field, value)
+
+
+# Reaction counters filtered on most often get an expression index; on PostgreSQL a GIN index
+# serves containment (equality) predicates on any counter.
+INDEXED_REACTIONS = ("plus_one", "minus_one", "heart", "confused")
+RANKING_FIELDS = ("total_reactions", "sentiment_score")
+
+for kind in INDEXED_REACTIONS:
+    Index(f"ix_users_reactions_{kind}", documents.json_integer(User.reactions, kind))
+
+# Ranking fields are sorted on with the username as tie-breaker (see `queries.fetch_user_rows`).
+for field in RANKING_FIELDS:
+    Index(f"ix_users_{field}", getattr(User, field), User.username)
+
+Index(
+    "ix_users_reactions",
+    User.reactions,
+    postgresql_using="gin",
+    postgresql_ops={"reactions": "jsonb_path_ops"},
+).ddl_if(dialect="postgresql")
+
+# Case-insensitive username prefix searches (`lower(username) LIKE 'abc%'`) need the pattern
+# operator class on PostgreSQL, unless the database collation is "C".
+Index(
+    "ix_users_username_prefix",
+    func.lower(User.username).label("username_lower"),
+    postgresql_ops={"username_lower": "text_pattern_ops"},
+).ddl_if(dialect="postgresql")
+
+
+class UserTombstone(database.Base):
+    """
+    Records the deletion of a user so that mirrors can apply it.
+    Attributes:
+        id (str): Identifier of the deleted user.
+        username (str): Username of the deleted user.
+        version (int): Change version of the deletion.
+        deleted_at (datetime): When the user was deleted.
+    """
+
+    __tablename__ = "user_tombstones"
+
+    id: Mapped[str] = mapped_column(
+        String,
+        primary_key=True,
+    )
+    username: Mapped[str] = mapped_column(
+        String,
+        nullable=False,
+    )
+    version: Mapped[int] = mapped_column(
+        BigInteger,
+        index=True,
+        nullable=False,
+        default=NEXT_VERSION,
+    )
+    deleted_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+    )
+
+    @classmethod
+    def of(cls, user: User) -> "UserTombstone":
+        """
+        Creates the tombstone of a user being deleted.
+        Args:
+            user (User): The user being deleted.
+
+        Returns:
+            UserTombstone: A new tombstone ready to be added to the database.
+        """
+
+        return cls(
+            id=user.id,
+            username=user.username,
+            deleted_at=datetime.now(timezone.utc),
+        )
+
+
+class ArchivedUser(database.Base):
+    """
+    A user moved out of the `users` table for inactivity (see `reactions.domains.users.archival`).
+
+    The columns are those of `User`, values kept as they were, so that a user restored on its
+    next write is copied back unchanged. The username (also by prefix) and the version are indexed.
+    Attributes:
+        archived_at (datetime): When the user was archived.
+    """
+
+    __tablename__ = "users_archive"
+
+    id: Mapped[str] = mapped_column(
+        String,
+        primary_key=True,
+    )
+    username: Mapped[str] = mapped_column(
+        String,
+        unique=True,
+        index=True,
+        nullable=False,
+    )
+    role: Mapped[constants.Role] = mapped_column(
+        Enum(constants.Role, name="user_role"),
+        nullable=False,
+    )
+    reactions: Mapped[list] = mapped_column(
+        JSON().with_variant(JSONB(), "postgresql"),
+        nullable=False,
+    )
+    last_reaction_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=True,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+    )
+    version: Mapped[int] = mapped_column(
+        BigInteger,
+        index=True,
+        nullable=False,
+    )
+    total_reactions: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+    )
+    sentiment_score: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+    )
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        nullable=False,
+    )
+
+
+# Prefix searches that include the archived users (see `queries.search_user_rows`).
+Index(
+    "ix_users_archive_username_prefix",
+    func.lower(ArchivedUser.username).label("username_lower"),
+    postgresql_ops={"username_lower": "text_pattern_ops"},
+).ddl_if(dialect="postgresql")
@@ -0,0 +1,54 @@
+"""
+Command-line archival of inactive users.
+
+Moves the users that neither reacted nor were written for ARCHIVE_INACTIVE_DAYS out of the users
+table (of every shard) into the archive, one batch per transaction:
+
+    python -m reactions.commands.archive_users --dry-run
+    python -m reactions.commands.archive_users --inactive-days 730 --batch-size 5000
+
+Archived users are restored on their next write. The same run is available as the
+"archive_users" background job, to be submitted on a schedule.
+"""
+
+import argparse
+from typing import List
+
+from reactions.core import database, settings
+from reactions.domains.users import archival
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Move inactive users to the archive.")
+    parser.add_argument("--inactive-days", type=int, default=settings.ARCHIVE_INACTIVE_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Only count the users to archive.")
+    parser.add_argument(
+        "--database-url", help="Defaults to the DATABASE_SHARD_URLS shards, else DATABASE_URL."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> archival.ArchiveReport:
+    args = parse_args(argv)
+    engine = database.open_database(args.database_url)
+
+    try:
+        report = archival.archive_users(
+            engine=engine,
+            inactive_days=args.inactive_days,
+            batch_size=args.batch_size,
+            dry_run=args.dry_run,
+        )
+    finally:
+        engine.dispose()
+
+    print(
+        f"archived={report.archived} elapsed={report.elapsed:.2f}s"
+        f"{' (dry run)' if args.dry_run else ''}"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    main()
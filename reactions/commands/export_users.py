@@ -0,0 +1,62 @@
+"""
+Command-line bulk export of users.
+
+Writes a snapshot of the users table and of its archive (only the active users with
+--active-only) of the database configured by DATABASE_URL (or of every DATABASE_SHARD_URLS
+shard), with the reaction counters flattened into columns:
+
+    python -m reactions.commands.export_users users.csv.gz --compression gzip
+    python -m reactions.commands.export_users users.parquet --format parquet --partitions 4
+
+With several partitions the id space is split into ranges exported in parallel, each over its
+own connection, into `<output>.part-NNN` files.
+"""
+
+import argparse
+from typing import List
+
+from reactions.core import database
+from reactions.domains.users import exports
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk export users to CSV or Parquet.")
+    parser.add_argument("path", help="Output file.")
+    parser.add_argument("--format", choices=exports.FORMATS, help="Defaults to the file extension.")
+    parser.add_argument("--compression", choices=exports.COMPRESSIONS, default=exports.NONE)
+    parser.add_argument("--partitions", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--active-only", action="store_true", help="Leave the archived users out.")
+    parser.add_argument(
+        "--database-url", help="Defaults to the DATABASE_SHARD_URLS shards, else DATABASE_URL."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> exports.ExportReport:
+    args = parse_args(argv)
+    file_format = args.format or (exports.PARQUET if ".parquet" in args.path else exports.CSV)
+    engine = database.open_database(args.database_url)
+
+    try:
+        report = exports.export_users(
+            engine=engine,
+            path=args.path,
+            file_format=file_format,
+            compression=args.compression,
+            partitions=args.partitions,
+            batch_size=args.batch_size,
+            include_archived=not args.active_only,
+        )
+    finally:
+        engine.dispose()
+
+    print(
+        f"rows={report.rows} files={len(report.paths)} "
+        f"elapsed={report.elapsed:.2f}s rows/sec={report.rows_per_second:,.0f}"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Command-line bulk import of users.
+
+Streams users from a CSV or NDJSON file into the database configured by DATABASE_URL (or into
+the DATABASE_SHARD_URLS shards):
+
+    python -m reactions.commands.import_users users.csv
+    python -m reactions.commands.import_users users.ndjson --format ndjson --on-conflict update \\
+        --rejects rejected.ndjson
+
+Rejected records are written to --rejects (one JSON object per line with the input line number
+and the validation errors) and counted in the final report.
+"""
+
+import argparse
+import dataclasses
+import json
+import sys
+from typing import List
+
+from reactions.core import database
+from reactions.domains.users import imports
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Bulk import users from CSV or NDJSON.")
+    parser.add_argument("path", help="Input file, or '-' for standard input.")
+    parser.add_argument("--format", choices=imports.FORMATS, help="Defaults to the file extension.")
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--on-conflict", choices=imports.ON_CONFLICT, default=imports.SKIP)
+    parser.add_argument("--rejects", help="File receiving the rejected records as NDJSON.")
+    parser.add_argument(
+        "--database-url", help="Defaults to the DATABASE_SHARD_URLS shards, else DATABASE_URL."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> imports.ImportReport:
+    args = parse_args(argv)
+    file_format = args.format or (imports.NDJSON if args.path.endswith(".ndjson") else imports.CSV)
+    engine = database.open_database(args.database_url)
+    stream = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+    rejects = open(args.rejects, "w", encoding="utf-8") if args.rejects else None
+
+    def on_reject(rejection: imports.Rejection) -> None:
+        if rejects is not None:
+            rejects.write(json.dumps(dataclasses.asdict(rejection), default=str) + "\n")
+
+    try:
+        report = imports.import_users(
+            engine=engine,
+            stream=stream,
+            file_format=file_format,
+            chunk_size=args.chunk_size,
+            on_conflict=args.on_conflict,
+            on_reject=on_reject,
+        )
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if rejects is not None:
+            rejects.close()
+        engine.dispose()
+
+    print(
+        f"read={report.read} inserted={report.inserted} updated={report.updated} "
+        f"skipped={report.skipped} rejected={report.rejected} "
+        f"elapsed={report.elapsed:.2f}s rows/sec={report.rows_per_second:,.0f}"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Command-line reaction analytics.
+
+Prints the reaction summary (distributions, percentiles, ratios and role breakdown) as JSON,
+computed from the database configured by DATABASE_URL or from a user export:
+
+    python -m reactions.commands.reaction_stats
+    python -m reactions.commands.reaction_stats --from-file users.parquet
+"""
+
+import argparse
+from typing import Iterator, List
+
+from sqlalchemy.engine import Engine
+
+from reactions.core import database, settings, sharding
+from reactions.domains.users import analytics, schemas
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Summarize user reactions.")
+    parser.add_argument("--from-file", help="User export (CSV, CSV.gz or Parquet) to analyse.")
+    parser.add_argument("--chunk-size", type=int, default=settings.ANALYTICS_CHUNK_SIZE)
+    parser.add_argument(
+        "--database-url", help="Defaults to the DATABASE_SHARD_URLS shards, else DATABASE_URL."
+    )
+    return parser.parse_args(argv)
+
+
+def _chunks(engine: Engine | sharding.Shards, chunk_size: int) -> Iterator[analytics.Chunk]:
+    for shard in sharding.engines_of(engine):
+        with shard.connect() as connection:
+            yield from analytics.chunks_from_database(connection, chunk_size)
+
+
+def main(argv: List[str] | None = None) -> schemas.ReactionSummary:
+    args = parse_args(argv)
+
+    if args.from_file:
+        summary = analytics.summarize(analytics.chunks_from_file(args.from_file, args.chunk_size))
+    else:
+        engine = database.open_database(args.database_url)
+
+        try:
+            summary = analytics.summarize(_chunks(engine, args.chunk_size))
+        finally:
+            engine.dispose()
+
+    print(summary.model_dump_json(indent=2))
+    return summary
+
+
+if __name__ == "__main__":
+    main()
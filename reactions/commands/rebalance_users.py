@@ -0,0 +1,58 @@
+"""
+Command-line rebalancing of sharded users.
+
+Run after appending a shard to DATABASE_SHARD_URLS (with the schema created on it) to move
+every user and tombstone to the shard its username now hashes to:
+
+    python -m reactions.commands.rebalance_users --dry-run
+    python -m reactions.commands.rebalance_users --batch-size 5000
+
+The run is idempotent: an interrupted rebalancing is completed by running it again.
+"""
+
+import argparse
+from typing import List
+
+from reactions.core import database, settings
+from reactions.domains.users import rebalancing
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Move sharded users to their shard.")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--dry-run", action="store_true", help="Only count the rows to move.")
+    parser.add_argument(
+        "--shard-url",
+        action="append",
+        dest="shard_urls",
+        help="Shard URL, in ring order (repeatable). Defaults to DATABASE_SHARD_URLS.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> rebalancing.RebalanceReport:
+    args = parse_args(argv)
+    urls = args.shard_urls or settings.DATABASE_SHARD_URLS
+
+    if not urls:
+        raise SystemExit("No shards configured: set DATABASE_SHARD_URLS or pass --shard-url.")
+
+    shards = database.create_shards(urls)
+
+    try:
+        report = rebalancing.rebalance_users(
+            shards=shards, batch_size=args.batch_size, dry_run=args.dry_run
+        )
+    finally:
+        shards.dispose()
+
+    moved = " ".join(f"shard-{shard_id}={rows}" for shard_id, rows in report.moved.items())
+    print(
+        f"scanned={report.scanned} moved={sum(report.moved.values())} ({moved}) "
+        f"elapsed={report.elapsed:.2f}s{' (dry run)' if args.dry_run else ''}"
+    )
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Admission control primitives.
+
+An admission gate bounds how many requests may run at once. Requests over the limit wait in a
+bounded FIFO queue for at most a deadline; everything beyond that is rejected immediately so that
+callers can fail fast instead of piling up behind the database pool. Gates are meant to be used
+from a single event loop.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Deque
+
+
+class AdmissionGate:
+    """
+    Concurrency limiter with a bounded, deadline-limited waiting queue.
+
+    Args:
+        name (str): Name reported in metrics (e.g., "read").
+        limit (int): Maximum number of concurrently admitted requests.
+        queue_size (int): Maximum number of requests waiting for a slot.
+        queue_timeout (float): Seconds a request may wait before it is shed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        queue_size: int,
+        queue_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self._clock = clock
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+        self.admitted = 0
+        self.queued = 0
+        self.shed = 0
+        self.timed_out = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+
+    async def acquire(self) -> bool:
+        """
+        Wait for a slot.
+
+        Returns:
+            bool: True when the request was admitted and must call `release` afterwards,
+            False when it was shed because the queue was full or the deadline passed.
+        """
+        if self._active < self.limit and not self._waiters:
+            self._active += 1
+            self.admitted += 1
+            return True
+
+        if len(self._waiters) >= self.queue_size:
+            self.shed += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        started = self._clock()
+
+        try:
+            await asyncio.wait_for(waiter, timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self._discard(waiter)
+            self.shed += 1
+            self.timed_out += 1
+            return False
+        except BaseException:
+            self._discard(waiter)
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            waited = self._clock() - started
+            self.queue_time_total += waited
+            self.queue_time_max = max(self.queue_time_max, waited)
+
+        self.admitted += 1
+        return True
+
+    def release(self) -> None:
+        """
+        Free the slot of an admitted request, handing it over to the oldest waiter if any.
+        """
+        while self._waiters:
+            waiter = self._waiters.popleft()
+
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        self._active -= 1
+
+    def _discard(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def snapshot(self) -> dict:
+        """
+        Return the current state and counters of the gate.
+        """
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "queue_size": self.queue_size,
+            "queue_timeout": self.queue_timeout,
+            "active": self._active,
+            "waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+            "queue_time_total": round(self.queue_time_total, 6),
+            "queue_time_max": round(self.queue_time_max, 6),
+        }
@@ -0,0 +1,116 @@
+"""
+Single-flight coalescing of identical concurrent reads.
+
+The first caller for a key (the leader) runs the read; callers arriving with the same key while it
+is in flight (followers) wait for its outcome instead of running the read again, so a hotspot of
+identical requests uses one database connection instead of one each. Followers share the value
+or the exception of the leader. They wait for at most a deadline, after which they run the read
+themselves, and they run it too when the leader was cancelled or failed with an error that is
+its own (e.g., its client disconnected). Groups are meant to be used from a single event loop.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+def _shared(error: BaseException) -> bool:
+    return True
+
+
+class SingleFlight:
+    """
+    Group of in-flight calls, keyed by their normalized arguments.
+
+    Args:
+        name (str): Name reported in metrics (e.g., "users").
+        wait_timeout (float): Seconds a follower waits for the leader before running the call.
+    """
+
+    def __init__(self, name: str, wait_timeout: float):
+        self.name = name
+        self.wait_timeout = wait_timeout
+        self._flights: Dict[Hashable, asyncio.Future] = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.timed_out = 0
+        self.retried = 0
+
+    async def do(
+        self,
+        key: Hashable,
+        func: Callable[[], Awaitable[T]],
+        is_shared: Callable[[BaseException], bool] = _shared,
+    ) -> T:
+        """
+        Run `func`, or wait for the identical call in flight.
+
+        Args:
+            key (Hashable): Normalized arguments of the call.
+            func (Callable[[], Awaitable[T]]): The call, run when no identical one is in flight.
+            is_shared (Callable[[BaseException], bool]): Whether an error of the leader is also
+                the outcome of its followers; those that are not make followers run `func`.
+
+        Returns:
+            T: The value of the call, possibly computed for another caller.
+        """
+        flight = self._flights.get(key)
+
+        if flight is None:
+            return await self._lead(key, func)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(flight), timeout=self.wait_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            return await func()
+        except asyncio.CancelledError:
+            if not flight.cancelled():
+                raise
+        except Exception:
+            pass
+
+        if flight.cancelled() or not is_shared(flight.exception()):
+            self.retried += 1
+            return await self.do(key, func, is_shared)
+
+        self.coalesced += 1
+        return flight.result()
+
+    async def _lead(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        flight = asyncio.get_running_loop().create_future()
+        self._flights[key] = flight
+        self.leaders += 1
+
+        try:
+            value = await func()
+        except asyncio.CancelledError:
+            flight.cancel()
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # Followers retrieve the exception; marking it retrieved avoids the unhandled warning.
+            flight.exception()
+            raise
+        else:
+            flight.set_result(value)
+            return value
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def snapshot(self) -> dict:
+        """
+        Return the current state and counters of the group.
+        """
+        return {
+            "name": self.name,
+            "wait_timeout": self.wait_timeout,
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "timed_out": self.timed_out,
+            "retried": self.retried,
+        }
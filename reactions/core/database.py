@@ -5,34 +5,240 @@ This module contains the database setup, including the creation of the database
 session configuration, and the base class for SQLAlchemy models. It also includes a dependency
 to manage database sessions, ensuring that sessions are created, used, and closed properly
 within the application.
+
+The engine is not created at import time: each process creates its own with `init_engine`
+(the application does it in its lifespan) and releases it with `dispose_engine`. Connections are
+tagged with the process that opened them and are never handed out in another process, so a pool
+inherited through `fork` is discarded instead of shared.
+
+When `DATABASE_SHARD_URLS` is configured, `init_engine` creates one engine per shard and
+`SessionLocal` produces sharded sessions routing every statement to the right shards (see
+`reactions.core.sharding`); `engine` is then the engine of the first shard.
 """
 
-from typing import Generator
+import logging
+import os
+from typing import Generator, List
+
+from fastapi import Request
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Connection, Engine, make_url
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from reactions.core import deadlines, querylog, settings, sharding
 
-from reactions.core import settings
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(
-    url=DATABASE_URL,
-    pool_size=5,
-    max_overflow=10,
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine: Engine | None = None
+shards: sharding.Shards | None = None
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 Base = declarative_base()
 
 
-def get_db() -> Generator:
+def create_db_engine(url: str | None = None) -> Engine:
+    """
+    Create a new engine configured from settings.
+
+    Args:
+        url (str | None): Database URL. Defaults to `settings.DATABASE_URL`.
+
+    Returns:
+        Engine: A new engine whose connections are bound to the current process, with its slow
+            statements logged (see `reactions.core.querylog`).
+
+    Raises:
+        RuntimeError: If no database URL is configured.
+    """
+    url = url or settings.DATABASE_URL
+
+    if not url:
+        raise RuntimeError("The DATABASE_URL environment variable is not set.")
+
+    options = {}
+
+    if make_url(url).get_backend_name() != "sqlite":
+        options = {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        }
+
+    new_engine = create_engine(url=url, **options)
+    event.listen(new_engine, "connect", _tag_connection_owner)
+    event.listen(new_engine, "checkout", _check_connection_owner)
+
+    if settings.SLOW_QUERY_SECONDS > 0:
+        querylog.get_log().instrument(new_engine)
+
+    return new_engine
+
+
+def init_engine(url: str | None = None) -> Engine:
+    """
+    Create the engine of the current process and bind `SessionLocal` to it.
+
+    Does nothing if the engine was already initialized.
+
+    Returns:
+        Engine: The engine of the current process.
+    """
+    global engine, shards, SessionLocal
+
+    if engine is None and settings.DATABASE_SHARD_URLS and url is None:
+        shards = create_shards()
+        engine = shards.engines[shards.default]
+        SessionLocal = sessionmaker(
+            class_=sharding.ShardedSession, autocommit=False, autoflush=False, shards=shards
+        )
+    elif engine is None:
+        engine = create_db_engine(url)
+        SessionLocal.configure(bind=engine)
+
+    return engine
+
+
+def get_engine() -> Engine:
+    """
+    Return the engine of the current process, creating it if needed.
+    """
+    return init_engine()
+
+
+def create_shards(urls: List[str] | None = None) -> sharding.Shards:
+    """
+    Create one engine per shard.
+
+    Args:
+        urls (List[str] | None): Shard URLs. Defaults to `settings.DATABASE_SHARD_URLS`.
+
+    Returns:
+        sharding.Shards: The shards, in configuration order.
+    """
+    return sharding.Shards([create_db_engine(url) for url in urls or settings.DATABASE_SHARD_URLS])
+
+
+def open_database(url: str | None = None) -> Engine | sharding.Shards:
+    """
+    Create the engine, or the shards, a command works on.
+
+    Args:
+        url (str | None): Database URL. Defaults to the configured shards if any, else to
+            `settings.DATABASE_URL`.
+
+    Returns:
+        Engine | sharding.Shards: A new engine or new shards; dispose of them when done.
+    """
+    if url is None and settings.DATABASE_SHARD_URLS:
+        return create_shards()
+
+    return create_db_engine(url)
+
+
+def engines() -> List[Engine]:
+    """
+    Return every engine of the current process, one per shard when sharding is configured.
+    """
+    if shards is not None:
+        return list(shards.engines.values())
+
+    return [engine] if engine is not None else []
+
+
+def shard_connections(db: Session) -> List[Connection]:
+    """
+    Return the connection of a session to every shard, or its only connection when unsharded.
+    """
+    if isinstance(db, sharding.ShardedSession):
+        return db.shard_connections()
+
+    return [db.connection()]
+
+
+def dispose_engine() -> None:
+    """
+    Close every pooled connection of the current process and forget the engine.
+    """
+    global engine, shards
+
+    for db_engine in engines():
+        db_engine.dispose()
+
+    engine = None
+    shards = None
+
+
+def warm_up(db_engine: Engine, connections: int) -> int:
+    """
+    Open connections up front so that the first requests do not pay for them.
+
+    The connections are checked out at the same time, so the pool ends up holding that many
+    distinct idle connections (bounded by its size).
+
+    Args:
+        db_engine (Engine): The engine to warm up.
+        connections (int): Number of connections to open.
+
+    Returns:
+        int: Number of connections opened.
+    """
+    opened = []
+
+    try:
+        for _ in range(connections):
+            opened.append(db_engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+
+    return len(opened)
+
+
+def _tag_connection_owner(dbapi_connection, connection_record) -> None:
+    connection_record.info["pid"] = os.getpid()
+
+
+def _check_connection_owner(dbapi_connection, connection_record, connection_proxy) -> None:
+    pid = os.getpid()
+
+    if connection_record.info.get("pid") != pid:
+        connection_record.dbapi_connection = connection_proxy.dbapi_connection = None
+        raise exc.DisconnectionError(
+            f"Connection record belongs to pid {connection_record.info.get('pid')}, "
+            f"attempting to check out in pid {pid}"
+        )
+
+
+def _reset_after_fork() -> None:
+    # The child keeps the parent's pool object; drop its connections without closing them,
+    # since they still belong to the parent.
+    for db_engine in engines():
+        db_engine.dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def get_db(request: Request) -> Generator:
     """
     Dependency to get a database session.
+
+    The session is bound to the deadline configured for the route being served, which is
+    also stored in `request.state.deadline`.
+
     Yields:
         SessionLocal: A new database session.
     Closes the session after use.
     """
+    init_engine()
     db = SessionLocal()
+    route = request.scope.get("route")
+    deadline = deadlines.Deadline(
+        timeout=deadlines.timeout_for(request.method, getattr(route, "path", request.url.path))
+    )
+    deadline.bind(db)
+    request.state.deadline = deadline
     try:
         yield db
     finally:
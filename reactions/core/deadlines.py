@@ -0,0 +1,122 @@
+"""
+Request deadlines enforced down to the database.
+
+A deadline is bound to the database session of a request. On PostgreSQL every transaction of the
+session starts with a `statement_timeout` equal to the remaining time, so the server aborts a
+statement that outlives the request. Independently of the dialect, a deadline can be cancelled
+from another thread, which interrupts the statement currently running on its connection; this is
+used when the deadline passes or the client disconnects.
+"""
+
+import time
+from typing import Any, Callable
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, SessionTransaction
+
+from reactions.core import settings
+
+POSTGRES_QUERY_CANCELED = "57014"
+
+TIMEOUT = "timeout"
+DISCONNECT = "disconnect"
+
+
+def timeout_for(method: str, path: str) -> float:
+    """
+    Return the deadline in seconds configured for a route.
+
+    Args:
+        method (str): HTTP method of the route (e.g., "GET").
+        path (str): Path template of the route (e.g., "/api/v1/users/").
+
+    Returns:
+        float: The route deadline, or the default one when the route is not configured.
+    """
+    return float(
+        settings.REQUEST_DEADLINES.get(f"{method} {path}", settings.REQUEST_DEADLINE_SECONDS)
+    )
+
+
+def is_cancellation(error: BaseException) -> bool:
+    """
+    Tell whether a database error was caused by a statement timeout or an interruption.
+    """
+    if not isinstance(error, OperationalError):
+        return False
+
+    if getattr(error.orig, "pgcode", None) == POSTGRES_QUERY_CANCELED:
+        return True
+
+    return "interrupted" in str(error.orig).lower()
+
+
+class Deadline:
+    """
+    Point in time after which the work of a request must stop.
+
+    Args:
+        timeout (float): Seconds from now until the deadline.
+    """
+
+    def __init__(self, timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.timeout = timeout
+        self._clock = clock
+        self.expires_at = clock() + timeout
+        self.reason: str | None = None
+        self._driver_connection: Any = None
+
+    @property
+    def remaining(self) -> float:
+        """
+        Seconds left before the deadline, never negative.
+        """
+        return max(self.expires_at - self._clock(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining <= 0
+
+    def bind(self, db: Session) -> None:
+        """
+        Apply the deadline to every transaction started by a session.
+        """
+        event.listen(db, "after_begin", self._on_begin)
+        event.listen(db, "after_transaction_end", self._on_transaction_end)
+
+    def cancel(self, reason: str = TIMEOUT) -> None:
+        """
+        Interrupt the statement currently running for the bound session, if any.
+
+        Safe to call from a thread other than the one executing the statement.
+        """
+        self.reason = self.reason or reason
+        connection = self._driver_connection
+
+        if connection is None:
+            return
+
+        if hasattr(connection, "cancel"):
+            connection.cancel()
+        elif hasattr(connection, "interrupt"):
+            connection.interrupt()
+
+    def _on_begin(
+        self,
+        session: Session,
+        transaction: SessionTransaction,
+        connection: Connection,
+    ) -> None:
+        self._driver_connection = connection.connection.driver_connection
+
+        if connection.dialect.name == "postgresql":
+            milliseconds = max(int(self.remaining * 1000), 1)
+            connection.exec_driver_sql(f"SET LOCAL statement_timeout = {milliseconds}")
+
+    def _on_transaction_end(self, session: Session, transaction: SessionTransaction) -> None:
+        # Once the root transaction ends the connection goes back to the pool and may serve
+        # another request, so it must no longer be cancelled from here.
+        if transaction.parent is None:
+            self._driver_connection = None
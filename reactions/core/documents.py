@@ -0,0 +1,102 @@
+"""
+Portable SQL constructs over JSON document columns.
+
+On PostgreSQL documents are stored as `jsonb`: integer fields are read with `->>` and equality is
+expressed as containment (`@>`), so that queries match the expression and GIN indexes of the
+table. Other databases (SQLite) go through `json_extract`. Integer fields are read as `bigint`:
+the reaction counters they hold are not bounded to 32 bits.
+
+Field names are rendered inline, never as bound parameters, since an expression index is only
+used when the query repeats its exact expression. They must be plain identifiers.
+"""
+
+import json
+import re
+from typing import Any, Dict
+
+from sqlalchemy import BigInteger, Boolean, literal, literal_column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.functions import FunctionElement
+
+FIELD = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _field(name: str) -> str:
+    if not FIELD.match(name):
+        raise ValueError(f"Invalid document field name: {name!r}")
+    return name
+
+
+class json_integer(FunctionElement):  # pylint: disable=invalid-name,too-many-ancestors
+    """
+    Integer value of a top-level field of a JSON document, as a 64-bit integer.
+
+    Args:
+        column (ColumnElement): JSON column.
+        field (str): Field name.
+    """
+
+    type = BigInteger()
+    name = "json_integer"
+    inherit_cache = True
+
+    def __init__(self, column: ColumnElement, field: str):
+        super().__init__(column, literal_column(_field(field)))
+
+
+class json_contains(FunctionElement):  # pylint: disable=invalid-name,too-many-ancestors
+    """
+    Whether a JSON document holds every given integer field with the given value.
+
+    Args:
+        column (ColumnElement): JSON column.
+        document (Dict[str, int]): Top-level fields and their expected values.
+    """
+
+    type = Boolean()
+    name = "json_contains"
+    inherit_cache = True
+
+    def __init__(self, column: ColumnElement, document: Dict[str, int]):
+        fields = [literal_column(_field(name)) for name in document]
+        values = [literal(int(value), BigInteger()) for value in document.values()]
+        super().__init__(column, literal(json.dumps(document)), *fields, *values)
+
+
+def _field_name(element: FunctionElement, index: int) -> str:
+    # Field names are literal columns so that they are part of the statement cache key.
+    return _field(element.clauses.clauses[index].name)
+
+
+@compiles(json_integer, "postgresql")
+def _json_integer_postgresql(element: json_integer, compiler: Any, **kw: Any) -> str:
+    column = compiler.process(element.clauses.clauses[0], **kw)
+    return f"(({column} ->> '{_field_name(element, 1)}')::bigint)"
+
+
+@compiles(json_integer)
+def _json_integer(element: json_integer, compiler: Any, **kw: Any) -> str:
+    column = compiler.process(element.clauses.clauses[0], **kw)
+    return f"CAST(json_extract({column}, '$.{_field_name(element, 1)}') AS BIGINT)"
+
+
+@compiles(json_contains, "postgresql")
+def _json_contains_postgresql(element: json_contains, compiler: Any, **kw: Any) -> str:
+    column, document = element.clauses.clauses[:2]
+    return (
+        f"({compiler.process(column, **kw)} @> CAST({compiler.process(document, **kw)} AS JSONB))"
+    )
+
+
+@compiles(json_contains)
+def _json_contains(element: json_contains, compiler: Any, **kw: Any) -> str:
+    clauses = element.clauses.clauses
+    column = compiler.process(clauses[0], **kw)
+    count = (len(clauses) - 2) // 2
+    conditions = [
+        f"CAST(json_extract({column}, '$.{_field_name(element, 2 + index)}') AS BIGINT) = "
+        f"{compiler.process(clauses[2 + count + index], **kw)}"
+        for index in range(count)
+    ]
+    return f"({' AND '.join(conditions)})"
@@ -0,0 +1,332 @@
+"""
+Change events and their brokers.
+
+Business processes publish an event once a change is committed; brokers fan events out to
+subscribers such as the Server-Sent Events change feed. Two brokers are available:
+
+- `InProcessBroker` delivers events to the subscribers of the current process.
+- `PostgresBroker` sends events through PostgreSQL `NOTIFY` and delivers whatever arrives on
+  `LISTEN`, so every worker process connected to the database sees every event.
+
+Events carry increasing ids. The in-process broker counts them; the PostgreSQL broker takes them
+from the `change_events_id_seq` sequence and sends them in the notification, so that every worker
+gives an event the same id and a client may resume on any worker. A bounded window of recent
+events is kept so that a subscriber can resume after the last id it saw; one that missed more
+events than the window or its buffer holds starts with a `stream.reset` event instead. Each
+subscriber owns a bounded buffer: a subscriber too slow to drain it gets a final `stream.reset`
+event and is dropped, instead of slowing down publishers or growing memory without limit.
+
+`publish` may be called from any thread; subscriptions are consumed on the event loop that
+created them.
+"""
+
+import asyncio
+import json
+import logging
+import select
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List
+
+from sqlalchemy import Sequence
+from sqlalchemy.engine import Engine
+
+from reactions.core import database, settings
+
+logger = logging.getLogger(__name__)
+
+RESET = "stream.reset"
+
+# Ids of the events published through PostgreSQL, shared by every worker.
+EVENT_IDS = Sequence("change_events_id_seq", metadata=database.Base.metadata)
+
+
+@dataclass
+class Event:
+    """
+    A change notification.
+
+    Attributes:
+        id (int): Increasing identifier, used as the SSE event id.
+        type (str): Event type (e.g., "user.created").
+        data (Dict[str, Any]): JSON-serializable payload.
+    """
+
+    id: int
+    type: str
+    data: Dict[str, Any] = field(default_factory=dict)
+
+    def encode(self) -> str:
+        """
+        Render the event in the Server-Sent Events wire format.
+        """
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data)}\n\n"
+
+
+class Subscription:
+    """
+    A subscriber's bounded buffer of events.
+    """
+
+    def __init__(self, broker: "InProcessBroker", buffer_size: int):
+        self._broker = broker
+        self._loop = asyncio.get_running_loop()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._buffer_size = buffer_size
+        self.closed = False
+
+    async def get(self) -> Event | None:
+        """
+        Wait for the next event. Returns None once the subscription is closed.
+        """
+        if self.closed and self._queue.empty():
+            return None
+
+        return await self._queue.get()
+
+    def deliver(self, event: Event) -> None:
+        """
+        Queue an event from any thread.
+        """
+        self._loop.call_soon_threadsafe(self._put, event)
+
+    def _put(self, event: Event) -> None:
+        if self.closed:
+            return
+
+        if self._queue.qsize() >= self._buffer_size:
+            self._close(event.id, "The subscriber did not keep up with the change feed.")
+            self._broker.unsubscribe(self)
+            return
+
+        self._queue.put_nowait(event)
+
+    def _close(self, event_id: int, message: str) -> None:
+        self.closed = True
+        self._queue.put_nowait(Event(id=event_id, type=RESET, data={"message": message}))
+        self._queue.put_nowait(None)
+
+    async def __aenter__(self) -> "Subscription":
+        return self
+
+    async def __aexit__(self, *args: Any) -> None:
+        self.closed = True
+        self._broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """
+    Broker fanning events out to the subscribers of the current process.
+    """
+
+    def __init__(
+        self,
+        buffer_size: int = settings.EVENTS_SUBSCRIBER_BUFFER,
+        replay_size: int = settings.EVENTS_REPLAY_SIZE,
+    ):
+        self.buffer_size = buffer_size
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._recent: Deque[Event] = deque(maxlen=replay_size)
+        self._subscribers: List[Subscription] = []
+
+    def start(self) -> None:
+        """
+        Start background resources. Nothing to do for the in-process broker.
+        """
+
+    def stop(self) -> None:
+        """
+        Release background resources. Nothing to do for the in-process broker.
+        """
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        """
+        Publish an event to every subscriber.
+        """
+        self._dispatch(event_type, data)
+
+    def _dispatch(
+        self, event_type: str, data: Dict[str, Any], event_id: int | None = None
+    ) -> Event:
+        with self._lock:
+            event_id = self._last_id + 1 if event_id is None else event_id
+            self._last_id = max(self._last_id, event_id)
+            event = Event(id=event_id, type=event_type, data=data)
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+        return event
+
+    def subscribe(self, last_event_id: int | None = None) -> Subscription:
+        """
+        Subscribe to events, replaying the ones after `last_event_id` when given.
+
+        If events after `last_event_id` are no longer available, or more of them were missed
+        than the subscription can buffer, the subscription only holds a `stream.reset` event so
+        that the subscriber knows it has to resynchronize.
+        """
+        subscription = Subscription(self, self.buffer_size)
+
+        # The missed events are queued before the subscription is registered, under the lock
+        # dispatching events: every later event is queued after them, and only once.
+        with self._lock:
+            if last_event_id is not None:
+                missed = [event for event in self._recent if event.id > last_event_id]
+                oldest = self._recent[0].id if self._recent else self._last_id + 1
+
+                if oldest > last_event_id + 1:
+                    subscription._close(
+                        last_event_id, "Events after Last-Event-ID are no longer available."
+                    )
+                    return subscription
+
+                if len(missed) > self.buffer_size:
+                    subscription._close(
+                        last_event_id, "More events were missed than the subscriber can buffer."
+                    )
+                    return subscription
+
+                for event in missed:
+                    subscription._put(event)
+
+            self._subscribers.append(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+
+class PostgresBroker(InProcessBroker):
+    """
+    Broker distributing events across processes with PostgreSQL LISTEN/NOTIFY.
+
+    Args:
+        engine (Engine): Engine of a PostgreSQL database.
+        channel (str): Notification channel.
+    """
+
+    def __init__(self, engine: Engine, channel: str = settings.EVENTS_CHANNEL, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.engine = engine
+        self.channel = channel
+        self._running = threading.Event()
+        self._listener: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._running.set()
+        self._listener = threading.Thread(target=self._listen, name="events-listener", daemon=True)
+        self._listener.start()
+
+    def stop(self) -> None:
+        self._running.clear()
+
+        if self._listener is not None:
+            self._listener.join(timeout=5)
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        with self.engine.connect() as connection:
+            connection.exec_driver_sql(
+                "SELECT pg_notify(%s, json_build_object("
+                f"'id', nextval('{EVENT_IDS.name}'), 'type', %s::text, 'data', %s::json)::text)",
+                (self.channel, event_type, json.dumps(data)),
+            )
+            connection.commit()
+
+    def _listen(self) -> None:
+        while self._running.is_set():
+            try:
+                self._listen_once()
+            except Exception:
+                logger.warning("Change feed listener failed, reconnecting", exc_info=True)
+                self._running.wait(1)
+
+    def _listen_once(self) -> None:
+        raw = self.engine.raw_connection()
+
+        try:
+            connection = raw.driver_connection
+            connection.autocommit = True
+            cursor = connection.cursor()
+            cursor.execute(f'LISTEN "{self.channel}"')
+            # Events published while not listening are unknown to this worker: the replay window
+            # restarts after them, so that a subscriber resuming from one of them is reset.
+            cursor.execute(f"SELECT last_value, is_called FROM {EVENT_IDS.name}")
+            last_value, is_called = cursor.fetchone()
+            last_id = last_value if is_called else last_value - 1
+
+            with self._lock:
+                if last_id > self._last_id:
+                    self._last_id = last_id
+                    self._recent.clear()
+
+            while self._running.is_set():
+                if select.select([connection], [], [], 1) == ([], [], []):
+                    continue
+
+                connection.poll()
+
+                while connection.notifies:
+                    notify = connection.notifies.pop(0)
+                    message = json.loads(notify.payload)
+                    self._dispatch(message["type"], message["data"], message["id"])
+        finally:
+            raw.close()
+
+
+_broker: InProcessBroker | None = None
+
+
+def create_broker(engine: Engine) -> InProcessBroker:
+    """
+    Create the broker selected by `settings.EVENTS_BROKER` for an engine.
+    """
+    kind = settings.EVENTS_BROKER
+
+    if kind == "auto":
+        kind = "postgres" if engine.dialect.name == "postgresql" else "memory"
+
+    if kind == "postgres":
+        return PostgresBroker(engine)
+
+    return InProcessBroker()
+
+
+def get_broker() -> InProcessBroker:
+    """
+    Return the broker of the current process, creating an in-process one if none was set.
+    """
+    global _broker
+
+    if _broker is None:
+        _broker = InProcessBroker()
+
+    return _broker
+
+
+def set_broker(broker: InProcessBroker | None) -> None:
+    """
+    Replace the broker of the current process.
+    """
+    global _broker
+    _broker = broker
+
+
+def publish(event_type: str, data: Dict[str, Any]) -> None:
+    """
+    Publish an event through the broker of the current process.
+
+    Failures are logged and swallowed: the change is already committed and must not be
+    reported as failed because its notification could not be sent.
+    """
+    try:
+        get_broker().publish(event_type, data)
+    except Exception:
+        logger.warning("Unable to publish %s event", event_type, exc_info=True)
@@ -0,0 +1,122 @@
+"""
+Bounded, expiring store of responses keyed by idempotency key.
+
+The store remembers the response produced for a key so that duplicate deliveries of the same
+request can be answered without executing it again. While the first delivery of a key is still
+executing, duplicates wait for it instead of running concurrently. The store lives in process
+memory and is meant to be used from a single event loop.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+
+@dataclass
+class StoredResponse:
+    """
+    A response captured for an idempotency key.
+
+    Attributes:
+        fingerprint (str): Digest of the request that produced the response.
+        status (int): HTTP status code.
+        headers (List[Tuple[bytes, bytes]]): Raw response headers.
+        body (bytes): Full response body.
+    """
+
+    fingerprint: str
+    status: int
+    headers: List[Tuple[bytes, bytes]] = field(default_factory=list)
+    body: bytes = b""
+
+
+class IdempotencyStore:
+    """
+    In-memory LRU store of responses with a time-to-live and in-flight tracking.
+    """
+
+    def __init__(
+        self,
+        max_keys: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_keys = max_keys
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._responses: "OrderedDict[str, Tuple[float, StoredResponse]]" = OrderedDict()
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._responses)
+
+    def get(self, key: str) -> StoredResponse | None:
+        """
+        Return the stored response for a key, or None if it is unknown or expired.
+        """
+        entry = self._responses.get(key)
+
+        if entry is None:
+            return None
+
+        expires_at, response = entry
+
+        if expires_at <= self._clock():
+            del self._responses[key]
+            return None
+
+        self._responses.move_to_end(key)
+        return response
+
+    async def acquire(self, key: str) -> StoredResponse | None:
+        """
+        Claim a key for execution or obtain the response already stored for it.
+
+        If another caller is executing the key, wait until it releases it and check again.
+
+        Returns:
+            StoredResponse | None: The stored response, or None when the caller now owns the key
+            and must call `release` once it is done.
+        """
+        while True:
+            response = self.get(key)
+
+            if response is not None:
+                return response
+
+            in_flight = self._in_flight.get(key)
+
+            if in_flight is None:
+                self._in_flight[key] = asyncio.get_running_loop().create_future()
+                return None
+
+            await asyncio.shield(in_flight)
+
+    def release(self, key: str, response: StoredResponse | None = None) -> None:
+        """
+        Release a key claimed with `acquire`, storing its response if one is given.
+
+        Waiters are woken up; when no response was stored, the next one claims the key.
+        """
+        if response is not None:
+            self._store(key, response)
+
+        in_flight = self._in_flight.pop(key, None)
+
+        if in_flight is not None and not in_flight.done():
+            in_flight.set_result(None)
+
+    def _store(self, key: str, response: StoredResponse) -> None:
+        now = self._clock()
+        self._responses[key] = (now + self.ttl_seconds, response)
+        self._responses.move_to_end(key)
+
+        while self._responses:
+            oldest_key, (expires_at, _) = next(iter(self._responses.items()))
+
+            if len(self._responses) <= self.max_keys and expires_at > now:
+                break
+
+            del self._responses[oldest_key]
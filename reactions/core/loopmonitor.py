@@ -0,0 +1,275 @@
+"""
+Event loop monitor.
+
+Route handlers are coroutines: a blocking call made on the event loop instead of through
+`interfaces.concurrency.run` stalls every request of the worker until it returns. The monitor
+sleeps LOOP_MONITOR_INTERVAL_SECONDS at a time and measures how late the loop wakes it up (the
+lag). A watchdog thread notices when that wake-up is LOOP_BLOCKING_THRESHOLD_SECONDS overdue and
+reads the stack of the loop thread while it is still stalled: the stall is attributed to the route
+of the request being served (or to the background task running) and to the innermost frame of the
+application. Once the loop resumes, the stall is counted and logged as a warning.
+
+Every wake-up also samples the threadpool running the blocking calls and the connection pools of
+the process; a pool running at capacity is logged when it becomes saturated.
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Tuple
+
+from anyio import to_thread
+from sqlalchemy.pool import QueuePool
+
+from reactions.core import database, settings
+
+logger = logging.getLogger(__name__)
+
+# Frames under this directory are the application's own; the innermost one locates a stall.
+APPLICATION_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class BlockingRoute:
+    """
+    Stalls of the event loop attributed to a route or background task.
+    """
+
+    route: str
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    last_seen: float = 0.0
+    last_location: str | None = None
+
+
+@dataclass
+class PoolUsage:
+    """
+    Utilization of the threadpool or of a connection pool, as last sampled.
+    """
+
+    name: str
+    kind: str
+    capacity: int
+    in_use: int = 0
+    waiting: int = 0
+    max_in_use: int = 0
+    saturated: bool = False
+    saturated_samples: int = 0
+
+
+def culprit(frame: Any, task: asyncio.Task | None = None) -> Tuple[str, str | None]:
+    """
+    Attribute the stack of a stalled event loop.
+
+    Args:
+        frame (Any): Innermost frame of the loop thread.
+        task (asyncio.Task | None): Task running on the loop, used when no request is served.
+
+    Returns:
+        Tuple[str, str | None]: The route ("GET /api/v1/users/"), the task ("task <name>") or
+            "-", and the innermost application frame ("function (file:line)"), if any.
+    """
+    route = None
+    location = None
+
+    while frame is not None and (route is None or location is None):
+        code = frame.f_code
+
+        if location is None and code.co_filename.startswith(APPLICATION_DIRECTORY):
+            location = f"{code.co_name} ({code.co_filename}:{frame.f_lineno})"
+
+        if route is None:
+            scope = frame.f_locals.get("scope")
+
+            if isinstance(scope, dict) and scope.get("route") is not None:
+                route = f"{scope.get('method', '-')} {getattr(scope['route'], 'path', '-')}"
+
+        frame = frame.f_back
+
+    if route is None and task is not None:
+        route = f"task {getattr(task.get_coro(), '__qualname__', task.get_name())}"
+
+    return route or "-", location
+
+
+class LoopMonitor:
+    """
+    Lag, stall and pool utilization monitor of the event loop it runs on.
+
+    Args:
+        interval (float): Seconds between two wake-ups of the monitor.
+        threshold (float): Seconds of lag from which the loop counts as blocked.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        threshold: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.interval = interval
+        self.threshold = threshold
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread: int | None = None
+        self._due: float | None = None
+        self._culprit: Tuple[str, str | None] | None = None
+        self._routes: Dict[str, BlockingRoute] = {}
+        self._pools: Dict[Tuple[str, str], PoolUsage] = {}
+
+        self.samples = 0
+        self.lag_last = 0.0
+        self.lag_max = 0.0
+        self.lag_total = 0.0
+        self.blocked = 0
+
+    async def run(self) -> None:
+        """
+        Monitor the running event loop until cancelled.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._stopped.clear()
+        watchdog = threading.Thread(target=self._watch, name="reactions-loop-watchdog", daemon=True)
+        watchdog.start()
+
+        try:
+            while True:
+                due = self._clock() + self.interval
+
+                with self._lock:
+                    self._due, self._culprit = due, None
+
+                await asyncio.sleep(self.interval)
+                self.observe(self._clock() - due)
+                self.sample()
+        finally:
+            self._stopped.set()
+            watchdog.join()
+
+    def observe(self, lag: float) -> None:
+        """
+        Record how late the loop woke the monitor up, counting a stall from the threshold.
+        """
+        lag = max(lag, 0.0)
+
+        with self._lock:
+            route, location = self._culprit or ("-", None)
+            self._due = None
+            self.samples += 1
+            self.lag_last = lag
+            self.lag_max = max(self.lag_max, lag)
+            self.lag_total += lag
+
+            if lag < self.threshold:
+                return
+
+            self.blocked += 1
+            entry = self._routes.setdefault(route, BlockingRoute(route=route))
+            entry.count += 1
+            entry.total += lag
+            entry.max = max(entry.max, lag)
+            entry.last_seen = time.time()
+            entry.last_location = location or entry.last_location
+
+        logger.warning("Event loop blocked for %.3fs by %s at %s", lag, route, location or "-")
+
+    def sample(self) -> None:
+        """
+        Sample the threadpool of the loop and the connection pools of the process.
+        """
+        limiter = to_thread.current_default_thread_limiter()
+        statistics = limiter.statistics()
+        self.gauge(
+            "threadpool",
+            "threads",
+            capacity=int(limiter.total_tokens),
+            in_use=statistics.borrowed_tokens,
+            waiting=statistics.tasks_waiting,
+        )
+
+        for engine in database.engines():
+            pool = engine.pool
+
+            if isinstance(pool, QueuePool):
+                self.gauge(
+                    engine.url.render_as_string(hide_password=True),
+                    "connections",
+                    capacity=pool.size() + settings.DB_MAX_OVERFLOW,
+                    in_use=pool.checkedout(),
+                )
+
+    def gauge(self, name: str, kind: str, capacity: int, in_use: int, waiting: int = 0) -> None:
+        """
+        Record the utilization of a pool, logging when it becomes saturated.
+        """
+        with self._lock:
+            usage = self._pools.setdefault((kind, name), PoolUsage(name, kind, capacity))
+            saturated = in_use >= capacity or waiting > 0
+            became_saturated = saturated and not usage.saturated
+            usage.capacity = capacity
+            usage.in_use = in_use
+            usage.waiting = waiting
+            usage.max_in_use = max(usage.max_in_use, in_use)
+            usage.saturated = saturated
+            usage.saturated_samples += saturated
+
+        if became_saturated:
+            logger.warning(
+                "Pool of %s saturated: %d of %d %s in use, %d waiting",
+                name,
+                in_use,
+                capacity,
+                kind,
+                waiting,
+            )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the lag, the stalls by route (most time first) and the pool utilization.
+        """
+        with self._lock:
+            return {
+                "interval": self.interval,
+                "threshold": self.threshold,
+                "samples": self.samples,
+                "lag_last": self.lag_last,
+                "lag_max": self.lag_max,
+                "lag_mean": self.lag_total / self.samples if self.samples else 0.0,
+                "blocked": self.blocked,
+                "blocking": [
+                    asdict(entry)
+                    for entry in sorted(self._routes.values(), key=lambda entry: -entry.total)
+                ],
+                "pools": [asdict(usage) for usage in self._pools.values()],
+            }
+
+    def _watch(self) -> None:
+        # Polls often enough to catch the loop while a stall of the threshold is still going on.
+        poll = min(self.interval, self.threshold) / 2
+
+        while not self._stopped.wait(poll):
+            with self._lock:
+                due, found = self._due, self._culprit
+
+            if due is None or found is not None or self._clock() - due < self.threshold:
+                continue
+
+            frames = sys._current_frames()
+
+            try:
+                found = culprit(frames.get(self._loop_thread), asyncio.current_task(self._loop))
+            finally:
+                del frames
+
+            with self._lock:
+                if self._due == due:
+                    self._culprit = found
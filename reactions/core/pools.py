@@ -0,0 +1,67 @@
+"""
+Process pool for CPU-bound work.
+
+CPU-bound work such as validating large payloads holds the GIL: run in the threadpool it keeps
+the event loop free but still uses a single core. Such work is sent to a process pool shared by
+the current process, created on first use with `processes()` processes. Worker processes are
+started with `spawn`, so they never inherit the threads, locks or database connections of the
+application. Their results are pickled back to the caller: they should be plain values, which
+unpickle much faster than models.
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from reactions.core import settings
+
+_pool: ProcessPoolExecutor | None = None
+_lock = threading.Lock()
+
+
+def processes() -> int:
+    """
+    Return the number of processes of the pool: VALIDATION_PROCESSES, one per core when it is 0.
+
+    With a single process, work stays in the caller.
+    """
+    return settings.VALIDATION_PROCESSES or os.cpu_count() or 1
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Return the process pool of the current process, creating it if needed.
+    """
+    global _pool
+
+    with _lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=processes(), mp_context=multiprocessing.get_context("spawn")
+            )
+
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    """
+    Stop the worker processes of the pool, if it was created.
+    """
+    global _pool
+
+    with _lock:
+        pool, _pool = _pool, None
+
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def _reset_after_fork() -> None:
+    # A forked child cannot use the pool of its parent; it creates its own on first use.
+    global _pool, _lock
+    _pool = None
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
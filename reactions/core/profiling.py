@@ -0,0 +1,282 @@
+"""
+Sampling profiler for individual requests.
+
+A profile records the call stacks of the threads doing the work of one request: the blocking
+calls run through `interfaces.concurrency.run` register their worker thread while they run. A
+single sampler thread, alive only while profiles are active, reads the stacks of the registered
+threads every PROFILING_INTERVAL_SECONDS; nothing is traced, so the overhead is bounded by the
+sampling rate and is nil for requests that are not profiled.
+
+Kept profiles are written as JSON dumps of collapsed stacks ("outer;inner;leaf": samples, the
+input of flame graph tools) to a directory holding at most PROFILING_MAX_DUMPS of them, oldest
+removed first.
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Set, TypeVar
+
+from reactions.core import settings
+
+T = TypeVar("T")
+
+DUMP_SUFFIX = ".profile.json"
+
+# Stores of the same directory may be built per request; writes and removals are serialized.
+_store_lock = threading.Lock()
+
+
+class Profile:
+    """
+    Stack samples collected for one request.
+
+    Args:
+        route (str): Route template of the request (e.g., "GET /api/v1/users/").
+        request_id (str): Identifier of the request, also part of the dump name.
+    """
+
+    def __init__(self, route: str, request_id: str):
+        self.route = route
+        self.request_id = request_id
+        self.stacks: Counter = Counter()
+        self._threads: Set[int] = set()
+        self._lock = threading.Lock()
+
+    def wrap(self, func: Callable[[], T]) -> Callable[[], T]:
+        """
+        Return `func` sampled while it runs in the calling thread.
+        """
+
+        @functools.wraps(func)
+        def sampled() -> T:
+            thread = threading.get_ident()
+
+            with self._lock:
+                self._threads.add(thread)
+
+            try:
+                return func()
+            finally:
+                with self._lock:
+                    self._threads.discard(thread)
+
+        return sampled
+
+    def sample(self, frames: Dict[int, Any]) -> None:
+        """
+        Record the current stack of every thread working for the request.
+        """
+        with self._lock:
+            threads = list(self._threads)
+
+        for thread in threads:
+            frame = frames.get(thread)
+
+            if frame is not None:
+                self.stacks[_stack(frame)] += 1
+
+
+def _stack(frame: Any) -> str:
+    names = []
+
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+        frame = frame.f_back
+
+    return ";".join(reversed(names))
+
+
+class Sampler:
+    """
+    Thread sampling the stacks of every active profile.
+
+    Args:
+        interval (float): Seconds between two samples.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._profiles: Set[Profile] = set()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def start(self, profile: Profile) -> None:
+        """
+        Start sampling a profile, starting the sampler thread if needed.
+        """
+        with self._lock:
+            self._profiles.add(profile)
+
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="reactions-profiler", daemon=True
+                )
+                self._thread.start()
+
+    def stop(self, profile: Profile) -> None:
+        """
+        Stop sampling a profile; the sampler thread exits once no profile is active.
+        """
+        with self._lock:
+            self._profiles.discard(profile)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                profiles = list(self._profiles)
+
+                if not profiles:
+                    self._thread = None
+                    return
+
+            frames = sys._current_frames()
+
+            for profile in profiles:
+                profile.sample(frames)
+
+            del frames
+            time.sleep(self.interval)
+
+
+class ProfileStore:
+    """
+    Bounded directory of profile dumps.
+
+    Args:
+        directory (str): Directory of the dumps, created on first write.
+        max_dumps (int): Number of dumps kept.
+    """
+
+    def __init__(self, directory: str, max_dumps: int):
+        self.directory = directory
+        self.max_dumps = max_dumps
+
+    def save(self, profile: Profile, duration: float, interval: float) -> str:
+        """
+        Write the dump of a profile and remove the oldest ones over the bound.
+
+        Returns:
+            str: Name of the dump.
+        """
+        name = f"{time.time_ns()}-{profile.request_id}{DUMP_SUFFIX}"
+        dump = {
+            "route": profile.route,
+            "request_id": profile.request_id,
+            "duration": round(duration, 6),
+            "interval": interval,
+            "stacks": dict(profile.stacks),
+        }
+
+        with _store_lock:
+            os.makedirs(self.directory, exist_ok=True)
+
+            with open(os.path.join(self.directory, name), "w") as stream:
+                json.dump(dump, stream)
+
+            for old in self.names()[: -self.max_dumps or None]:
+                try:
+                    os.remove(os.path.join(self.directory, old))
+                except FileNotFoundError:
+                    pass
+
+        return name
+
+    def names(self) -> List[str]:
+        """
+        Return the names of the dumps, oldest first.
+        """
+        try:
+            return sorted(name for name in os.listdir(self.directory) if name.endswith(DUMP_SUFFIX))
+        except FileNotFoundError:
+            return []
+
+    def load(self) -> Iterable[Dict[str, Any]]:
+        """
+        Yield the dumps, oldest first, skipping those removed or being written meanwhile.
+        """
+        for name in self.names():
+            try:
+                with open(os.path.join(self.directory, name)) as stream:
+                    yield {"name": name, **json.load(stream)}
+            except (FileNotFoundError, ValueError):
+                continue
+
+    def summary(self, limit: int = 20, route: str | None = None) -> Dict[str, Any]:
+        """
+        Aggregate the dumps into the functions with the most cumulative time.
+
+        The cumulative time of a function counts the samples where it is on the stack, once per
+        sample even when recursive; its self time counts those where it is the innermost frame.
+
+        Args:
+            limit (int): Number of functions returned.
+            route (str | None): Only aggregate the dumps of this route.
+
+        Returns:
+            Dict[str, Any]: The number of profiles and samples, and the top functions.
+        """
+        cumulative: Counter = Counter()
+        own: Counter = Counter()
+        seconds: Counter = Counter()
+        profiles = samples = 0
+
+        for dump in self.load():
+            if route is not None and dump["route"] != route:
+                continue
+
+            profiles += 1
+
+            for stack, count in dump["stacks"].items():
+                functions = stack.split(";")
+                samples += count
+
+                for function in set(functions):
+                    cumulative[function] += count
+                    seconds[function] += count * dump["interval"]
+
+                own[functions[-1]] += count
+
+        return {
+            "profiles": profiles,
+            "samples": samples,
+            "functions": [
+                {
+                    "function": function,
+                    "cumulative_samples": count,
+                    "self_samples": own[function],
+                    "cumulative_seconds": round(seconds[function], 6),
+                }
+                for function, count in cumulative.most_common(limit)
+            ],
+        }
+
+
+def new_request_id() -> str:
+    """
+    Return an identifier for a request that did not bring its own.
+    """
+    return uuid.uuid4().hex
+
+
+@functools.lru_cache(maxsize=None)
+def get_sampler() -> Sampler:
+    """
+    Return the sampler of the current process.
+    """
+    return Sampler(interval=settings.PROFILING_INTERVAL_SECONDS)
+
+
+def get_store() -> ProfileStore:
+    """
+    Return the dump directory configured in the settings.
+    """
+    return ProfileStore(
+        directory=settings.PROFILING_DIRECTORY, max_dumps=settings.PROFILING_MAX_DUMPS
+    )
@@ -0,0 +1,283 @@
+"""
+Slow statement log.
+
+Engines created by `database.create_db_engine` time every statement through cursor execution
+events when SLOW_QUERY_SECONDS is above 0. Statements at least that slow are logged with their
+duration, the route that issued them (`route`, set by `interfaces.concurrency.run` and by the job
+workers) and their parameters redacted to their types, then aggregated by shape: the statement
+with its placeholders, literals and IN lists collapsed, so that every execution of a query counts
+towards the same entry whatever its arguments.
+
+On PostgreSQL, with SLOW_QUERY_EXPLAIN, the plan of a slow shape is captured with `EXPLAIN` (not
+ANALYZE, so the statement is not run again) on the same connection, inside a savepoint, at most
+once per SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS per shape.
+"""
+
+import contextvars
+import hashlib
+import logging
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+from reactions.core import settings
+
+logger = logging.getLogger(__name__)
+
+route: contextvars.ContextVar[str | None] = contextvars.ContextVar("route", default=None)
+
+PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?|(?<![:\w]):\w+")
+STRING = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+SPACES = re.compile(r"\s+")
+EXPLAINABLE = ("select", "insert", "update", "delete", "with")
+
+
+def shape(statement: str) -> str:
+    """
+    Return the shape of a statement (e.g., "SELECT ... WHERE username IN (...) LIMIT ?").
+    """
+    text = STRING.sub("?", statement)
+    text = PLACEHOLDER.sub("?", text)
+    text = NUMBER.sub("?", text)
+    text = IN_LIST.sub("IN (...)", text)
+    return SPACES.sub(" ", text).strip()
+
+
+def redact(parameters: Any) -> Any:
+    """
+    Replace parameter values by their type names; executemany batches keep their size only.
+    """
+    if isinstance(parameters, dict):
+        return {name: type(value).__name__ for name, value in parameters.items()}
+
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return {"executemany": len(parameters), "first": redact(parameters[0])}
+
+        return [type(value).__name__ for value in parameters]
+
+    return type(parameters).__name__
+
+
+@dataclass
+class SlowStatement:
+    """
+    Aggregate of the slow executions of a statement shape.
+    """
+
+    fingerprint: str
+    statement: str
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    last_seen: float = 0.0
+    last_route: str | None = None
+    last_parameters: Any = None
+    routes: Dict[str, int] = field(default_factory=dict)
+    plan: str | None = None
+    explained_at: float | None = None
+
+
+class SlowQueryLog:
+    """
+    Bounded aggregate of slow statements by shape.
+
+    Args:
+        threshold (float): Seconds from which a statement is slow.
+        max_shapes (int): Shapes kept; the one with the least total time is evicted beyond.
+        explain (bool): Capture plans on PostgreSQL.
+        explain_interval (float): Seconds between two plan captures of the same shape.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        max_shapes: int = 200,
+        explain: bool = False,
+        explain_interval: float = 300.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.threshold = threshold
+        self.max_shapes = max_shapes
+        self.explain = explain
+        self.explain_interval = explain_interval
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._statements: Dict[str, SlowStatement] = {}
+
+    def instrument(self, engine: Engine) -> None:
+        """
+        Time the statements of an engine.
+        """
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _after_cursor_execute(
+        self,
+        conn: Connection,
+        cursor: Any,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        started = conn.info.pop("querylog_started", None)
+
+        if started is None:
+            return
+
+        duration = time.perf_counter() - started
+
+        if duration >= self.threshold:
+            self.record(conn, statement, parameters, duration)
+
+    def record(
+        self, conn: Connection | None, statement: str, parameters: Any, duration: float
+    ) -> None:
+        """
+        Log a slow statement, add it to its shape and capture its plan when due.
+        """
+        text = shape(statement)
+        fingerprint = hashlib.sha1(text.encode()).hexdigest()[:16]
+        current_route = route.get()
+        redacted = redact(parameters)
+        now = self._clock()
+
+        logger.warning(
+            "Slow statement (%.3fs) from %s [%s]: %s; parameters: %s",
+            duration,
+            current_route or "-",
+            fingerprint,
+            text,
+            redacted,
+        )
+
+        with self._lock:
+            entry = self._statements.get(fingerprint)
+
+            if entry is None:
+                if len(self._statements) >= self.max_shapes:
+                    evicted = min(self._statements.values(), key=lambda item: item.total)
+                    del self._statements[evicted.fingerprint]
+
+                entry = self._statements[fingerprint] = SlowStatement(fingerprint, text)
+
+            entry.count += 1
+            entry.total += duration
+            entry.max = max(entry.max, duration)
+            entry.last_seen = now
+            entry.last_route = current_route
+            entry.last_parameters = redacted
+
+            if current_route is not None:
+                entry.routes[current_route] = entry.routes.get(current_route, 0) + 1
+
+            explain = (
+                self.explain
+                and conn is not None
+                and conn.dialect.name == "postgresql"
+                and text.lower().startswith(EXPLAINABLE)
+                and (
+                    entry.explained_at is None or now - entry.explained_at >= self.explain_interval
+                )
+            )
+
+            if explain:
+                entry.explained_at = now
+
+        if explain:
+            plan = _explain(conn, statement, parameters)
+
+            with self._lock:
+                entry.plan = plan
+
+    def top(self, limit: int = 10, order: str = "total") -> List[Dict[str, Any]]:
+        """
+        Return the slowest shapes, by total time, maximum time or count.
+        """
+        with self._lock:
+            entries = [asdict(entry) for entry in self._statements.values()]
+
+        entries.sort(key=lambda entry: entry[order], reverse=True)
+
+        for entry in entries:
+            entry["total"] = round(entry["total"], 6)
+            entry["max"] = round(entry["max"], 6)
+
+        return entries[:limit]
+
+    def clear(self) -> None:
+        """
+        Forget every shape.
+        """
+        with self._lock:
+            self._statements.clear()
+
+
+def _before_cursor_execute(
+    conn: Connection,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    # Statements of a connection run one at a time; a failed one is overwritten by the next.
+    conn.info["querylog_started"] = time.perf_counter()
+
+
+def _explain(conn: Connection, statement: str, parameters: Any) -> str | None:
+    if isinstance(parameters, (list, tuple)) and parameters:
+        if isinstance(parameters[0], (dict, list, tuple)):
+            parameters = parameters[0]
+
+    # A failing EXPLAIN must not abort the transaction of the statement being explained.
+    cursor = conn.connection.dbapi_connection.cursor()
+
+    try:
+        cursor.execute("SAVEPOINT querylog_explain")
+
+        try:
+            cursor.execute(f"EXPLAIN {statement}", parameters or None)
+            plan = "\n".join(row[0] for row in cursor.fetchall())
+        except Exception:  # pylint: disable=broad-except
+            cursor.execute("ROLLBACK TO SAVEPOINT querylog_explain")
+            logger.debug("Unable to explain the statement", exc_info=True)
+            plan = None
+
+        cursor.execute("RELEASE SAVEPOINT querylog_explain")
+        return plan
+    except Exception:  # pylint: disable=broad-except
+        logger.debug("Unable to explain the statement", exc_info=True)
+        return None
+    finally:
+        cursor.close()
+
+
+_log: SlowQueryLog | None = None
+_log_lock = threading.Lock()
+
+
+def get_log() -> SlowQueryLog:
+    """
+    Return the slow statement log of the current process, configured from the settings.
+    """
+    global _log
+
+    with _log_lock:
+        if _log is None:
+            _log = SlowQueryLog(
+                threshold=settings.SLOW_QUERY_SECONDS,
+                max_shapes=settings.SLOW_QUERY_MAX_SHAPES,
+                explain=settings.SLOW_QUERY_EXPLAIN,
+                explain_interval=settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS,
+            )
+
+        return _log
@@ -54,3 +54,60 @@ def delete(db: Session, instance: types.Instance) -> None:
     """
     db.delete(instance)
     db.commit()
+
+
+def add(db: Session, instance: types.Instance) -> types.Instance:
+    """
+    Stage a new instance in the session without flushing or committing.
+
+    Args:
+        db (Session): SQLAlchemy session object.
+        instance (Instance): The SQLAlchemy model instance to stage.
+
+    Returns:
+        The staged instance.
+    """
+    db.add(instance)
+    return instance
+
+
+def remove(db: Session, instance: types.Instance) -> None:
+    """
+    Mark an existing instance for deletion without flushing or committing.
+
+    Args:
+        db (Session): SQLAlchemy session object.
+        instance (Instance): The SQLAlchemy model instance to delete.
+    """
+    db.delete(instance)
+
+
+def flush(db: Session) -> None:
+    """
+    Emit all pending changes of the session to the database, grouping statements of the same
+    kind into batched executions, without committing the transaction.
+
+    Args:
+        db (Session): SQLAlchemy session object.
+    """
+    db.flush()
+
+
+def commit(db: Session) -> None:
+    """
+    Commit the current transaction.
+
+    Args:
+        db (Session): SQLAlchemy session object.
+    """
+    db.commit()
+
+
+def rollback(db: Session) -> None:
+    """
+    Roll back the current transaction, discarding every pending change.
+
+    Args:
+        db (Session): SQLAlchemy session object.
+    """
+    db.rollback()
@@ -1,3 +1,154 @@
+import json
 import os
+import tempfile
 
-DATABASE_URL = os.environ["DATABASE_URL"]
+DATABASE_URL = os.environ.get("DATABASE_URL")
+
+# Connection pool of each worker process. A deployment opens up to
+# WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.environ.get("DB_POOL_TIMEOUT_SECONDS", "30"))
+# Startup warm-up of each worker: the pool is filled with DB_POOL_WARMUP_CONNECTIONS connections
+# and the hot statements are compiled before the worker reports itself ready. A failed warm-up is
+# retried every DB_WARMUP_RETRY_SECONDS.
+WARMUP_ENABLED = os.environ.get("WARMUP_ENABLED", "true").lower() == "true"
+DB_POOL_WARMUP_CONNECTIONS = int(os.environ.get("DB_POOL_WARMUP_CONNECTIONS", str(DB_POOL_SIZE)))
+DB_WARMUP_RETRY_SECONDS = float(os.environ.get("DB_WARMUP_RETRY_SECONDS", "2"))
+
+# Server entry point (python -m reactions.interfaces.server).
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = int(os.environ.get("PORT", "8000"))
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", "1"))
+
+# Batch validation into plain dicts (bulk imports). Lists of at least VALIDATION_PARALLEL_THRESHOLD
+# items are validated in chunks of VALIDATION_CHUNK_SIZE across a pool of VALIDATION_PROCESSES
+# processes; 0 means one per core and 1 validates in the caller.
+VALIDATION_PROCESSES = int(os.environ.get("VALIDATION_PROCESSES", "0"))
+VALIDATION_PARALLEL_THRESHOLD = int(os.environ.get("VALIDATION_PARALLEL_THRESHOLD", "5000"))
+VALIDATION_CHUNK_SIZE = int(os.environ.get("VALIDATION_CHUNK_SIZE", "2500"))
+
+# Upper bound on the number of operations accepted by a single batch request.
+BATCH_MAX_OPERATIONS = int(os.environ.get("BATCH_MAX_OPERATIONS", "1000"))
+# Operations committed per transaction by the batch endpoint. 0 applies the whole batch at once.
+BATCH_CHUNK_SIZE = int(os.environ.get("BATCH_CHUNK_SIZE", "0"))
+
+# Responses remembered for Idempotency-Key replays, and how long they are kept.
+IDEMPOTENCY_MAX_KEYS = int(os.environ.get("IDEMPOTENCY_MAX_KEYS", "10000"))
+IDEMPOTENCY_TTL_SECONDS = float(os.environ.get("IDEMPOTENCY_TTL_SECONDS", "86400"))
+
+# Admission control in front of the database pool. Read and write routes are limited separately;
+# requests over the limit wait in a bounded queue up to the timeout and are shed afterwards.
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_READ_LIMIT = int(os.environ.get("ADMISSION_READ_LIMIT", "10"))
+ADMISSION_READ_QUEUE = int(os.environ.get("ADMISSION_READ_QUEUE", "20"))
+ADMISSION_WRITE_LIMIT = int(os.environ.get("ADMISSION_WRITE_LIMIT", "5"))
+ADMISSION_WRITE_QUEUE = int(os.environ.get("ADMISSION_WRITE_QUEUE", "10"))
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_SECONDS", "2"))
+ADMISSION_RETRY_AFTER_SECONDS = int(os.environ.get("ADMISSION_RETRY_AFTER_SECONDS", "1"))
+
+# Single-flight coalescing of the user listing: identical concurrent requests share one database
+# read and its response. Followers wait for it at most COALESCING_WAIT_SECONDS, then read alone.
+COALESCING_ENABLED = os.environ.get("COALESCING_ENABLED", "true").lower() == "true"
+COALESCING_WAIT_SECONDS = float(os.environ.get("COALESCING_WAIT_SECONDS", "2"))
+
+# Gzip compression of responses of at least GZIP_MINIMUM_SIZE bytes, at GZIP_LEVEL (1-9).
+GZIP_ENABLED = os.environ.get("GZIP_ENABLED", "true").lower() == "true"
+GZIP_MINIMUM_SIZE = int(os.environ.get("GZIP_MINIMUM_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+
+# Request profiling (see `reactions.core.profiling`). With PROFILING_ENABLED, a
+# PROFILING_SAMPLE_RATE fraction of the requests is profiled and, with PROFILING_SLOW_SECONDS above
+# 0, every request is profiled and kept when at least that slow. A request with the
+# `X-Profile: <PROFILING_TOKEN>` header is always profiled. Stacks are sampled every
+# PROFILING_INTERVAL_SECONDS and the last PROFILING_MAX_DUMPS profiles are kept in
+# PROFILING_DIRECTORY.
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_SAMPLE_RATE = float(os.environ.get("PROFILING_SAMPLE_RATE", "0.01"))
+PROFILING_SLOW_SECONDS = float(os.environ.get("PROFILING_SLOW_SECONDS", "0"))
+PROFILING_TOKEN = os.environ.get("PROFILING_TOKEN", "")
+PROFILING_INTERVAL_SECONDS = float(os.environ.get("PROFILING_INTERVAL_SECONDS", "0.005"))
+PROFILING_MAX_DUMPS = int(os.environ.get("PROFILING_MAX_DUMPS", "100"))
+PROFILING_DIRECTORY = os.environ.get(
+    "PROFILING_DIRECTORY", os.path.join(tempfile.gettempdir(), "reactions-profiles")
+)
+
+# Slow statement log (see `reactions.core.querylog`). Statements taking at least
+# SLOW_QUERY_SECONDS (0 disables the log) are logged and aggregated in SLOW_QUERY_MAX_SHAPES
+# shapes. On PostgreSQL, SLOW_QUERY_EXPLAIN captures the plan of a slow shape at most once every
+# SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS.
+SLOW_QUERY_SECONDS = float(os.environ.get("SLOW_QUERY_SECONDS", "0.5"))
+SLOW_QUERY_MAX_SHAPES = int(os.environ.get("SLOW_QUERY_MAX_SHAPES", "200"))
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS = float(
+    os.environ.get("SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS", "300")
+)
+
+# Event loop monitor (see `reactions.core.loopmonitor`). With LOOP_MONITOR_ENABLED, every worker
+# measures the lag of its event loop every LOOP_MONITOR_INTERVAL_SECONDS, counts the stalls of at
+# least LOOP_BLOCKING_THRESHOLD_SECONDS by route and samples the threadpool and database pools.
+LOOP_MONITOR_ENABLED = os.environ.get("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+LOOP_MONITOR_INTERVAL_SECONDS = float(os.environ.get("LOOP_MONITOR_INTERVAL_SECONDS", "0.25"))
+LOOP_BLOCKING_THRESHOLD_SECONDS = float(os.environ.get("LOOP_BLOCKING_THRESHOLD_SECONDS", "0.1"))
+
+# Request deadlines. Every database-backed request gets REQUEST_DEADLINE_SECONDS unless its route
+# is listed in REQUEST_DEADLINES, a JSON object of "METHOD /path" to seconds.
+REQUEST_DEADLINE_SECONDS = float(os.environ.get("REQUEST_DEADLINE_SECONDS", "30"))
+REQUEST_DEADLINES = {
+    "GET /api/v1/users/": 10.0,
+    **json.loads(os.environ.get("REQUEST_DEADLINES", "{}")),
+}
+# How often a running request checks its deadline and whether the client disconnected.
+REQUEST_DEADLINE_POLL_SECONDS = float(os.environ.get("REQUEST_DEADLINE_POLL_SECONDS", "0.05"))
+
+# Users loaded per chunk by the reaction analytics.
+ANALYTICS_CHUNK_SIZE = int(os.environ.get("ANALYTICS_CHUNK_SIZE", "100000"))
+
+# Change feed. EVENTS_BROKER is "memory" (in-process fan-out), "postgres" (LISTEN/NOTIFY) or
+# "auto" (postgres when the database is PostgreSQL). Every subscriber buffers at most
+# EVENTS_SUBSCRIBER_BUFFER events; EVENTS_REPLAY_SIZE recent events are kept for Last-Event-ID.
+EVENTS_BROKER = os.environ.get("EVENTS_BROKER", "auto")
+EVENTS_CHANNEL = os.environ.get("EVENTS_CHANNEL", "reactions_events")
+EVENTS_SUBSCRIBER_BUFFER = int(os.environ.get("EVENTS_SUBSCRIBER_BUFFER", "1000"))
+EVENTS_REPLAY_SIZE = int(os.environ.get("EVENTS_REPLAY_SIZE", "10000"))
+EVENTS_HEARTBEAT_SECONDS = float(os.environ.get("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+# Largest page of the paginated user listing.
+USERS_MAX_PAGE_SIZE = int(os.environ.get("USERS_MAX_PAGE_SIZE", "1000"))
+
+# Username prefix search. With SEARCH_INDEX_ENABLED, every worker keeps the usernames and their
+# ranking fields in a sorted in-memory index, kept current from the change events and rebuilt
+# every SEARCH_INDEX_REFRESH_SECONDS to pick up the writes that publish none (imports, archival).
+SEARCH_MAX_RESULTS = int(os.environ.get("SEARCH_MAX_RESULTS", "50"))
+SEARCH_INDEX_ENABLED = os.environ.get("SEARCH_INDEX_ENABLED", "false").lower() == "true"
+SEARCH_INDEX_REFRESH_SECONDS = float(os.environ.get("SEARCH_INDEX_REFRESH_SECONDS", "600"))
+
+# Page size of the user change feed used for incremental synchronization.
+CHANGES_PAGE_SIZE = int(os.environ.get("CHANGES_PAGE_SIZE", "500"))
+CHANGES_MAX_PAGE_SIZE = int(os.environ.get("CHANGES_MAX_PAGE_SIZE", "5000"))
+
+# Optional hash sharding. DATABASE_SHARD_URLS is a comma-separated list of database URLs; rows
+# are distributed by a consistent hash of their username over SHARD_VIRTUAL_NODES points per
+# shard. New shards are appended to the list, followed by a run of the rebalance command.
+DATABASE_SHARD_URLS = [url for url in os.environ.get("DATABASE_SHARD_URLS", "").split(",") if url]
+SHARD_VIRTUAL_NODES = int(os.environ.get("SHARD_VIRTUAL_NODES", "256"))
+
+# Hot/cold storage of users (see `reactions.domains.users.archival`). Users that neither reacted
+# nor were written for ARCHIVE_INACTIVE_DAYS are moved to the archive table, ARCHIVE_BATCH_SIZE
+# per transaction, by the archive command or the "archive_users" job.
+ARCHIVE_INACTIVE_DAYS = int(os.environ.get("ARCHIVE_INACTIVE_DAYS", "365"))
+ARCHIVE_BATCH_SIZE = int(os.environ.get("ARCHIVE_BATCH_SIZE", "1000"))
+
+# Background jobs (imports, exports, backfills). JOBS_WORKERS workers run as threads or, with
+# JOBS_EXECUTION=process, as processes; JOBS_IN_APP starts them in every application worker,
+# otherwise they run from `python -m reactions.interfaces.worker`. A running job whose worker has
+# not sent a heartbeat for JOBS_STALE_SECONDS is claimed again and resumes from its checkpoint, at
+# most JOBS_MAX_ATTEMPTS times. Uploads and results are stored under JOBS_DIRECTORY.
+JOBS_IN_APP = os.environ.get("JOBS_IN_APP", "true").lower() == "true"
+JOBS_WORKERS = int(os.environ.get("JOBS_WORKERS", "1"))
+JOBS_EXECUTION = os.environ.get("JOBS_EXECUTION", "thread")
+JOBS_POLL_SECONDS = float(os.environ.get("JOBS_POLL_SECONDS", "1"))
+JOBS_HEARTBEAT_SECONDS = float(os.environ.get("JOBS_HEARTBEAT_SECONDS", "10"))
+JOBS_STALE_SECONDS = float(os.environ.get("JOBS_STALE_SECONDS", "60"))
+JOBS_MAX_ATTEMPTS = int(os.environ.get("JOBS_MAX_ATTEMPTS", "3"))
+JOBS_DIRECTORY = os.environ.get("JOBS_DIRECTORY", os.path.join(tempfile.gettempdir(), "reactions"))
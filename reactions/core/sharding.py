@@ -0,0 +1,171 @@
+"""
+Hash sharding of rows across several databases.
+
+Rows carrying a `username` column (users and their tombstones) are distributed over the shards
+by a consistent hash of the normalized username; every other table lives on the first shard.
+Appending a shard only moves the rows whose hash now falls on it, about 1/N of them, which the
+rebalance command copies over.
+
+`Shards` holds the engines and the ring; `ShardedSession` routes the statements of a session
+through them:
+
+- writes go to the shard of the username of the instance being flushed;
+- statements with a `username` (or `usernames`) bound parameter go to the matching shards;
+- other statements on sharded tables are sent to every shard and their results concatenated.
+
+A session transaction touching several shards commits them one after the other: the commit is
+atomic per shard, not across shards.
+"""
+
+import bisect
+import hashlib
+from typing import Any, Dict, Iterable, List
+
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext import horizontal_shard
+from sqlalchemy.orm import Mapper, ORMExecuteState
+from sqlalchemy.sql.util import find_tables
+
+from reactions.core import settings
+
+KEY = "username"
+
+
+def normalize(key: str) -> str:
+    """
+    Normalize a shard key, so that usernames differing only by case share a shard.
+    """
+    return key.strip().lower()
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring mapping keys to shard ids.
+
+    Args:
+        shard_ids (Iterable[str]): Shard identifiers.
+        virtual_nodes (int): Points of every shard on the ring.
+    """
+
+    def __init__(self, shard_ids: Iterable[str], virtual_nodes: int = settings.SHARD_VIRTUAL_NODES):
+        points = sorted(
+            (_hash(f"{shard_id}#{node}"), shard_id)
+            for shard_id in shard_ids
+            for node in range(virtual_nodes)
+        )
+
+        if not points:
+            raise ValueError("A hash ring needs at least one shard.")
+
+        self._hashes = [point for point, _ in points]
+        self._shard_ids = [shard_id for _, shard_id in points]
+
+    def shard_for(self, key: str) -> str:
+        """
+        Return the shard id of a key.
+        """
+        index = bisect.bisect(self._hashes, _hash(normalize(key))) % len(self._hashes)
+        return self._shard_ids[index]
+
+
+class Shards:
+    """
+    Engines of the shards and the ring distributing rows over them.
+
+    Shard ids are the positions of the engines ("0", "1", ...), so the list of shards must only
+    ever be appended to.
+
+    Args:
+        engines (List[Engine]): One engine per shard, in configuration order.
+        virtual_nodes (int): Points of every shard on the ring.
+    """
+
+    def __init__(self, engines: List[Engine], virtual_nodes: int = settings.SHARD_VIRTUAL_NODES):
+        self.engines: Dict[str, Engine] = {
+            str(index): engine for index, engine in enumerate(engines)
+        }
+        self.ids = list(self.engines)
+        self.default = self.ids[0]
+        self.ring = HashRing(self.ids, virtual_nodes)
+
+    def shard_for(self, key: str) -> str:
+        """
+        Return the shard id of a username.
+        """
+        return self.ring.shard_for(key)
+
+    def dispose(self) -> None:
+        """
+        Dispose of the engine of every shard.
+        """
+        for engine in self.engines.values():
+            engine.dispose()
+
+    def shard_chooser(self, mapper: Mapper | None, instance: Any, **kw: Any) -> str:
+        key = getattr(instance, KEY, None)
+        return self.default if key is None else self.shard_for(key)
+
+    def identity_chooser(self, mapper: Mapper, primary_key: Any, **kw: Any) -> List[str]:
+        if KEY in mapper.columns:
+            return self.ids
+        return [self.default]
+
+    def execute_chooser(self, context: ORMExecuteState) -> List[str]:
+        parameters = context.parameters
+
+        if isinstance(parameters, dict):
+            if KEY in parameters:
+                return [self.shard_for(parameters[KEY])]
+
+            if f"{KEY}s" in parameters:
+                return sorted({self.shard_for(key) for key in parameters[f"{KEY}s"]})
+
+        tables = find_tables(context.statement, include_crud=True)
+
+        if any(KEY in table.c for table in tables):
+            return self.ids
+
+        return [self.default]
+
+
+def engines_of(target: Engine | Shards) -> List[Engine]:
+    """
+    Return the engines of a database: the engine itself, or the engine of every shard.
+    """
+    if isinstance(target, Shards):
+        return list(target.engines.values())
+
+    return [target]
+
+
+class ShardedSession(horizontal_shard.ShardedSession):
+    """
+    Session routing its statements through a set of shards.
+
+    Args:
+        shards (Shards): The shards.
+        **kwargs: Other `Session` arguments.
+    """
+
+    def __init__(self, shards: Shards, **kwargs: Any):
+        super().__init__(
+            shards=shards.engines,
+            shard_chooser=shards.shard_chooser,
+            identity_chooser=shards.identity_chooser,
+            execute_chooser=shards.execute_chooser,
+            **kwargs,
+        )
+        self.shard_set = shards
+
+    def shard_connections(self) -> List[Connection]:
+        """
+        Return the connection of the session to every shard.
+        """
+        return [
+            self.connection(bind_arguments={"shard_id": shard_id})
+            for shard_id in self.shard_set.ids
+        ]
@@ -0,0 +1,71 @@
+"""
+Change versions for incremental synchronization.
+
+Every write stamps the rows it touches with a change version; readers ask for the rows whose
+version is greater than the last one they have seen. Versions only increase, but a version is
+not unique: the rows written by one transaction may share it, so readers page by
+`(version, id)`.
+
+- On PostgreSQL the version is the 64-bit id of the writing transaction. Transactions commit in
+  any order, so readers must stop at the `watermark`: the oldest transaction still running. Every
+  version below it belongs to a finished transaction and will never appear later.
+- On other databases (SQLite) writers are serialized, so the version is simply the highest
+  version in use plus one and there is no watermark.
+"""
+
+from typing import Any
+
+from sqlalchemy import BigInteger, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.elements import ColumnClause
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class next_version(FunctionElement):  # pylint: disable=invalid-name,too-many-ancestors
+    """
+    SQL expression producing the change version of a write.
+
+    Args:
+        *columns (ColumnClause): Version columns sharing the same sequence of versions; the
+            fallback implementation continues after the highest of them.
+    """
+
+    type = BigInteger()
+    name = "next_version"
+    inherit_cache = True
+
+    def __init__(self, *columns: ColumnClause):
+        super().__init__(*columns)
+
+
+@compiles(next_version, "postgresql")
+def _next_version_postgresql(element: next_version, compiler: Any, **kw: Any) -> str:
+    return "pg_current_xact_id()::text::bigint"
+
+
+@compiles(next_version)
+def _next_version(element: next_version, compiler: Any, **kw: Any) -> str:
+    preparer = compiler.preparer
+    maxima = " UNION ALL ".join(
+        f"SELECT max({preparer.quote(column.name)}) AS version "
+        f"FROM {preparer.format_table(column.table)}"
+        for column in element.clauses
+    )
+    return f"(SELECT coalesce(max(version), 0) + 1 FROM ({maxima}) AS versions)"
+
+
+def watermark(connection: Connection) -> int | None:
+    """
+    Return the version below which no more changes can be committed.
+
+    Args:
+        connection (Connection): Connection used by the reader.
+
+    Returns:
+        int | None: The watermark, or None when versions are assigned in commit order.
+    """
+    if connection.dialect.name != "postgresql":
+        return None
+
+    return connection.scalar(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint"))
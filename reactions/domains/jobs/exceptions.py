@@ -0,0 +1,66 @@
+"""
+Custom exceptions for the Jobs module.
+"""
+
+from typing import Any, Dict, List
+
+
+class UnknownJobKind(Exception):
+    """
+    Raised when a job of an unsupported kind is submitted.
+    """
+
+    def __init__(self, kind: str, kinds: List[str]):
+        super().__init__(f"The job kind '{kind}' is unknown; expected one of {', '.join(kinds)}.")
+        self.kind = kind
+
+
+class InvalidJobParams(Exception):
+    """
+    Raised when the parameters of a submitted job are invalid.
+    """
+
+    def __init__(self, kind: str, errors: List[Dict[str, Any]]):
+        super().__init__(f"The parameters of the '{kind}' job are invalid.")
+        self.kind = kind
+        self.errors = errors
+
+
+class JobDoesNotExist(Exception):
+    """
+    Raised when a job with the specified id does not exist.
+    """
+
+    def __init__(self):
+        super().__init__("A job with the specified id does not exist.")
+
+
+class JobNotFinished(Exception):
+    """
+    Raised when the result of a job that has not succeeded is requested.
+    """
+
+    def __init__(self, status: str, error: str | None = None):
+        message = f"The job is {status}"
+        super().__init__(f"{message}: {error}" if error else f"{message}; it has no result yet.")
+        self.status = status
+
+
+class JobFileDoesNotExist(Exception):
+    """
+    Raised when a file that a job did not produce is requested.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(f"The job did not produce a file named '{name}'.")
+        self.name = name
+
+
+class JobLost(Exception):
+    """
+    Raised in a worker whose job was claimed by another worker after missing its heartbeats.
+    """
+
+    def __init__(self, job_id: str):
+        super().__init__(f"The job '{job_id}' is now held by another worker.")
+        self.job_id = job_id
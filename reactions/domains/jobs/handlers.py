@@ -0,0 +1,215 @@
+"""
+Handlers of background jobs.
+
+A handler runs one kind of job. It receives a `JobContext` holding the validated parameters, the
+checkpoint saved by a previous attempt (None on the first one) and the storage of the users, and
+returns the result of the job. Handlers work in chunks and save a checkpoint after every chunk, so
+that a job claimed again after its worker died resumes where it stopped instead of starting over.
+
+Handlers are registered by kind in `HANDLERS`.
+"""
+
+import dataclasses
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Type
+
+from pydantic import BaseModel
+from sqlalchemy.engine import Engine
+
+from reactions.core import settings, sharding
+from reactions.domains.jobs import schemas
+from reactions.domains.users import archival, exports, imports
+
+UPLOADS = "uploads"
+
+
+def job_directory(job_id: str) -> str:
+    """
+    Return the directory holding the files produced by a job.
+    """
+    return os.path.join(settings.JOBS_DIRECTORY, job_id)
+
+
+def upload_path(name: str) -> str:
+    """
+    Return the path of an uploaded file.
+    """
+    return os.path.join(settings.JOBS_DIRECTORY, UPLOADS, name)
+
+
+class JobContext:
+    """
+    What a handler knows about the job it runs.
+
+    Attributes:
+        job_id (str): Identifier of the job.
+        params (BaseModel): Validated parameters of the job.
+        checkpoint (Dict[str, Any] | None): Checkpoint saved by the previous attempt, if any.
+        storage (Engine | sharding.Shards): Engine of the users database, or its shards.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        params: BaseModel,
+        checkpoint: Dict[str, Any] | None,
+        storage: Engine | sharding.Shards,
+        save: Callable[[Dict[str, Any], int, int | None], None],
+    ):
+        self.job_id = job_id
+        self.params = params
+        self.checkpoint = checkpoint
+        self.storage = storage
+        self._save = save
+        self._lock = threading.Lock()
+
+    def save(self, checkpoint: Dict[str, Any], done: int, total: int | None = None) -> None:
+        """
+        Persist a checkpoint and the progress of the job. Safe to call from several threads.
+
+        Args:
+            checkpoint (Dict[str, Any]): JSON-serializable state to resume from.
+            done (int): Units of work done.
+            total (int | None): Units of work expected, when known.
+
+        Raises:
+            exceptions.JobLost: If another worker claimed the job in the meantime.
+        """
+        with self._lock:
+            self._save(checkpoint, done, total)
+            self.checkpoint = checkpoint
+
+    def path(self, name: str) -> str:
+        """
+        Return the path of a file produced by the job, creating its directory if needed.
+        """
+        directory = job_directory(self.job_id)
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, name)
+
+
+@dataclasses.dataclass(frozen=True)
+class Handler:
+    """
+    A kind of job.
+
+    Attributes:
+        params (Type[BaseModel]): Schema of the parameters, checked on submission.
+        run (Callable[[JobContext], schemas.JobResult]): Runs the job.
+    """
+
+    params: Type[BaseModel]
+    run: Callable[[JobContext], schemas.JobResult]
+
+
+def import_users(context: JobContext) -> schemas.JobResult:
+    """
+    Import an uploaded file of users, checkpointing after every committed chunk.
+
+    Rejected records are appended to `rejects.ndjson`; its size is part of the checkpoint, so the
+    rejections of a chunk interrupted before its checkpoint are not reported twice.
+    """
+    params: schemas.ImportUsersParams = context.params
+    file_format = params.format or (
+        imports.NDJSON if params.upload.endswith(".ndjson") else imports.CSV
+    )
+    checkpoint = context.checkpoint or {}
+    resume = imports.ImportReport(**checkpoint["report"]) if checkpoint else None
+
+    with open(upload_path(params.upload), newline="", encoding="utf-8") as stream, open(
+        context.path("rejects.ndjson"), "a+", encoding="utf-8"
+    ) as rejects:
+        rejects.truncate(checkpoint.get("rejects_size", 0))
+        rejects.seek(0, os.SEEK_END)
+
+        def on_reject(rejection: imports.Rejection) -> None:
+            rejects.write(json.dumps(dataclasses.asdict(rejection), default=str) + "\n")
+
+        def on_chunk(report: imports.ImportReport) -> None:
+            rejects.flush()
+            context.save(
+                {"report": dataclasses.asdict(report), "rejects_size": rejects.tell()},
+                done=report.read,
+            )
+
+        report = imports.import_users(
+            engine=context.storage,
+            stream=stream,
+            file_format=file_format,
+            chunk_size=params.chunk_size,
+            on_conflict=params.on_conflict,
+            on_reject=on_reject,
+            resume=resume,
+            on_chunk=on_chunk,
+        )
+
+    return schemas.JobResult(
+        data=dataclasses.asdict(report),
+        files=["rejects.ndjson"] if report.rejected else [],
+    )
+
+
+def export_users(context: JobContext) -> schemas.JobResult:
+    """
+    Export every user to part files, checkpointing after every finished part.
+    """
+    params: schemas.ExportUsersParams = context.params
+    extension = {exports.CSV: "csv", exports.PARQUET: "parquet"}[params.format]
+
+    if params.format == exports.CSV and params.compression == exports.GZIP:
+        extension += ".gz"
+
+    # JSON object keys are strings.
+    parts = {
+        int(index): rows for index, rows in (context.checkpoint or {}).get("parts", {}).items()
+    }
+    lock = threading.Lock()
+
+    # Parts are exported concurrently.
+    def on_part(index: int, rows: int) -> None:
+        with lock:
+            parts[index] = rows
+            context.save({"parts": dict(parts)}, done=sum(parts.values()))
+
+    report = exports.export_users(
+        engine=context.storage,
+        path=context.path(f"users.{extension}"),
+        file_format=params.format,
+        compression=params.compression,
+        partitions=params.partitions,
+        skip=set(parts),
+        on_part=on_part,
+        include_archived=params.include_archived,
+    )
+
+    return schemas.JobResult(
+        data={"rows": sum(parts.values()), "elapsed": report.elapsed},
+        files=[os.path.basename(path) for path in report.paths],
+    )
+
+
+def archive_users(context: JobContext) -> schemas.JobResult:
+    """
+    Move inactive users to the archive, checkpointing after every committed batch.
+    """
+    params: schemas.ArchiveUsersParams = context.params
+    resume = archival.ArchiveReport(**context.checkpoint) if context.checkpoint else None
+
+    report = archival.archive_users(
+        engine=context.storage,
+        inactive_days=params.inactive_days,
+        batch_size=params.batch_size,
+        resume=resume,
+        on_batch=lambda report: context.save(dataclasses.asdict(report), done=report.archived),
+    )
+
+    return schemas.JobResult(data=dataclasses.asdict(report))
+
+
+HANDLERS: Dict[str, Handler] = {
+    "import_users": Handler(params=schemas.ImportUsersParams, run=import_users),
+    "export_users": Handler(params=schemas.ExportUsersParams, run=export_users),
+    "archive_users": Handler(params=schemas.ArchiveUsersParams, run=archive_users),
+}
@@ -0,0 +1,136 @@
+"""
+Business logic and process handling for the Jobs module.
+
+Jobs are submitted and polled through the database; they are run by the workers of
+`reactions.domains.jobs.runner`.
+"""
+
+import os
+import shutil
+import uuid
+from typing import IO
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from reactions.apps.jobs import constants, models
+from reactions.core import repository
+from reactions.domains.jobs import exceptions, handlers, queries, schemas
+
+
+def submit_job(db: Session, job_data: schemas.JobCreate) -> models.Job:
+    """
+    Validate and enqueue a job.
+
+    Args:
+        db (Session): Database session.
+        job_data (schemas.JobCreate): Kind and parameters of the job.
+
+    Returns:
+        models.Job: The pending job.
+
+    Raises:
+        exceptions.UnknownJobKind: If no handler runs jobs of that kind.
+        exceptions.InvalidJobParams: If the parameters do not match the kind of job.
+    """
+    handler = handlers.HANDLERS.get(job_data.kind)
+
+    if handler is None:
+        raise exceptions.UnknownJobKind(kind=job_data.kind, kinds=list(handlers.HANDLERS))
+
+    try:
+        params = handler.params.model_validate(job_data.params)
+    except ValidationError as e:
+        raise exceptions.InvalidJobParams(
+            kind=job_data.kind, errors=e.errors(include_url=False, include_context=False)
+        ) from e
+
+    instance = models.Job.new(kind=job_data.kind, params=params.model_dump(mode="json"))
+
+    return repository.create(db=db, instance=instance)
+
+
+def _fetch_job(db: Session, job_id: str) -> models.Job:
+    job = queries.fetch_job(db=db, job_id=job_id)
+
+    if job is None:
+        raise exceptions.JobDoesNotExist()
+
+    return job
+
+
+def retrieve_job(db: Session, job_id: str) -> schemas.JobRetrieve:
+    """
+    Retrieve the status and progress of a job.
+
+    Raises:
+        exceptions.JobDoesNotExist: If there is no such job.
+    """
+    job = _fetch_job(db=db, job_id=job_id)
+
+    return schemas.JobRetrieve(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        params=job.params,
+        progress=schemas.JobProgress(done=job.progress_done, total=job.progress_total),
+        attempts=job.attempts,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+def retrieve_job_result(db: Session, job_id: str) -> schemas.JobResult:
+    """
+    Retrieve the result of a succeeded job.
+
+    Raises:
+        exceptions.JobDoesNotExist: If there is no such job.
+        exceptions.JobNotFinished: If the job is still pending, running, or failed.
+    """
+    job = _fetch_job(db=db, job_id=job_id)
+
+    if job.status != constants.JobStatus.SUCCEEDED:
+        raise exceptions.JobNotFinished(status=job.status.value, error=job.error)
+
+    return schemas.JobResult.model_validate(job.result)
+
+
+def retrieve_job_file(db: Session, job_id: str, name: str) -> str:
+    """
+    Return the path of a file produced by a succeeded job.
+
+    Raises:
+        exceptions.JobDoesNotExist: If there is no such job.
+        exceptions.JobNotFinished: If the job has not succeeded.
+        exceptions.JobFileDoesNotExist: If the job did not produce that file.
+    """
+    result = retrieve_job_result(db=db, job_id=job_id)
+
+    if name not in result.files:
+        raise exceptions.JobFileDoesNotExist(name=name)
+
+    return os.path.join(handlers.job_directory(job_id), name)
+
+
+def save_upload(stream: IO[bytes], extension: str) -> str:
+    """
+    Store an uploaded file for a later job.
+
+    Args:
+        stream (IO[bytes]): Content of the file.
+        extension (str): Extension of the file, telling its format (e.g., "csv").
+
+    Returns:
+        str: Name of the stored file, to be passed to the job.
+    """
+    name = f"{uuid.uuid4()}.{extension}"
+    path = handlers.upload_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    with open(path, "wb") as upload:
+        shutil.copyfileobj(stream, upload)
+
+    return name
@@ -0,0 +1,132 @@
+"""
+Database query functions for the Jobs module.
+
+Workers coordinate through the jobs table only. A job is claimed with a conditional update that
+succeeds for a single worker; on PostgreSQL the candidate is selected with `FOR UPDATE SKIP
+LOCKED` so that concurrent workers do not queue behind each other's row locks. Every later write
+of a worker is fenced by its name: once another worker has claimed a stale job, the writes of the
+previous holder match no row.
+"""
+
+from datetime import datetime
+from typing import Any, Dict
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from reactions.apps.jobs import constants, models
+
+
+def fetch_job(db: Session, job_id: str) -> models.Job | None:
+    """
+    Fetch a job by id.
+
+    Args:
+        db (Session): Database session.
+        job_id (str): Identifier of the job.
+
+    Returns:
+        models.Job | None: The job, or None if it does not exist.
+    """
+    return db.get(models.Job, job_id)
+
+
+def _claimable(stale_before: datetime) -> Any:
+    return or_(
+        models.Job.status == constants.JobStatus.PENDING,
+        and_(
+            models.Job.status == constants.JobStatus.RUNNING,
+            models.Job.heartbeat_at < stale_before,
+        ),
+    )
+
+
+def claim_job(db: Session, worker: str, now: datetime, stale_before: datetime) -> str | None:
+    """
+    Claim the oldest pending job, or a running job whose worker stopped sending heartbeats.
+
+    The caller commits the claim.
+
+    Args:
+        db (Session): Database session.
+        worker (str): Name of the claiming worker.
+        now (datetime): Current time, stored as start and heartbeat of the job.
+        stale_before (datetime): Running jobs without heartbeat since then are claimed again.
+
+    Returns:
+        str | None: Identifier of the claimed job, or None if there is nothing to run.
+    """
+    job_id = db.scalars(
+        select(models.Job.id)
+        .where(_claimable(stale_before))
+        .order_by(models.Job.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).first()
+
+    if job_id is None:
+        return None
+
+    claimed = db.execute(
+        update(models.Job)
+        .where(models.Job.id == job_id, _claimable(stale_before))
+        .values(
+            status=constants.JobStatus.RUNNING,
+            worker=worker,
+            attempts=models.Job.attempts + 1,
+            started_at=func.coalesce(models.Job.started_at, now),
+            heartbeat_at=now,
+        )
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+    return job_id if claimed else None
+
+
+def update_held_job(db: Session, job_id: str, worker: str, **values: Any) -> bool:
+    """
+    Update a running job if the worker still holds it. The caller commits the update.
+
+    Args:
+        db (Session): Database session.
+        job_id (str): Identifier of the job.
+        worker (str): Name of the worker expected to hold the job.
+        **values: Columns to set.
+
+    Returns:
+        bool: Whether the worker still held the job.
+    """
+    result = db.execute(
+        update(models.Job)
+        .where(
+            models.Job.id == job_id,
+            models.Job.worker == worker,
+            models.Job.status == constants.JobStatus.RUNNING,
+        )
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def save_checkpoint(
+    db: Session,
+    job_id: str,
+    worker: str,
+    now: datetime,
+    checkpoint: Dict[str, Any],
+    done: int,
+    total: int | None = None,
+) -> bool:
+    """
+    Save the checkpoint and progress of a running job. The caller commits them.
+
+    Returns:
+        bool: Whether the worker still held the job.
+    """
+    values: Dict[str, Any] = {"checkpoint": checkpoint, "progress_done": done, "heartbeat_at": now}
+
+    if total is not None:
+        values["progress_total"] = total
+
+    return update_held_job(db, job_id, worker, **values)
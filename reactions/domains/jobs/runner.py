@@ -0,0 +1,290 @@
+"""
+Workers running background jobs.
+
+A `Worker` polls the jobs table, claims the oldest pending job and runs its handler outside of
+any request. While the handler runs, a heartbeat thread refreshes `heartbeat_at`; a job whose
+worker died (crash, deployment, OOM kill) stops receiving heartbeats and is claimed again by
+another worker after JOBS_STALE_SECONDS, resuming from the last checkpoint of its handler. Jobs
+claimed more than JOBS_MAX_ATTEMPTS times are failed instead. A handler raising an exception fails
+its job right away.
+
+A `WorkerPool` runs JOBS_WORKERS workers as threads of the current process or, with
+JOBS_EXECUTION=process, as processes of their own (started with `spawn`, each creating its own
+engine). The pool is started by the application lifespan when JOBS_IN_APP is set, or on its own
+by `python -m reactions.interfaces.worker`.
+"""
+
+import functools
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from reactions.apps.jobs import constants
+from reactions.core import database, querylog, settings, sharding
+from reactions.domains.jobs import exceptions, handlers, queries
+
+logger = logging.getLogger(__name__)
+
+THREAD = "thread"
+PROCESS = "process"
+EXECUTIONS = (THREAD, PROCESS)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class Worker:
+    """
+    Claims and runs jobs, one at a time.
+
+    Args:
+        name (str | None): Name recorded on the jobs held by the worker. Defaults to a name
+            unique to the host, process and worker.
+        job_handlers (Dict[str, handlers.Handler] | None): Handlers by kind. Defaults to
+            `handlers.HANDLERS`.
+        storage (Engine | sharding.Shards | None): Storage of the users handed to the handlers.
+            Defaults to the engine, or the shards, of the current process.
+        session_factory (Callable[[], Session] | None): Sessions used to read and update the jobs.
+            Defaults to `database.SessionLocal`.
+    """
+
+    def __init__(
+        self,
+        name: str | None = None,
+        job_handlers: Dict[str, handlers.Handler] | None = None,
+        storage: Engine | sharding.Shards | None = None,
+        session_factory: Callable[[], Session] | None = None,
+    ):
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.handlers = job_handlers or handlers.HANDLERS
+        self._storage = storage
+        self._session_factory = session_factory
+
+    @property
+    def storage(self) -> Engine | sharding.Shards:
+        if self._storage is not None:
+            return self._storage
+
+        engine = database.init_engine()
+        return database.shards or engine
+
+    def _session(self) -> Session:
+        if self._session_factory is not None:
+            return self._session_factory()
+
+        database.init_engine()
+        return database.SessionLocal()
+
+    def run_once(self) -> str | None:
+        """
+        Claim a job and run it to completion.
+
+        Returns:
+            str | None: Identifier of the job run, or None if there was nothing to run.
+        """
+        now = _now()
+
+        with self._session() as db:
+            job_id = queries.claim_job(
+                db,
+                worker=self.name,
+                now=now,
+                stale_before=now - timedelta(seconds=settings.JOBS_STALE_SECONDS),
+            )
+            db.commit()
+
+            if job_id is None:
+                return None
+
+            job = queries.fetch_job(db, job_id)
+            kind, params, checkpoint, attempts = job.kind, job.params, job.checkpoint, job.attempts
+
+        handler = self.handlers.get(kind)
+
+        if attempts > settings.JOBS_MAX_ATTEMPTS:
+            self._finish(job_id, error=f"The job was abandoned after {attempts - 1} attempts.")
+            return job_id
+        if handler is None:
+            self._finish(job_id, error=f"No handler runs jobs of kind '{kind}'.")
+            return job_id
+
+        logger.info("Running job %s (%s), attempt %s", job_id, kind, attempts)
+        stopped = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(job_id, stopped), daemon=True)
+        heartbeat.start()
+
+        route = querylog.route.set(f"job {kind}")
+
+        try:
+            context = handlers.JobContext(
+                job_id=job_id,
+                params=handler.params.model_validate(params),
+                checkpoint=checkpoint,
+                storage=self.storage,
+                save=functools.partial(self._save, job_id),
+            )
+            result = handler.run(context)
+        except exceptions.JobLost:
+            logger.warning("Job %s was claimed by another worker", job_id)
+        except Exception as e:  # pylint: disable=broad-except
+            logger.exception("Job %s failed", job_id)
+            self._finish(job_id, error=str(e) or type(e).__name__)
+        else:
+            self._finish(job_id, result=result.model_dump(mode="json"))
+        finally:
+            querylog.route.reset(route)
+            stopped.set()
+            heartbeat.join()
+
+        return job_id
+
+    def run(self, stop: Any, poll_interval: float | None = None) -> None:
+        """
+        Run jobs until `stop` is set, waiting `poll_interval` seconds whenever there is none.
+
+        Args:
+            stop (threading.Event | multiprocessing.Event): Stops the worker once its current
+                job is done.
+            poll_interval (float | None): Defaults to JOBS_POLL_SECONDS.
+        """
+        poll_interval = settings.JOBS_POLL_SECONDS if poll_interval is None else poll_interval
+
+        while not stop.is_set():
+            try:
+                job_id = self.run_once()
+            except SQLAlchemyError:
+                logger.warning("Unable to claim a job", exc_info=True)
+                job_id = None
+
+            if job_id is None:
+                stop.wait(poll_interval)
+
+    def _update(self, job_id: str, **values: Any) -> bool:
+        with self._session() as db:
+            held = queries.update_held_job(db, job_id, self.name, **values)
+            db.commit()
+
+        return held
+
+    def _save(self, job_id: str, checkpoint: Dict[str, Any], done: int, total: int | None) -> None:
+        with self._session() as db:
+            held = queries.save_checkpoint(
+                db, job_id, self.name, _now(), checkpoint=checkpoint, done=done, total=total
+            )
+            db.commit()
+
+        if not held:
+            raise exceptions.JobLost(job_id)
+
+    def _finish(
+        self,
+        job_id: str,
+        result: Dict[str, Any] | None = None,
+        error: str | None = None,
+    ) -> None:
+        status = constants.JobStatus.FAILED if error else constants.JobStatus.SUCCEEDED
+
+        if not self._update(job_id, status=status, result=result, error=error, finished_at=_now()):
+            logger.warning("Job %s was claimed by another worker before it finished", job_id)
+
+    def _heartbeat(self, job_id: str, stopped: threading.Event) -> None:
+        while not stopped.wait(settings.JOBS_HEARTBEAT_SECONDS):
+            try:
+                if not self._update(job_id, heartbeat_at=_now()):
+                    return
+            except SQLAlchemyError:
+                logger.warning("Unable to send the heartbeat of job %s", job_id, exc_info=True)
+
+
+def _serve(stop: Any) -> None:
+    # Entry point of worker processes: every process creates its own engine.
+    database.init_engine()
+
+    try:
+        Worker().run(stop)
+    finally:
+        database.dispose_engine()
+
+
+class WorkerPool:
+    """
+    Runs workers in the background.
+
+    Args:
+        workers (int): Number of workers. Defaults to JOBS_WORKERS.
+        execution (str): "thread" or "process". Defaults to JOBS_EXECUTION.
+
+    Raises:
+        ValueError: If the execution is not supported.
+    """
+
+    def __init__(self, workers: int | None = None, execution: str | None = None):
+        self.workers = settings.JOBS_WORKERS if workers is None else workers
+        self.execution = execution or settings.JOBS_EXECUTION
+
+        if self.execution not in EXECUTIONS:
+            raise ValueError(f"Jobs run as 'thread' or 'process', not '{self.execution}'.")
+
+        self._stop: Any = None
+        self._runners: List[threading.Thread | multiprocessing.process.BaseProcess] = []
+
+    def start(self) -> None:
+        """
+        Start the workers.
+        """
+        if self.execution == PROCESS:
+            context = multiprocessing.get_context("spawn")
+            self._stop = context.Event()
+            self._runners = [
+                context.Process(target=_serve, args=(self._stop,), name=f"jobs-worker-{index}")
+                for index in range(self.workers)
+            ]
+        else:
+            self._stop = threading.Event()
+            self._runners = [
+                threading.Thread(
+                    target=Worker().run,
+                    args=(self._stop,),
+                    name=f"jobs-worker-{index}",
+                    daemon=True,
+                )
+                for index in range(self.workers)
+            ]
+
+        for runner in self._runners:
+            runner.start()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """
+        Ask the workers to stop after their current job and wait for them.
+
+        A job still running after `timeout` seconds is abandoned; it is resumed from its last
+        checkpoint once its heartbeats are stale.
+
+        Args:
+            timeout (float | None): Seconds to wait for every worker. Defaults to
+                JOBS_HEARTBEAT_SECONDS.
+        """
+        if self._stop is None:
+            return
+
+        self._stop.set()
+
+        for runner in self._runners:
+            runner.join(settings.JOBS_HEARTBEAT_SECONDS if timeout is None else timeout)
+
+            if isinstance(runner, multiprocessing.process.BaseProcess) and runner.is_alive():
+                runner.terminate()
+
+        self._stop = None
+        self._runners = []
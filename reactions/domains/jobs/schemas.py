@@ -0,0 +1,177 @@
+"""
+Pydantic schemas for background jobs.
+
+Defines the data structures used to submit jobs, report their progress and validate the
+parameters of every kind of job.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Literal
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from reactions.apps.jobs import constants
+from reactions.core import settings
+from reactions.domains.users import exports, imports
+
+
+class JobCreate(BaseModel):
+    """
+    Schema for submitting a job.
+    """
+
+    kind: str = Field(
+        ...,
+        description="Kind of job (e.g., 'import_users', 'export_users').",
+    )
+    params: Dict[str, Any] = Field(
+        default_factory=dict,
+        description="Parameters of the job; their schema depends on its kind.",
+    )
+
+
+class JobProgress(BaseModel):
+    """
+    Progress of a job.
+    """
+
+    done: int = Field(
+        ...,
+        description="Units of work done (records read, rows exported...).",
+    )
+    total: int | None = Field(
+        None,
+        description="Units of work expected, when known.",
+    )
+
+
+class JobRetrieve(BaseModel):
+    """
+    Schema for retrieving a job.
+    """
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str = Field(
+        ...,
+        description="Unique identifier of the job.",
+    )
+    kind: str = Field(
+        ...,
+        description="Kind of job.",
+    )
+    status: constants.JobStatus = Field(
+        ...,
+        description="One of 'pending', 'running', 'succeeded' or 'failed'.",
+    )
+    params: Dict[str, Any] = Field(
+        ...,
+        description="Parameters of the job.",
+    )
+    progress: JobProgress = Field(
+        ...,
+        description="Progress of the job, saved at every checkpoint.",
+    )
+    attempts: int = Field(
+        ...,
+        description="Number of times the job was started; above 1 it resumed after a crash.",
+    )
+    error: str | None = Field(
+        None,
+        description="Reason of the failure of a failed job.",
+    )
+    created_at: datetime = Field(
+        ...,
+        description="When the job was submitted.",
+    )
+    started_at: datetime | None = Field(
+        None,
+        description="When the job was first started.",
+    )
+    finished_at: datetime | None = Field(
+        None,
+        description="When the job succeeded or failed.",
+    )
+
+
+class JobResult(BaseModel):
+    """
+    Outcome of a succeeded job.
+    """
+
+    data: Dict[str, Any] = Field(
+        ...,
+        description="Counters and details reported by the job.",
+    )
+    files: List[str] = Field(
+        default_factory=list,
+        description="Files produced by the job, downloadable from its files endpoint.",
+    )
+
+
+class ImportUsersParams(BaseModel):
+    """
+    Parameters of an "import_users" job.
+    """
+
+    upload: str = Field(
+        ...,
+        pattern=r"^[0-9a-f-]+\.(csv|ndjson)$",
+        description="Name of the uploaded file returned by the uploads endpoint.",
+    )
+    format: Literal["csv", "ndjson"] | None = Field(
+        None,
+        description="Format of the file; defaults to its extension.",
+    )
+    chunk_size: int = Field(
+        10_000,
+        gt=0,
+        description="Records validated and loaded per transaction (and per checkpoint).",
+    )
+    on_conflict: Literal[imports.ON_CONFLICT] = Field(
+        imports.SKIP,
+        description="'skip' keeps existing users, 'update' overwrites them.",
+    )
+
+
+class ExportUsersParams(BaseModel):
+    """
+    Parameters of an "export_users" job.
+    """
+
+    format: Literal[exports.FORMATS] = Field(
+        exports.CSV,
+        description="'csv' or 'parquet'.",
+    )
+    compression: Literal[exports.COMPRESSIONS] = Field(
+        exports.NONE,
+        description="'none', 'gzip', and for Parquet also 'zstd' or 'snappy'.",
+    )
+    partitions: int = Field(
+        4,
+        gt=0,
+        le=64,
+        description="Number of part files; every finished part is checkpointed.",
+    )
+    include_archived: bool = Field(
+        True,
+        description="Also export the archived users.",
+    )
+
+
+class ArchiveUsersParams(BaseModel):
+    """
+    Parameters of an "archive_users" job.
+    """
+
+    inactive_days: int = Field(
+        settings.ARCHIVE_INACTIVE_DAYS,
+        gt=0,
+        description="Days without reaction nor write after which a user is archived.",
+    )
+    batch_size: int = Field(
+        settings.ARCHIVE_BATCH_SIZE,
+        gt=0,
+        le=100_000,
+        description="Users moved per transaction (and per checkpoint).",
+    )
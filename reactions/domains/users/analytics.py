@@ -0,0 +1,209 @@
+"""
+Vectorized reaction analytics.
+
+Reaction counters are loaded in chunks as contiguous integer arrays (one row per user, one column
+per reaction kind) either from the database or from a user export, and folded into a
+`ReactionStatistics` accumulator with numpy operations. Only one chunk is materialized at a time;
+besides it, the accumulator keeps per-role sums and a histogram of the distinct counter values,
+from which exact percentiles are derived.
+"""
+
+import csv
+import gzip
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+from sqlalchemy.engine import Connection
+
+from reactions.apps.users import constants
+from reactions.domains.users import exports, schemas
+
+REACTION_KINDS = exports.REACTION_KINDS
+ROLES = tuple(constants.Role)
+PERCENTILES = (50, 90, 99)
+RATIOS = {
+    "plus_one_vs_minus_one": ("plus_one", "minus_one"),
+    "heart_vs_confused": ("heart", "confused"),
+}
+
+Chunk = Tuple[np.ndarray, np.ndarray]
+
+
+class _Histogram:
+    """
+    Exact distribution of non-negative integers as sorted distinct values and their counts.
+    """
+
+    def __init__(self):
+        self.values = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def add(self, data: np.ndarray) -> None:
+        values, counts = np.unique(data, return_counts=True)
+        merged, inverse = np.unique(np.concatenate([self.values, values]), return_inverse=True)
+        self.counts = np.bincount(
+            inverse, weights=np.concatenate([self.counts, counts]), minlength=len(merged)
+        ).astype(np.int64)
+        self.values = merged
+
+    def percentile(self, q: float) -> int:
+        if not len(self.values):
+            return 0
+
+        cumulative = np.cumsum(self.counts)
+        rank = int(np.ceil(q / 100 * cumulative[-1]))
+        return int(self.values[np.searchsorted(cumulative, max(rank, 1))])
+
+
+class ReactionStatistics:
+    """
+    Accumulator of reaction statistics fed with chunks of counters.
+    """
+
+    def __init__(self):
+        self.users = 0
+        self.role_users = np.zeros(len(ROLES), dtype=np.int64)
+        self.role_sums = np.zeros((len(ROLES), len(REACTION_KINDS)), dtype=np.int64)
+        self.maxima = np.zeros(len(REACTION_KINDS), dtype=np.int64)
+        self.histograms = [_Histogram() for _ in REACTION_KINDS]
+        self.totals = _Histogram()
+
+    def add(self, roles: np.ndarray, counters: np.ndarray) -> None:
+        """
+        Fold a chunk into the statistics.
+
+        Args:
+            roles (np.ndarray): Role index (position in `ROLES`) of every user, shape (n,).
+            counters (np.ndarray): Reaction counters, shape (n, len(REACTION_KINDS)).
+        """
+        if not len(roles):
+            return
+
+        self.users += len(roles)
+        self.role_users += np.bincount(roles, minlength=len(ROLES))
+        np.add.at(self.role_sums, roles, counters)
+        self.maxima = np.maximum(self.maxima, counters.max(axis=0))
+        self.totals.add(counters.sum(axis=1))
+
+        for index, histogram in enumerate(self.histograms):
+            histogram.add(counters[:, index])
+
+    def summary(self) -> schemas.ReactionSummary:
+        """
+        Build the summary of everything added so far.
+        """
+        sums = self.role_sums.sum(axis=0)
+        totals = self.totals
+
+        return schemas.ReactionSummary(
+            users=self.users,
+            reactions={
+                kind: _distribution(int(sums[index]), self.users, histogram, self.maxima[index])
+                for index, (kind, histogram) in enumerate(zip(REACTION_KINDS, self.histograms))
+            },
+            total_reactions=_distribution(
+                int(sums.sum()), self.users, totals, totals.values[-1] if len(totals.values) else 0
+            ),
+            ratios=_ratios(sums),
+            roles={
+                role.value: schemas.RoleReactions(
+                    users=int(self.role_users[index]),
+                    reactions=dict(zip(REACTION_KINDS, map(int, self.role_sums[index]))),
+                    ratios=_ratios(self.role_sums[index]),
+                )
+                for index, role in enumerate(ROLES)
+            },
+        )
+
+
+def _distribution(
+    total: int, users: int, histogram: _Histogram, maximum: int
+) -> schemas.ReactionDistribution:
+    return schemas.ReactionDistribution(
+        total=total,
+        mean=total / users if users else 0.0,
+        max=int(maximum),
+        percentiles={f"p{q}": histogram.percentile(q) for q in PERCENTILES},
+    )
+
+
+def _ratios(sums: np.ndarray) -> Dict[str, float | None]:
+    ratios: Dict[str, float | None] = {}
+
+    for name, (positive, negative) in RATIOS.items():
+        a = int(sums[REACTION_KINDS.index(positive)])
+        b = int(sums[REACTION_KINDS.index(negative)])
+        ratios[name] = a / (a + b) if a + b else None
+
+    return ratios
+
+
+def _chunk(rows: List[Tuple], role_column: int, first_counter: int) -> Chunk:
+    role_codes = {role.value: index for index, role in enumerate(ROLES)}
+    roles = np.fromiter((role_codes[row[role_column]] for row in rows), np.int64, len(rows))
+    counters = np.array(
+        [row[first_counter : first_counter + len(REACTION_KINDS)] for row in rows], dtype=np.int64
+    ).reshape(len(rows), len(REACTION_KINDS))
+    return roles, counters
+
+
+def chunks_from_database(
+    connection: Connection, chunk_size: int = 100_000, include_archived: bool = True
+) -> Iterator[Chunk]:
+    """
+    Load counters from the users table (and its archive), one chunk per server-side cursor batch.
+    """
+    for batch in exports.iter_batches(
+        connection, batch_size=chunk_size, include_archived=include_archived
+    ):
+        yield _chunk(batch, role_column=2, first_counter=3)
+
+
+def chunks_from_file(path: str, chunk_size: int = 100_000) -> Iterator[Chunk]:
+    """
+    Load counters from a user export (CSV, optionally gzipped, or Parquet).
+    """
+    if path.endswith(".parquet") or ".parquet." in path:
+        from pyarrow import parquet
+
+        role_codes = {role.value: index for index, role in enumerate(ROLES)}
+
+        for batch in parquet.ParquetFile(path).iter_batches(
+            batch_size=chunk_size, columns=["role", *REACTION_KINDS]
+        ):
+            roles = np.array([role_codes[role] for role in batch.column(0).to_pylist()])
+            counters = np.column_stack(
+                [batch.column(kind).to_numpy() for kind in REACTION_KINDS]
+            ).astype(np.int64)
+            yield roles, counters
+        return
+
+    opener = gzip.open if path.endswith(".gz") else open
+
+    with opener(path, "rt", newline="", encoding="utf-8") as stream:
+        reader = csv.reader(stream)
+        header = next(reader)
+        columns = [header.index("role"), *(header.index(kind) for kind in REACTION_KINDS)]
+        rows: List[Tuple] = []
+
+        for row in reader:
+            rows.append(tuple(row[column] for column in columns))
+
+            if len(rows) == chunk_size:
+                yield _chunk(rows, role_column=0, first_counter=1)
+                rows = []
+
+        if rows:
+            yield _chunk(rows, role_column=0, first_counter=1)
+
+
+def summarize(chunks: Iterable[Chunk]) -> schemas.ReactionSummary:
+    """
+    Compute the reaction summary of a stream of chunks.
+    """
+    statistics = ReactionStatistics()
+
+    for roles, counters in chunks:
+        statistics.add(roles, counters)
+
+    return statistics.summary()
@@ -0,0 +1,243 @@
+"""
+Hot/cold storage of users.
+
+Most users stop reacting at some point, yet they stay in `users` and every index of it. Users
+that neither reacted (`last_reaction_at`, or `created_at` for users who never did) nor were
+written (`updated_at`) for `settings.ARCHIVE_INACTIVE_DAYS` are moved to the `users_archive`
+table by `archive_users`, which keeps `users` and its indexes down to the active users.
+
+- `archive_users` walks `users` in primary key order and moves one batch of inactive users per
+  transaction: `INSERT ... SELECT` into the archive, then `DELETE`. The rows of a batch are
+  locked first, skipping rows locked by writers on PostgreSQL.
+- Writers lock the rows of the users they write to (`lock_users`, or a locking fetch) before
+  anything else, then `restore_users` moves the missing ones back, unchanged: updates, deletions
+  and imports always work on `users`. A user is therefore either locked by the writer, and
+  skipped by the archival, or already in the archive once the writer's lock is granted.
+  Concurrent restores of a user are serialized by a lock on its archived row; the later one
+  finds nothing left to restore.
+
+Archived users keep their id and change version, so archiving is invisible to mirrors and the
+change feed still reports them to a full synchronization. Lookups by username fall through to
+the archive; listings, filters, analytics and exports cover the active users only.
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, List
+
+from sqlalchemy import ColumnElement, and_, bindparam, delete, func, insert, literal, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from reactions.apps.users import models
+from reactions.core import settings, sharding
+
+USERS = models.User.__table__
+ARCHIVE = models.ArchivedUser.__table__
+COLUMNS = [column.name for column in USERS.c]
+
+LIVE_BY_USERNAMES = (
+    select(USERS.c.username)
+    .where(USERS.c.username.in_(bindparam("usernames", expanding=True)))
+    .with_for_update()
+)
+ARCHIVED_USERNAMES = select(ARCHIVE.c.username).where(
+    ARCHIVE.c.username.in_(bindparam("usernames", expanding=True))
+)
+ARCHIVED_BY_USERNAMES = (
+    select(ARCHIVE.c.username)
+    .where(ARCHIVE.c.username.in_(bindparam("usernames", expanding=True)))
+    .with_for_update()
+)
+RESTORE = insert(USERS).from_select(
+    COLUMNS,
+    select(*(ARCHIVE.c[name] for name in COLUMNS)).where(
+        ARCHIVE.c.username.in_(bindparam("usernames", expanding=True))
+    ),
+)
+PURGE = delete(ARCHIVE).where(ARCHIVE.c.username.in_(bindparam("usernames", expanding=True)))
+
+
+@dataclass
+class ArchiveReport:
+    """
+    Progress of an archival run; also its checkpoint.
+
+    Attributes:
+        archived (int): Users moved to the archive (or that would be, in a dry run).
+        shard (int): Position of the shard being archived.
+        after (str): Id of the last user examined on that shard.
+        elapsed (float): Duration of the run in seconds.
+    """
+
+    archived: int = 0
+    shard: int = 0
+    after: str = ""
+    elapsed: float = 0.0
+
+
+def inactive(cutoff: datetime) -> ColumnElement[bool]:
+    """
+    Return the archival policy: users without reaction nor write since `cutoff`.
+    """
+    users = USERS.c
+    return and_(
+        func.coalesce(users.last_reaction_at, users.created_at) < cutoff,
+        users.updated_at < cutoff,
+    )
+
+
+def archive_batch(
+    connection: Connection,
+    cutoff: datetime,
+    after: str = "",
+    batch_size: int = settings.ARCHIVE_BATCH_SIZE,
+    dry_run: bool = False,
+) -> List[str]:
+    """
+    Move the next batch of inactive users to the archive, inside the current transaction.
+
+    Args:
+        connection (Connection): Connection with an open transaction.
+        cutoff (datetime): Users inactive since before this naive UTC time are archived.
+        after (str): Only consider users with a greater id.
+        batch_size (int): Users moved at most.
+        dry_run (bool): Only select the users, without locking nor moving them.
+
+    Returns:
+        List[str]: Ids of the users moved, in order; empty once the table is exhausted.
+    """
+    statement = (
+        select(USERS.c.id)
+        .where(USERS.c.id > after, inactive(cutoff))
+        .order_by(USERS.c.id)
+        .limit(batch_size)
+    )
+
+    if not dry_run:
+        statement = statement.with_for_update(skip_locked=True)
+
+    ids = list(connection.scalars(statement))
+
+    if ids and not dry_run:
+        connection.execute(
+            insert(ARCHIVE).from_select(
+                [*COLUMNS, "archived_at"],
+                select(
+                    *USERS.c, literal(datetime.now(timezone.utc), ARCHIVE.c.archived_at.type)
+                ).where(USERS.c.id.in_(ids)),
+            )
+        )
+        connection.execute(delete(USERS).where(USERS.c.id.in_(ids)))
+
+    return ids
+
+
+def archive_users(
+    engine: Engine | sharding.Shards,
+    inactive_days: int = settings.ARCHIVE_INACTIVE_DAYS,
+    batch_size: int = settings.ARCHIVE_BATCH_SIZE,
+    dry_run: bool = False,
+    resume: ArchiveReport | None = None,
+    on_batch: Callable[[ArchiveReport], None] | None = None,
+) -> ArchiveReport:
+    """
+    Move every inactive user to the archive, one batch per transaction (and per shard).
+
+    Args:
+        engine (Engine | sharding.Shards): Engine of the users database, or its shards.
+        inactive_days (int): Days without reaction nor write after which a user is archived.
+        batch_size (int): Users moved per transaction.
+        dry_run (bool): Only count the users to archive.
+        resume (ArchiveReport | None): Checkpoint of an interrupted run to continue from.
+        on_batch (Callable[[ArchiveReport], None] | None): Called after every committed batch.
+
+    Returns:
+        ArchiveReport: Users archived and duration of the run.
+    """
+    report = ArchiveReport(**vars(resume)) if resume else ArchiveReport()
+    started = time.perf_counter() - report.elapsed
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=inactive_days)
+    engines = sharding.engines_of(engine)
+
+    while report.shard < len(engines):
+        with engines[report.shard].begin() as connection:
+            ids = archive_batch(connection, cutoff, report.after, batch_size, dry_run)
+
+        if ids:
+            report.archived += len(ids)
+            report.after = ids[-1]
+        else:
+            report.shard += 1
+            report.after = ""
+
+        report.elapsed = time.perf_counter() - started
+
+        if on_batch is not None:
+            on_batch(report)
+
+    return report
+
+
+def lock_users(db: Session | Connection, usernames: Iterable[str]) -> List[str]:
+    """
+    Lock the rows of users about to be written to, inside the current transaction.
+
+    Args:
+        db (Session | Connection): Database session, or connection with an open transaction.
+        usernames (Iterable[str]): Usernames about to be written to.
+
+    Returns:
+        List[str]: The usernames locked; the others are not in `users`.
+    """
+    usernames = sorted(set(usernames))
+
+    if not usernames:
+        return []
+
+    return list(db.execute(LIVE_BY_USERNAMES, {"usernames": usernames}).scalars())
+
+
+def find_archived(db: Session | Connection, usernames: Iterable[str]) -> List[str]:
+    """
+    Return the usernames of archived users, without restoring them.
+
+    Args:
+        db (Session | Connection): Database session or connection.
+        usernames (Iterable[str]): Usernames to look up.
+
+    Returns:
+        List[str]: The usernames found in the archive.
+    """
+    usernames = sorted(set(usernames))
+
+    if not usernames:
+        return []
+
+    return list(db.execute(ARCHIVED_USERNAMES, {"usernames": usernames}).scalars())
+
+
+def restore_users(db: Session | Connection, usernames: Iterable[str]) -> List[str]:
+    """
+    Move archived users back to the `users` table, inside the current transaction.
+
+    Args:
+        db (Session | Connection): Database session, or connection with an open transaction.
+        usernames (Iterable[str]): Usernames about to be written to.
+
+    Returns:
+        List[str]: The usernames restored; the others were not archived.
+    """
+    usernames = sorted(set(usernames))
+
+    if not usernames:
+        return []
+
+    restored = list(db.execute(ARCHIVED_BY_USERNAMES, {"usernames": usernames}).scalars())
+
+    if restored:
+        db.execute(RESTORE, {"usernames": restored})
+        db.execute(PURGE, {"usernames": restored})
+
+    return restored
@@ -2,6 +2,8 @@
 Custom exceptions for the Users module.
 """
 
+from typing import Any, Dict, List
+
 
 class UsernameAlreadyExists(Exception):
     """
@@ -20,3 +22,60 @@ class UserDoesNotExist(Exception):
 
     def __init__(self):
         super().__init__("A user with the specified details does not exist.")
+
+
+class UnableToApplyOperations(Exception):
+    """
+    Raised when a chunk of batch operations could not be committed as a whole.
+    """
+
+    def __init__(self):
+        super().__init__("The operations could not be committed and were rolled back.")
+
+
+class InvalidReactionFilter(Exception):
+    """
+    Raised when a reaction filter expression cannot be parsed.
+    """
+
+    def __init__(self, expression: str):
+        super().__init__(
+            f"The reaction filter '{expression}' is invalid; expected a reaction kind, "
+            "total_reactions or sentiment_score, an operator among =, !=, <, <=, >, >= and an "
+            "integer, non-negative except for sentiment_score (e.g., heart>=100)."
+        )
+        self.expression = expression
+
+
+class InvalidUserCursor(Exception):
+    """
+    Raised when the pagination cursor of a user listing does not match its sort order.
+    """
+
+    def __init__(self, cursor: str):
+        super().__init__(
+            f"The cursor '{cursor}' is invalid; pass back the `next_after` of the previous page "
+            "with the same sort."
+        )
+        self.cursor = cursor
+
+
+class UnableToRetrieveChanges(Exception):
+    """
+    Raised when incremental synchronization is requested from sharded users.
+    """
+
+    def __init__(self):
+        super().__init__(
+            "Changes are not available: users are sharded and change versions are per shard."
+        )
+
+
+class InvalidUserBatch(Exception):
+    """
+    Raised when a batch of user operations, or some of its operations, are invalid.
+    """
+
+    def __init__(self, errors: List[Dict[str, Any]]):
+        super().__init__("The batch of operations is invalid.")
+        self.errors = errors
@@ -0,0 +1,325 @@
+"""
+Bulk export of users.
+
+This module streams the users table to CSV or Parquet with the reaction counters flattened into
+one column per kind. Rows are read with a server-side cursor in batches, so memory stays bounded
+by the batch size. On PostgreSQL, CSV exports are produced by `COPY ... TO STDOUT` directly.
+
+Large tables can be exported in parallel: the id space is split into ranges and every range is
+exported over its own connection into its own part file. Sharded users are exported from every
+shard, one set of part files per shard. Archived users are exported along with the active ones,
+unless `include_archived` is off.
+"""
+
+import csv
+import gzip
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import IO, Any, Callable, Collection, Iterator, List, Tuple
+
+from sqlalchemy import Select, Table, select, union_all
+from sqlalchemy.engine import Connection, Engine
+
+from reactions.apps.users import models
+from reactions.core import sharding
+from reactions.domains.users import schemas
+
+CSV = "csv"
+PARQUET = "parquet"
+FORMATS = (CSV, PARQUET)
+
+NONE = "none"
+GZIP = "gzip"
+ZSTD = "zstd"
+SNAPPY = "snappy"
+COMPRESSIONS = (NONE, GZIP, ZSTD, SNAPPY)
+
+REACTION_KINDS = tuple(schemas.Reactions.model_fields)
+COLUMNS = (
+    "id",
+    "username",
+    "role",
+    *REACTION_KINDS,
+    "last_reaction_at",
+    "created_at",
+    "updated_at",
+)
+
+IdRange = Tuple[str | None, str | None]
+
+
+@dataclass
+class ExportReport:
+    """
+    Outcome of an export.
+
+    Attributes:
+        rows (int): Users written.
+        paths (List[str]): Files written, one per partition.
+        elapsed (float): Duration of the export in seconds.
+    """
+
+    rows: int
+    paths: List[str]
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+
+def id_ranges(partitions: int) -> List[IdRange]:
+    """
+    Split the space of user ids (UUID strings) into contiguous, half-open ranges.
+
+    Args:
+        partitions (int): Number of ranges.
+
+    Returns:
+        List[IdRange]: (lower, upper) bounds; None means unbounded.
+    """
+    bounds = [format(index * 16**4 // partitions, "04x") for index in range(1, partitions)]
+    lowers = [None, *bounds]
+    uppers = [*bounds, None]
+    return list(zip(lowers, uppers))
+
+
+def _users_statement(id_range: IdRange, include_archived: bool = True) -> Select:
+    tables = [models.User.__table__]
+
+    if include_archived:
+        tables.append(models.ArchivedUser.__table__)
+
+    statements = [_table_statement(table, id_range) for table in tables]
+
+    if len(statements) == 1:
+        return statements[0].order_by(tables[0].c.id)
+
+    rows = union_all(*statements).subquery()
+    return select(rows).order_by(rows.c.id)
+
+
+def _table_statement(table: Table, id_range: IdRange) -> Select:
+    statement = select(
+        table.c.id,
+        table.c.username,
+        table.c.role,
+        table.c.reactions,
+        table.c.last_reaction_at,
+        table.c.created_at,
+        table.c.updated_at,
+    )
+    lower, upper = id_range
+
+    if lower is not None:
+        statement = statement.where(table.c.id >= lower)
+    if upper is not None:
+        statement = statement.where(table.c.id < upper)
+
+    return statement
+
+
+def iter_batches(
+    connection: Connection,
+    id_range: IdRange = (None, None),
+    batch_size: int = 50_000,
+    include_archived: bool = True,
+) -> Iterator[List[Tuple[Any, ...]]]:
+    """
+    Stream users as flattened tuples, in batches, through a server-side cursor.
+
+    Args:
+        connection (Connection): Connection to read from.
+        id_range (IdRange): Bounds of the user ids to export.
+        batch_size (int): Rows fetched per round trip.
+        include_archived (bool): Also stream the users of `users_archive`.
+
+    Yields:
+        List[Tuple[Any, ...]]: Rows laid out as `COLUMNS`.
+    """
+    result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(
+        _users_statement(id_range, include_archived)
+    )
+
+    for partition in result.partitions():
+        yield [
+            (
+                row.id,
+                row.username,
+                row.role.value,
+                *(row.reactions.get(kind, 0) for kind in REACTION_KINDS),
+                row.last_reaction_at,
+                row.created_at,
+                row.updated_at,
+            )
+            for row in partition
+        ]
+
+
+def _copy_csv(
+    connection: Connection, id_range: IdRange, stream: IO[str], include_archived: bool
+) -> int:
+    reactions = ", ".join(
+        f"coalesce((reactions ->> '{kind}')::bigint, 0)" for kind in REACTION_KINDS
+    )
+    conditions = ["true"]
+    parameters = []
+
+    for operator, bound in ((">=", id_range[0]), ("<", id_range[1])):
+        if bound is not None:
+            conditions.append(f"id {operator} %s")
+            parameters.append(bound)
+
+    tables = ["users", "users_archive"] if include_archived else ["users"]
+    cursor = connection.connection.driver_connection.cursor()
+    query = cursor.mogrify(
+        " UNION ALL ".join(
+            f"SELECT id, username, lower(role::text), {reactions}, "
+            f"last_reaction_at, created_at, updated_at FROM {table} "
+            f"WHERE {' AND '.join(conditions)}"
+            for table in tables
+        )
+        + " ORDER BY id",
+        parameters * len(tables),
+    ).decode()
+    cursor.copy_expert(f"COPY ({query}) TO STDOUT WITH (FORMAT csv)", stream)
+    return cursor.rowcount
+
+
+def _write_csv(
+    connection: Connection,
+    id_range: IdRange,
+    path: str,
+    compression: str,
+    batch_size: int,
+    include_archived: bool,
+) -> int:
+    opener = gzip.open if compression == GZIP else open
+
+    with opener(path, "wt", newline="", encoding="utf-8") as stream:
+        writer = csv.writer(stream)
+        writer.writerow(COLUMNS)
+
+        if connection.dialect.name == "postgresql":
+            return _copy_csv(connection, id_range, stream, include_archived)
+
+        rows = 0
+
+        for batch in iter_batches(connection, id_range, batch_size, include_archived):
+            writer.writerows(batch)
+            rows += len(batch)
+
+        return rows
+
+
+def _write_parquet(
+    connection: Connection,
+    id_range: IdRange,
+    path: str,
+    compression: str,
+    batch_size: int,
+    include_archived: bool,
+) -> int:
+    import pyarrow
+    from pyarrow import parquet
+
+    timestamp = pyarrow.timestamp("us")
+    schema = pyarrow.schema(
+        [
+            ("id", pyarrow.string()),
+            ("username", pyarrow.string()),
+            ("role", pyarrow.string()),
+            *((kind, pyarrow.int64()) for kind in REACTION_KINDS),
+            ("last_reaction_at", timestamp),
+            ("created_at", timestamp),
+            ("updated_at", timestamp),
+        ]
+    )
+    rows = 0
+
+    with parquet.ParquetWriter(path, schema, compression=compression) as writer:
+        for batch in iter_batches(connection, id_range, batch_size, include_archived):
+            columns = list(zip(*batch))
+            writer.write_batch(pyarrow.RecordBatch.from_arrays(columns, schema=schema))
+            rows += len(batch)
+
+    return rows
+
+
+def _partition_path(path: str, index: int, partitions: int) -> str:
+    if partitions == 1:
+        return path
+
+    return f"{path}.part-{index:03d}"
+
+
+def export_users(
+    engine: Engine | sharding.Shards,
+    path: str,
+    file_format: str = CSV,
+    compression: str = NONE,
+    partitions: int = 1,
+    batch_size: int = 50_000,
+    skip: Collection[int] = (),
+    on_part: Callable[[int, int], None] | None = None,
+    include_archived: bool = True,
+) -> ExportReport:
+    """
+    Export every user to one file per partition, exporting partitions concurrently.
+
+    Sharded users are exported shard by shard: every shard is split into `partitions` ranges,
+    each written to its own file. Part files are numbered across shards; an interrupted export
+    is resumed by skipping the parts already written.
+
+    Args:
+        engine (Engine | sharding.Shards): Engine of the source database, or its shards. Each
+            pool must allow `partitions` simultaneous connections.
+        path (str): Output file. With several partitions or shards, files are named
+            `<path>.part-NNN`.
+        file_format (str): "csv" or "parquet".
+        compression (str): "none", "gzip", and for Parquet also "zstd" or "snappy".
+        partitions (int): Number of id ranges exported in parallel.
+        batch_size (int): Rows fetched per round trip.
+        skip (Collection[int]): Indexes of the parts not to export again.
+        on_part (Callable[[int, int], None] | None): Called from the exporting thread with the
+            index and the row count of every part written.
+        include_archived (bool): Also export the users of `users_archive`.
+
+    Returns:
+        ExportReport: Rows written in this run and every file of the export.
+
+    Raises:
+        ValueError: If the compression is not supported by the format.
+    """
+    if file_format == CSV and compression not in (NONE, GZIP):
+        raise ValueError(f"CSV exports support 'none' or 'gzip' compression, not '{compression}'.")
+
+    writer = _write_parquet if file_format == PARQUET else _write_csv
+    work = [
+        (shard, id_range)
+        for shard in sharding.engines_of(engine)
+        for id_range in id_ranges(partitions)
+    ]
+    paths = [_partition_path(path, index, len(work)) for index in range(len(work))]
+    started = time.perf_counter()
+
+    def export_partition(index: int) -> int:
+        shard, id_range = work[index]
+
+        with shard.connect() as connection:
+            rows = writer(
+                connection, id_range, paths[index], compression, batch_size, include_archived
+            )
+
+        if on_part is not None:
+            on_part(index, rows)
+
+        return rows
+
+    pending = [index for index in range(len(work)) if index not in skip]
+
+    with ThreadPoolExecutor(max_workers=partitions) as executor:
+        rows = sum(executor.map(export_partition, pending))
+
+    return ExportReport(rows=rows, paths=paths, elapsed=time.perf_counter() - started)
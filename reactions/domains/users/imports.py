@@ -0,0 +1,429 @@
+"""
+Bulk import of users.
+
+This module streams `UserCreate` records from CSV or NDJSON files, validates them chunk by chunk
+(across the validation process pool, see `schemas.validate_batch`) into plain dicts and loads
+every valid chunk in its own transaction. On PostgreSQL a chunk is copied with `COPY`
+into a temporary staging table and merged into `users` with a single `INSERT ... SELECT ... ON
+CONFLICT`; other databases receive batched `executemany` statements. Only one chunk is held in
+memory at a time, whatever the size of the input. With sharded users every chunk is split by
+shard and each part is loaded into its own shard. Archived users count as existing users: they
+are skipped, or restored before being overwritten.
+
+CSV files have a header with the `UserCreate` fields. Reactions are given either as a `reactions`
+column holding a JSON object or as one column per reaction kind (`plus_one`, `heart`, ...), the
+layout produced by the user export. Malformed JSON (an NDJSON line or a `reactions` cell) rejects
+its record only, like a validation failure.
+"""
+
+import csv
+import io
+import json
+import time
+import uuid
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from itertools import islice
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.engine import Connection, Engine
+
+from reactions.apps.users import models
+from reactions.core import sharding
+from reactions.domains.users import archival, schemas
+
+CSV = "csv"
+NDJSON = "ndjson"
+FORMATS = (CSV, NDJSON)
+
+# The `model_dump()` of a validated `schemas.UserCreate`.
+ValidUser = Dict[str, Any]
+
+SKIP = "skip"
+UPDATE = "update"
+ON_CONFLICT = (SKIP, UPDATE)
+
+REACTION_KINDS = tuple(schemas.Reactions.model_fields)
+COLUMNS = (
+    "id",
+    "username",
+    "role",
+    "reactions",
+    "last_reaction_at",
+    "created_at",
+    "updated_at",
+    "total_reactions",
+    "sentiment_score",
+)
+
+
+@dataclass
+class Rejection:
+    """
+    A record that could not be imported.
+
+    Attributes:
+        line (int): Line number of the record in the input (header excluded for CSV).
+        errors (List[Dict[str, Any]]): Validation errors of the record.
+    """
+
+    line: int
+    errors: List[Dict[str, Any]]
+
+
+@dataclass
+class ImportReport:
+    """
+    Outcome of an import.
+
+    Attributes:
+        read (int): Records read from the input.
+        inserted (int): Users created.
+        updated (int): Existing users overwritten (only with the "update" conflict policy).
+        skipped (int): Valid records not written: their username already exists, or a later
+            record of the same chunk repeats it.
+        rejected (int): Records that failed validation.
+        elapsed (float): Duration of the import in seconds.
+    """
+
+    read: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    rejected: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.elapsed if self.elapsed else 0.0
+
+
+def read_records(stream: IO[str], file_format: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Lazily read raw user records from a text stream.
+
+    Args:
+        stream (IO[str]): The input.
+        file_format (str): "csv" or "ndjson".
+
+    Yields:
+        Tuple[int, Dict[str, Any] | Rejection]: The line number and the raw record, or its
+            rejection when it is not valid JSON.
+    """
+    if file_format == NDJSON:
+        for line, text in enumerate(stream, start=1):
+            if not text.strip():
+                continue
+
+            try:
+                yield line, json.loads(text)
+            except json.JSONDecodeError as e:
+                yield line, Rejection(line=line, errors=[_json_error(e, text)])
+        return
+
+    for line, row in enumerate(csv.DictReader(stream), start=1):
+        try:
+            yield line, _csv_record(row)
+        except json.JSONDecodeError as e:
+            yield line, Rejection(line=line, errors=[_json_error(e, row["reactions"], "reactions")])
+
+
+def _json_error(error: json.JSONDecodeError, text: str, *loc: str) -> Dict[str, Any]:
+    # Shaped like the validation errors of the other rejections.
+    return {"type": "json_invalid", "loc": loc, "msg": f"Invalid JSON: {error}", "input": text}
+
+
+def _csv_record(row: Dict[str, str]) -> Dict[str, Any]:
+    record: Dict[str, Any] = {
+        key: value for key, value in row.items() if key not in REACTION_KINDS and value != ""
+    }
+
+    if "reactions" in record:
+        record["reactions"] = json.loads(record["reactions"])
+    else:
+        record["reactions"] = {
+            kind: row[kind] for kind in REACTION_KINDS if row.get(kind) not in (None, "")
+        }
+
+    return record
+
+
+def chunked(records: Iterable, size: int) -> Iterator[List]:
+    """
+    Split an iterable into lists of at most `size` items without materializing it.
+    """
+    iterator = iter(records)
+
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def validate_chunk(
+    records: List[Tuple[int, Dict[str, Any] | Rejection]],
+) -> Tuple[List[ValidUser], List[Rejection]]:
+    """
+    Validate a chunk of raw records, as read by `read_records`.
+
+    Records repeating a username of the same chunk replace the earlier one. The chunk is
+    validated as a whole by `schemas.validate_batch`.
+
+    Returns:
+        Tuple[List[ValidUser], List[Rejection]]: Valid users and rejected records, in line
+            order.
+    """
+    unreadable = [record for _, record in records if isinstance(record, Rejection)]
+    records = [(line, record) for line, record in records if not isinstance(record, Rejection)]
+    items, errors = schemas.validate_batch(
+        schemas.UserCreate, [record for _, record in records], as_dicts=True
+    )
+    users: Dict[str, ValidUser] = {user["username"]: user for user in items if user}
+    rejected = unreadable + [
+        Rejection(line=records[index][0], errors=errors[index]) for index in errors
+    ]
+
+    return list(users.values()), sorted(rejected, key=lambda rejection: rejection.line)
+
+
+def _row(user: ValidUser, now: datetime) -> Dict[str, Any]:
+    last_reaction_at = user["last_reaction_at"]
+
+    if last_reaction_at is not None and last_reaction_at.tzinfo is not None:
+        last_reaction_at = last_reaction_at.astimezone(timezone.utc).replace(tzinfo=None)
+
+    reactions = user["reactions"]
+
+    return {
+        "id": str(uuid.uuid4()),
+        "username": user["username"],
+        "role": user["role"],
+        "reactions": reactions,
+        "last_reaction_at": last_reaction_at,
+        "created_at": now,
+        "updated_at": now,
+        **models.reaction_scores(reactions),
+    }
+
+
+def load_chunk(
+    connection: Connection,
+    users: List[ValidUser],
+    on_conflict: str = SKIP,
+) -> Tuple[int, int, int]:
+    """
+    Load validated users inside the current transaction of a connection.
+
+    Args:
+        connection (Connection): Connection with an open transaction.
+        users (List[ValidUser]): Validated users with distinct usernames.
+        on_conflict (str): "skip" keeps existing users untouched, "update" overwrites their
+            role, reactions and last reaction timestamp.
+
+    Returns:
+        Tuple[int, int, int]: Users inserted, updated and skipped.
+    """
+    if not users:
+        return 0, 0, 0
+
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = [_row(user, now) for user in users]
+    usernames = [row["username"] for row in rows]
+    archived: Set[str] = set()
+
+    if on_conflict == UPDATE:
+        locked = set(archival.lock_users(connection, usernames))
+        archival.restore_users(connection, [name for name in usernames if name not in locked])
+    else:
+        archive = archival.ARCHIVE
+        archived = set(
+            connection.scalars(select(archive.c.username).where(archive.c.username.in_(usernames)))
+        )
+        rows = [row for row in rows if row["username"] not in archived]
+
+    if not rows:
+        return 0, 0, len(archived)
+
+    if connection.dialect.name == "postgresql":
+        inserted, updated, skipped = _copy_chunk(connection, rows, on_conflict)
+    else:
+        inserted, updated, skipped = _executemany_chunk(connection, rows, on_conflict)
+
+    return inserted, updated, skipped + len(archived)
+
+
+def _copy_chunk(
+    connection: Connection,
+    rows: List[Dict[str, Any]],
+    on_conflict: str,
+) -> Tuple[int, int, int]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    for row in rows:
+        writer.writerow(
+            [
+                row["id"],
+                row["username"],
+                row["role"].name,
+                json.dumps(row["reactions"]),
+                row["last_reaction_at"].isoformat() if row["last_reaction_at"] else "",
+                row["created_at"].isoformat(),
+                row["updated_at"].isoformat(),
+                row["total_reactions"],
+                row["sentiment_score"],
+            ]
+        )
+
+    buffer.seek(0)
+    columns = ", ".join(COLUMNS)
+    version = models.NEXT_VERSION.compile(dialect=connection.dialect)
+
+    # The staging table has the columns of the file only; versions are stamped on merge.
+    connection.exec_driver_sql(
+        "CREATE TEMPORARY TABLE IF NOT EXISTS users_import ON COMMIT DELETE ROWS "
+        f"AS SELECT {columns} FROM users WITH NO DATA"
+    )
+    cursor = connection.connection.driver_connection.cursor()
+    cursor.copy_expert(f"COPY users_import ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+    if on_conflict == UPDATE:
+        # xmax is 0 only for freshly inserted tuples, which tells inserts from updates apart.
+        result = connection.exec_driver_sql(
+            f"INSERT INTO users ({columns}, version) SELECT {columns}, {version} "
+            "FROM users_import ON CONFLICT (username) DO UPDATE SET role = EXCLUDED.role, "
+            "reactions = EXCLUDED.reactions, last_reaction_at = EXCLUDED.last_reaction_at, "
+            "updated_at = EXCLUDED.updated_at, total_reactions = EXCLUDED.total_reactions, "
+            "sentiment_score = EXCLUDED.sentiment_score, version = EXCLUDED.version "
+            "RETURNING (xmax = 0)"
+        )
+        inserted = sum(1 for (is_insert,) in result if is_insert)
+        return inserted, len(rows) - inserted, 0
+
+    result = connection.exec_driver_sql(
+        f"INSERT INTO users ({columns}, version) SELECT {columns}, {version} "
+        "FROM users_import ON CONFLICT (username) DO NOTHING"
+    )
+    return result.rowcount, 0, len(rows) - result.rowcount
+
+
+def _executemany_chunk(
+    connection: Connection,
+    rows: List[Dict[str, Any]],
+    on_conflict: str,
+) -> Tuple[int, int, int]:
+    table = models.User.__table__
+    existing = set(
+        connection.scalars(
+            select(table.c.username).where(table.c.username.in_([row["username"] for row in rows]))
+        )
+    )
+    new_rows = [row for row in rows if row["username"] not in existing]
+    old_rows = [row for row in rows if row["username"] in existing]
+
+    if new_rows:
+        connection.execute(insert(table), new_rows)
+
+    if on_conflict != UPDATE or not old_rows:
+        return len(new_rows), 0, len(old_rows)
+
+    connection.execute(
+        update(table)
+        .where(table.c.username == bindparam("match_username"))
+        .values(
+            role=bindparam("role"),
+            reactions=bindparam("reactions"),
+            last_reaction_at=bindparam("last_reaction_at"),
+            updated_at=bindparam("updated_at"),
+            total_reactions=bindparam("total_reactions"),
+            sentiment_score=bindparam("sentiment_score"),
+        ),
+        [
+            {
+                "match_username": row["username"],
+                "role": row["role"],
+                "reactions": row["reactions"],
+                "last_reaction_at": row["last_reaction_at"],
+                "updated_at": row["updated_at"],
+                "total_reactions": row["total_reactions"],
+                "sentiment_score": row["sentiment_score"],
+            }
+            for row in old_rows
+        ],
+    )
+    return len(new_rows), len(old_rows), 0
+
+
+def _by_shard(
+    engine: Engine | sharding.Shards,
+    users: List[ValidUser],
+) -> List[Tuple[Engine, List[ValidUser]]]:
+    if not isinstance(engine, sharding.Shards):
+        return [(engine, users)]
+
+    groups: Dict[str, List[ValidUser]] = {}
+
+    for user in users:
+        groups.setdefault(engine.shard_for(user["username"]), []).append(user)
+
+    return [(engine.engines[shard_id], group) for shard_id, group in groups.items()]
+
+
+def import_users(
+    engine: Engine | sharding.Shards,
+    stream: IO[str],
+    file_format: str = CSV,
+    chunk_size: int = 10_000,
+    on_conflict: str = SKIP,
+    on_reject: Callable[[Rejection], None] | None = None,
+    resume: ImportReport | None = None,
+    on_chunk: Callable[[ImportReport], None] | None = None,
+) -> ImportReport:
+    """
+    Import users from a text stream, committing one transaction per chunk (and per shard).
+
+    An interrupted import is resumed by passing the report of its last committed chunk: the
+    records it read are skipped and its counters carried on.
+
+    Args:
+        engine (Engine | sharding.Shards): Engine of the target database, or its shards.
+        stream (IO[str]): The input.
+        file_format (str): "csv" or "ndjson".
+        chunk_size (int): Records validated and loaded per transaction.
+        on_conflict (str): "skip" or "update", see `load_chunk`.
+        on_reject (Callable[[Rejection], None] | None): Called for every rejected record.
+        resume (ImportReport | None): Report of the import to resume, as passed to `on_chunk`.
+        on_chunk (Callable[[ImportReport], None] | None): Called with the running report after
+            every committed chunk.
+
+    Returns:
+        ImportReport: Counters of the import.
+    """
+    report = replace(resume) if resume is not None else ImportReport()
+    started = time.perf_counter() - report.elapsed
+    records = islice(read_records(stream, file_format), report.read, None)
+
+    for records in chunked(records, chunk_size):
+        users, rejected = validate_chunk(records)
+        report.read += len(records)
+        report.rejected += len(rejected)
+
+        for rejection in rejected:
+            if on_reject is not None:
+                on_reject(rejection)
+
+        for shard, shard_users in _by_shard(engine, users):
+            with shard.begin() as connection:
+                inserted, updated, skipped = load_chunk(connection, shard_users, on_conflict)
+
+            report.inserted += inserted
+            report.updated += updated
+            report.skipped += skipped
+
+        report.skipped += len(records) - len(rejected) - len(users)
+        report.elapsed = time.perf_counter() - started
+
+        if on_chunk is not None:
+            on_chunk(report)
+
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -4,13 +4,26 @@ Business logic and process handling for the Users module.
 This module contains the core business processes for managing users
 """
 
-from typing import List
+import itertools
+from typing import Dict, List, Sequence, get_args
 
+from sqlalchemy import Row
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from reactions.apps.users import models
-from reactions.core import repository
-from reactions.domains.users import exceptions, queries, schemas, validations
+from reactions.core import database, deadlines, events, repository, settings, sharding, versions
+from reactions.domains.users import (
+    analytics,
+    archival,
+    exceptions,
+    queries,
+    schemas,
+    search,
+    validations,
+)
+
+EVENT_TYPES = {"create": "created", "update": "updated", "delete": "deleted"}
 
 
 def create_user(
@@ -34,6 +47,10 @@ def create_user(
     if validations.check_if_username_exists(db=db, username=user_data.username):
         raise exceptions.UsernameAlreadyExists(username=user_data.username)
 
+    # An archived user keeps its username until it is deleted.
+    if validations.check_if_username_archived(db=db, username=user_data.username):
+        raise exceptions.UsernameAlreadyExists(username=user_data.username)
+
     instance = models.User.new(
         username=user_data.username,
         reactions=user_data.reactions.model_dump(),
@@ -42,6 +59,7 @@ def create_user(
     )
 
     repository.create(db=db, instance=instance)
+    events.publish("user.created", _user_event_data(instance))
 
     return instance
 
@@ -51,7 +69,7 @@ def update_user(
     user_data: schemas.UserUpdate,
 ) -> models.User:
     """
-    Update a  user in the database.
+    Update a  user in the database, restoring it from the archive first if needed.
 
     Args:
         db (Session): Database session.
@@ -64,19 +82,44 @@ def update_user(
         exceptions.UserDoesNotExist: If the username does not exists.
     """
 
-    if not validations.check_if_username_exists(db=db, username=user_data.username):
+    user = _fetch_for_write(db=db, username=user_data.username)
+
+    _apply_user_update(user=user, user_data=user_data)
+
+    instance = repository.update(db=db, instance=user)
+    events.publish("user.updated", _user_event_data(instance))
+    return instance
+
+
+def _fetch_for_write(db: Session, username: str) -> models.User:
+    """
+    Lock the row of a user about to be written to, moving it back from the archive if it is there.
+
+    Raises:
+        exceptions.UserDoesNotExist: If the username is neither in `users` nor in the archive.
+    """
+
+    user = queries.fetch_user_record_by_username(db=db, username=username, for_update=True)
+
+    if user is None and archival.restore_users(db=db, usernames=[username]):
+        user = queries.fetch_user_record_by_username(db=db, username=username, for_update=True)
+
+    if user is None:
         raise exceptions.UserDoesNotExist()
 
-    user = queries.fetch_user_record_by_username(db=db, username=user_data.username)
+    return user
+
+
+def _apply_user_update(user: models.User, user_data: schemas.UserUpdate) -> None:
+    """
+    Copy the provided fields of an update payload onto a user instance.
+    """
 
     user.role = user_data.role or user.role
     user.last_reaction_at = user_data.last_reaction_at or user.last_reaction_at
 
     if user_data.reactions:
-        user.reactions = user_data.reactions.model_dump()
-
-    instance = repository.update(db=db, instance=user)
-    return instance
+        user.set_reactions(user_data.reactions.model_dump())
 
 
 def delete_user(
@@ -96,44 +139,457 @@ def delete_user(
     Raises:
         exceptions.UserDoesNotExist: If the username does not exists.
     """
-    # TODO: is_disabled for remove users, no apply on this assignment
-
-    if not validations.check_if_username_exists(db=db, username=username):
-        raise exceptions.UserDoesNotExist()
-
-    user = queries.fetch_user_record_by_username(db=db, username=username)
+    user = _fetch_for_write(db=db, username=username)
+    data = {"id": user.id, "username": user.username}
 
-    repository.delete(db=db, instance=user)
+    repository.remove(db=db, instance=user)
+    repository.add(db=db, instance=models.UserTombstone.of(user))
+    repository.commit(db=db)
+    events.publish("user.deleted", data)
 
 
 def retrieve_users(
     db: Session,
     username: str | None = None,
+    reaction_filters: Sequence[str] = (),
+    after: str | None = None,
+    limit: int | None = None,
+    sort: str = "username",
 ) -> List[schemas.UserRetrieve]:
     """
-    Retrieve users from the database, optionally filtered by username.
+    Retrieve users from the database, optionally filtered by username and reaction counters.
+
+    With a limit, users are returned in the `sort` order, starting after the `after` cursor; on
+    sharded databases every shard returns its first page and the pages are merged. A username
+    missing from the users table is looked up in the archive.
 
     Args:
         db (Session): SQLAlchemy database session.
         username (str | None): Optional username to filter users.
+        reaction_filters (Sequence[str]): Reaction filter expressions combined with AND
+            (e.g., "heart>=100", "minus_one = 0").
+        after (str | None): Cursor of the last user of the previous page (see `user_cursor`).
+        limit (int | None): Maximum number of users returned; all of them when None.
+        sort (str): "username", or a ranking field prefixed with "-" for a descending order
+            (e.g., "-total_reactions").
 
     Returns:
         List[schemas.UserRetrieve]: A list of users with their public attributes,
         including id, username, role, reactions, last reaction timestamp,
-        creation timestamp, and last update timestamp.
+        creation timestamp, last update timestamp and ranking fields.
+
+    Raises:
+        exceptions.InvalidReactionFilter: If a reaction filter expression is invalid.
+        exceptions.InvalidUserCursor: If the cursor does not match the sort.
+    """
+
+    filters = validations.parse_reaction_filters(reaction_filters)
+    after_value = None
+
+    if after is not None:
+        after_value, after = validations.parse_user_cursor(after, sort)
+
+    users = queries.fetch_user_rows(
+        db=db,
+        username=username,
+        filters=filters,
+        after=after,
+        limit=limit,
+        sort=None if sort == "username" else sort,
+        after_value=after_value,
+    )
+
+    if not users and username and after is None:
+        users = queries.fetch_archived_user_rows(db=db, username=username, filters=filters)
+
+    return [_user_retrieve(user) for user in users]
+
+
+def search_users(
+    db: Session,
+    prefix: str,
+    limit: int = 10,
+    sort: str = "-total_reactions",
+    index: search.UsernameIndex | None = None,
+    include_archived: bool = False,
+) -> List[schemas.UserMatch]:
+    """
+    Search the users whose username starts with a prefix, whatever its case.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        prefix (str): Start of the username (e.g., "valen").
+        limit (int): Maximum number of users returned.
+        sort (str): Ranking of the users: "-total_reactions", "-sentiment_score",
+            "-last_reaction_at" (most recent first) or "username".
+        index (search.UsernameIndex | None): In-memory index of the active users, answering
+            instead of the database once loaded, unless archived users are included.
+        include_archived (bool): Also search the archived users.
+
+    Returns:
+        List[schemas.UserMatch]: The best matching users, best first.
+    """
+
+    if index is not None and index.ready and not include_archived:
+        matches = index.search(prefix, limit, sort)
+    else:
+        rows = queries.search_user_rows(
+            db=db, prefix=prefix, limit=limit, sort=sort, include_archived=include_archived
+        )
+        matches = search.rank((search.Match.of(row) for row in rows), sort, limit)
+
+    return [schemas.UserMatch(**match._asdict()) for match in matches]
+
+
+def load_search_index(db: Session, index: search.UsernameIndex) -> int:
+    """
+    Load every user into an in-memory search index, shard after shard.
+
+    Args:
+        db (Session): Database session.
+        index (search.UsernameIndex): The index, whose content is replaced.
+
+    Returns:
+        int: Number of users indexed.
+    """
+
+    rows = itertools.chain.from_iterable(
+        queries.iter_search_rows(connection=connection, batch_size=settings.ANALYTICS_CHUNK_SIZE)
+        for connection in database.shard_connections(db)
+    )
+    return index.load(search.Match.of(row) for row in rows)
+
+
+def user_cursor(user: schemas.UserRetrieve, sort: str = "username") -> str:
+    """
+    Return the cursor to list the users after `user` in the `sort` order.
+
+    Args:
+        user (schemas.UserRetrieve): The last user of a page.
+        sort (str): The sort of the listing.
+
+    Returns:
+        str: The username, or "<value>:<username>" with a ranking field.
+    """
+    field = sort.lstrip("-")
+
+    if field == "username":
+        return user.username
+
+    return f"{getattr(user, field)}:{user.username}"
+
+
+def _user_retrieve(user: models.User | Row) -> schemas.UserRetrieve:
+    return schemas.UserRetrieve(
+        id=user.id,
+        username=user.username,
+        role=user.role,
+        reactions=user.reactions,
+        last_reaction_at=str(user.last_reaction_at),
+        created_at=str(user.created_at),
+        updated_at=str(user.updated_at),
+        total_reactions=user.total_reactions,
+        sentiment_score=user.sentiment_score,
+    )
+
+
+def _user_event_data(user: models.User) -> Dict:
+    return _user_retrieve(user).model_dump(mode="json")
+
+
+def retrieve_changes(
+    db: Session,
+    since: int = 0,
+    after: str | None = None,
+    limit: int = settings.CHANGES_PAGE_SIZE,
+) -> schemas.UserChanges:
+    """
+    Retrieve a page of the users created, updated or deleted after a change version.
+
+    Changes are ordered by `(version, id)`. The returned cursor (`next_since`, `next_after`) is
+    passed back to read the following page; once `has_more` is false the mirror is up to date
+    and keeps the cursor for its next synchronization.
+
+    Args:
+        db (Session): Database session.
+        since (int): Version of the last change already applied; 0 reads every user.
+        after (str | None): Id of the last change already applied within `since`.
+        limit (int): Maximum number of changes returned.
+
+    Returns:
+        schemas.UserChanges: The page of changes and the cursor of the next page.
+
+    Raises:
+        exceptions.UnableToRetrieveChanges: If the users are sharded, since change versions
+            are not comparable across shards.
+    """
+
+    if isinstance(db, sharding.ShardedSession):
+        raise exceptions.UnableToRetrieveChanges()
+
+    below = versions.watermark(db.connection())
+    rows = queries.fetch_user_changes(db=db, since=since, after=after, below=below, limit=limit)
+    changes = [
+        schemas.UserChange(
+            op=row.op,
+            version=row.version,
+            id=row.id,
+            username=row.username,
+            user=_user_retrieve(row) if row.op == "upsert" else None,
+        )
+        for row in rows[:limit]
+    ]
+
+    if changes:
+        since, after = changes[-1].version, changes[-1].id
+
+    return schemas.UserChanges(
+        changes=changes,
+        next_since=since,
+        next_after=after,
+        has_more=len(rows) > limit,
+    )
+
+
+def summarize_reactions(db: Session, include_archived: bool = True) -> schemas.ReactionSummary:
     """
+    Compute reaction statistics over every user.
+
+    Counters are streamed in chunks of ``settings.ANALYTICS_CHUNK_SIZE`` users, shard after
+    shard, and aggregated with vectorized operations.
+
+    Args:
+        db (Session): Database session.
+        include_archived (bool): Also count the archived users.
 
-    users = queries.fetch_users(db=db, username=username)
+    Returns:
+        schemas.ReactionSummary: Distributions, ratios and role breakdown of the reactions.
+    """
 
-    return [
-        schemas.UserRetrieve(
-            id=user.id,
-            username=user.username,
-            role=user.role,
-            reactions=user.reactions,
-            last_reaction_at=str(user.last_reaction_at),
-            created_at=str(user.created_at),
-            updated_at=str(user.updated_at),
+    chunks = itertools.chain.from_iterable(
+        analytics.chunks_from_database(
+            connection=connection,
+            chunk_size=settings.ANALYTICS_CHUNK_SIZE,
+            include_archived=include_archived,
         )
-        for user in users
+        for connection in database.shard_connections(db)
+    )
+    return analytics.summarize(chunks)
+
+
+def apply_user_operations(
+    db: Session,
+    operations: Sequence[schemas.UserOperation],
+    chunk_size: int | None = None,
+) -> List[schemas.UserOperationResult]:
+    """
+    Apply an ordered list of create, update and delete operations.
+
+    Operations are grouped in chunks; every chunk is resolved against the users it touches
+    with a single lookup query, flushed as batched statements and committed in one
+    transaction. An operation that fails its business validation is reported and skipped
+    without affecting the rest of its chunk.
+
+    Args:
+        db (Session): Database session.
+        operations (Sequence[schemas.UserOperation]): Operations to apply, in order.
+        chunk_size (int | None): Operations committed per transaction. Defaults to
+            ``settings.BATCH_CHUNK_SIZE``; when that is 0 the whole batch is one transaction.
+
+    Returns:
+        List[schemas.UserOperationResult]: One result per operation, in the same order.
+    """
+
+    chunk_size = chunk_size or settings.BATCH_CHUNK_SIZE or len(operations) or 1
+    results: List[schemas.UserOperationResult] = []
+
+    for offset in range(0, len(operations), chunk_size):
+        chunk = operations[offset : offset + chunk_size]
+        results.extend(_apply_user_operations_chunk(db=db, operations=chunk, offset=offset))
+
+    return results
+
+
+def _operation_username(operation: schemas.UserOperation) -> str:
+    if isinstance(operation, schemas.UserDeleteOperation):
+        return operation.username
+    return operation.data.username
+
+
+def _apply_user_operations_chunk(
+    db: Session,
+    operations: Sequence[schemas.UserOperation],
+    offset: int,
+) -> List[schemas.UserOperationResult]:
+    """
+    Apply one chunk of operations inside a single transaction.
+
+    The users touched by the chunk are locked, and the archived targets of its updates and
+    deletions restored, before it is applied.
+    """
+
+    usernames = {_operation_username(operation) for operation in operations}
+    targets = {
+        _operation_username(operation)
+        for operation in operations
+        if not isinstance(operation, schemas.UserCreateOperation)
+    }
+    pending_deletes: set = set()
+    results: List[schemas.UserOperationResult] = []
+    affected: Dict[int, models.User] = {}
+
+    try:
+        users: Dict[str, models.User | None] = {
+            user.username: user
+            for user in queries.fetch_users_by_usernames(
+                db=db, usernames=usernames, for_update=True
+            )
+        }
+        restored = archival.restore_users(db=db, usernames=targets - users.keys())
+
+        if restored:
+            users.update(
+                (user.username, user)
+                for user in queries.fetch_users_by_usernames(
+                    db=db, usernames=restored, for_update=True
+                )
+            )
+
+        # An archived user keeps its username until it is deleted.
+        archived = set(archival.find_archived(db=db, usernames=usernames - users.keys()))
+
+        for index, operation in enumerate(operations, start=offset):
+            username = _operation_username(operation)
+            user = users.get(username)
+
+            if isinstance(operation, schemas.UserCreateOperation):
+                if user is not None or username in archived:
+                    error: Exception = exceptions.UsernameAlreadyExists(username=username)
+                    results.append(_failed(index, operation, "UNABLE_TO_CREATE_USER", error))
+                    continue
+
+                if username in pending_deletes:
+                    # The unit of work emits inserts before deletes; release the username first.
+                    repository.flush(db=db)
+                    pending_deletes.discard(username)
+
+                user = models.User.new(
+                    username=username,
+                    reactions=operation.data.reactions.model_dump(),
+                    role=operation.data.role,
+                    last_reaction_at=operation.data.last_reaction_at,
+                )
+                repository.add(db=db, instance=user)
+                users[username] = user
+
+            elif user is None:
+                code = (
+                    "UNABLE_TO_UPDATE_USER"
+                    if isinstance(operation, schemas.UserUpdateOperation)
+                    else "UNABLE_TO_DELETE_USER"
+                )
+                results.append(_failed(index, operation, code, exceptions.UserDoesNotExist()))
+                continue
+
+            elif isinstance(operation, schemas.UserUpdateOperation):
+                _apply_user_update(user=user, user_data=operation.data)
+
+            else:
+                repository.remove(db=db, instance=user)
+                repository.add(db=db, instance=models.UserTombstone.of(user))
+                users[username] = None
+                pending_deletes.add(username)
+
+            affected[index] = user
+            results.append(
+                schemas.UserOperationResult(index=index, op=operation.op, code_transaction="OK")
+            )
+
+        repository.flush(db=db)
+        user_ids = {index: user.id for index, user in affected.items()}
+        changes = [
+            (
+                f"user.{EVENT_TYPES[operations[index - offset].op]}",
+                (
+                    {"id": user.id, "username": user.username}
+                    if isinstance(operations[index - offset], schemas.UserDeleteOperation)
+                    else _user_event_data(user)
+                ),
+            )
+            for index, user in affected.items()
+        ]
+        repository.commit(db=db)
+    except SQLAlchemyError as e:
+        repository.rollback(db=db)
+
+        if deadlines.is_cancellation(e):
+            raise
+
+        # Every operation of the chunk fails, including those not reached yet; operations that
+        # had already failed keep their own error.
+        error = exceptions.UnableToApplyOperations()
+        failed = {result.index: result for result in results if result.code_transaction != "OK"}
+        return [
+            failed.get(index) or _failed(index, operation, "UNABLE_TO_APPLY_BATCH", error)
+            for index, operation in enumerate(operations, start=offset)
+        ]
+
+    for result in results:
+        result.user_id = user_ids.get(result.index)
+
+    for event_type, data in changes:
+        events.publish(event_type, data)
+
+    return results
+
+
+def _failed(
+    index: int,
+    operation: schemas.UserOperation,
+    code_transaction: str,
+    error: Exception,
+) -> schemas.UserOperationResult:
+    return schemas.UserOperationResult(
+        index=index,
+        op=operation.op,
+        code_transaction=code_transaction,
+        message=str(error),
+    )
+
+
+def warm_up(db: Session) -> int:
+    """
+    Execute every hot user statement once so that its compiled form is cached by the engine.
+
+    Lookups run with placeholder parameters that match no user, and the first and following
+    pages of the listing in every sort run with a limit of 0 (a limit is a bound parameter, so
+    it does not change the shape), so no row is read.
+
+    Args:
+        db (Session): Database session.
+
+    Returns:
+        int: Number of statements compiled.
+    """
+
+    statements = queries.HOT_STATEMENTS + validations.HOT_STATEMENTS
+
+    for statement, parameters in statements:
+        db.execute(statement, parameters).all()
+
+    pages = [
+        (None if sort == "username" else sort, after)
+        for sort in get_args(schemas.UserSort)
+        for after in (None, "")
     ]
+
+    for sort, after in pages:
+        queries.fetch_user_rows(
+            db=db,
+            after=after,
+            limit=0,
+            sort=sort,
+            after_value=0 if sort is not None and after is not None else None,
+        )
+
+    return len(statements) + len(pages)
@@ -5,16 +5,137 @@ This module contains functions that interact with the database to perform user-r
 It includes functions to retrieve, create, update, and delete user records, as well as handling
 other database operations specific to user management, such as verifying credentials and managing
 user roles and permissions.
+
+Read-only listings go through `fetch_user_rows`, which selects table columns instead of ORM
+entities: rows come back as plain tuples, without identity map bookkeeping or attribute
+instrumentation.
+
+Hot statements are built once at import time with bound parameters, so every call reuses the same
+statement object and hits the compiled statement cache of the engine. Those looking users up by
+username are listed in `HOT_STATEMENTS` so that they can be compiled ahead of the first request;
+the pages of the listing are built per call by `fetch_user_rows`, whose shapes are warmed up with
+empty pages (see `processes.warm_up`).
+
+Reaction filters are pushed down to SQL through `reactions.core.documents`, matching the
+expression and GIN indexes of the reaction counters on PostgreSQL.
+
+Incremental synchronization reads users, archived users and tombstones through
+`fetch_user_changes`, a keyset scan over the `(version, id)` order that touches only the rows
+changed after the cursor.
+
+Username prefix searches go through `search_user_rows`, one statement per ranking and table, and
+the in-memory search index of the active users is loaded with `iter_search_rows`.
+
+Archived users (see `reactions.domains.users.archival`) are read by username, through
+`fetch_archived_user_rows`, when the `users` table has no such user, and by prefix searches that
+include them. Exports and analytics read them through `exports.iter_batches`.
 """
 
-from typing import List
+import operator
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
 
+from sqlalchemy import (
+    Row,
+    Select,
+    Table,
+    and_,
+    bindparam,
+    cast,
+    func,
+    literal,
+    null,
+    or_,
+    select,
+    tuple_,
+    union_all,
+)
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
 
 from reactions.apps.users import models
+from reactions.core import documents
+from reactions.domains.users import schemas
+
+USER_BY_USERNAME = select(models.User).where(models.User.username == bindparam("username")).limit(1)
+USER_BY_USERNAME_FOR_UPDATE = USER_BY_USERNAME.with_for_update()
+USERS = select(models.User)
+USERS_BY_USERNAME = select(models.User).where(models.User.username == bindparam("username"))
+USERS_BY_USERNAMES = select(models.User).where(
+    models.User.username.in_(bindparam("usernames", expanding=True))
+)
+USERS_BY_USERNAMES_FOR_UPDATE = USERS_BY_USERNAMES.with_for_update()
+USER_ROWS = select(
+    models.User.__table__.c.id,
+    models.User.__table__.c.username,
+    models.User.__table__.c.role,
+    models.User.__table__.c.reactions,
+    models.User.__table__.c.last_reaction_at,
+    models.User.__table__.c.created_at,
+    models.User.__table__.c.updated_at,
+    models.User.__table__.c.total_reactions,
+    models.User.__table__.c.sentiment_score,
+)
+USER_ROWS_BY_USERNAME = USER_ROWS.where(models.User.__table__.c.username == bindparam("username"))
+ARCHIVED_USER_ROWS_BY_USERNAME = select(
+    *(models.ArchivedUser.__table__.c[column.name] for column in USER_ROWS.selected_columns)
+).where(models.ArchivedUser.__table__.c.username == bindparam("username"))
+
+
+def _search_statements(table: Table) -> Tuple[Select, Dict[str, Select]]:
+    # The search rows of a table, and its prefix searches by sort. Prefix patterns escape the
+    # LIKE wildcards with "/" (see `search_user_rows`).
+    columns = table.c
+    rows = select(
+        columns.username,
+        columns.total_reactions,
+        columns.sentiment_score,
+        columns.last_reaction_at,
+    )
+    orders = {
+        "username": (columns.username,),
+        "-total_reactions": (columns.total_reactions.desc(), columns.username.desc()),
+        "-sentiment_score": (columns.sentiment_score.desc(), columns.username.desc()),
+        "-last_reaction_at": (
+            columns.last_reaction_at.desc().nulls_last(),
+            columns.username.desc(),
+        ),
+    }
+    by_prefix = {
+        sort: rows.where(func.lower(columns.username).like(bindparam("pattern"), escape="/"))
+        .order_by(*order)
+        .limit(bindparam("limit"))
+        for sort, order in orders.items()
+    }
+    return rows, by_prefix
+
+
+SEARCH_ROWS, USERS_BY_PREFIX = _search_statements(models.User.__table__)
+_, ARCHIVED_USERS_BY_PREFIX = _search_statements(models.ArchivedUser.__table__)
+
+REACTION_OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+HOT_STATEMENTS: List[Tuple[Select, Dict[str, Any]]] = [
+    (USER_BY_USERNAME, {"username": ""}),
+    (USER_BY_USERNAME_FOR_UPDATE, {"username": ""}),
+    (USERS_BY_USERNAME, {"username": ""}),
+    (USERS_BY_USERNAMES, {"usernames": [""]}),
+    (USERS_BY_USERNAMES_FOR_UPDATE, {"usernames": [""]}),
+    (USER_ROWS_BY_USERNAME, {"username": ""}),
+    (ARCHIVED_USER_ROWS_BY_USERNAME, {"username": ""}),
+    *((statement, {"pattern": "", "limit": 1}) for statement in USERS_BY_PREFIX.values()),
+]
 
 
-def fetch_user_record_by_username(db: Session, username: str) -> models.User | None:
+def fetch_user_record_by_username(
+    db: Session, username: str, for_update: bool = False
+) -> models.User | None:
     """
     Check if a username already exists in the database
     and return the user record if found.
@@ -22,13 +143,13 @@ def fetch_user_record_by_username(db: Session, username: str) -> models.User | N
     Args:
         db (Session): SQLAlchemy database session.
         username (str): username/login to check (e.g., "valentinc94").
+        for_update (bool): Lock the row until the end of the transaction, before writing to it.
 
     Returns:
         models.User | None: The user record if it exists, None otherwise.
     """
-    return (
-        db.query(models.User).filter(models.User.username == username.lower()).first()
-    )
+    statement = USER_BY_USERNAME_FOR_UPDATE if for_update else USER_BY_USERNAME
+    return db.execute(statement, {"username": username.lower()}).scalar_one_or_none()
 
 
 def fetch_users(
@@ -46,9 +167,301 @@ def fetch_users(
         List[models.Users]: A list of users instances matching the provided username.
     """
 
-    query = db.query(models.User)
+    if username:
+        return list(db.execute(USERS_BY_USERNAME, {"username": username}).scalars())
+
+    return list(db.execute(USERS).scalars())
+
+
+def _reaction_conditions(
+    filters: Sequence[schemas.ReactionFilter], users: Any = models.User.__table__.c
+) -> List[Any]:
+    # Ranking fields and counters with an expression index are compared directly; equality on the
+    # other counters is merged into a single containment test, served by the GIN index on
+    # PostgreSQL.
+    contained = [
+        item
+        for item in filters
+        if item.operator == "="
+        and item.kind not in models.INDEXED_REACTIONS
+        and item.kind not in models.RANKING_FIELDS
+    ]
+    equal = {item.kind: item.value for item in contained}
+    conditions = [
+        REACTION_OPERATORS[item.operator](
+            (
+                users[item.kind]
+                if item.kind in models.RANKING_FIELDS
+                else documents.json_integer(users.reactions, item.kind)
+            ),
+            item.value,
+        )
+        for item in filters
+        if item not in contained
+    ]
+
+    if equal:
+        conditions.append(documents.json_contains(users.reactions, equal))
+
+    return conditions
+
+
+def fetch_user_rows(
+    db: Session,
+    username: str | None = None,
+    filters: Sequence[schemas.ReactionFilter] = (),
+    after: str | None = None,
+    limit: int | None = None,
+    sort: str | None = None,
+    after_value: int | None = None,
+) -> List[Row]:
+    """
+    Fetches users from the database as read-only rows.
+
+    Rows are named tuples with the fields id, username, role, reactions, last_reaction_at,
+    created_at, updated_at, total_reactions and sentiment_score. They are not tracked by the
+    session.
+
+    With a limit or a sort, rows are ordered by the sort key, the username breaking ties in the
+    same direction so that every order is served by an index. A sharded session concatenates the
+    first page of every shard, so the pages are merged and cut again here, comparing usernames by
+    code point like the database (the column has the "C" collation on PostgreSQL).
+
+    Args:
+        db (Session): The database session.
+        username (str| None): Optional username associated with the user.
+        filters (Sequence[schemas.ReactionFilter]): Reaction predicates the users must match.
+        after (str | None): Only return users after this username in the sort order.
+        limit (int | None): Maximum number of rows returned.
+        sort (str | None): "username" (the default), or a ranking field, prefixed with "-" for
+            a descending order.
+        after_value (int | None): Ranking field value of the `after` user, with a ranking sort.
+
+    Returns:
+        List[Row]: A list of user rows matching the provided username and filters.
+    """
+
+    statement = USER_ROWS_BY_USERNAME if username else USER_ROWS
+    users = models.User.__table__.c
+    descending = sort is not None and sort.startswith("-")
+    field = (sort or "username").lstrip("-")
+    key = (users.username,) if field == "username" else (users[field], users.username)
+    cursor = (after,) if field == "username" else (after_value, after)
+
+    if filters:
+        statement = statement.where(*_reaction_conditions(filters))
+
+    if after is not None:
+        statement = statement.where(
+            tuple_(*key) < tuple_(*cursor) if descending else tuple_(*key) > tuple_(*cursor)
+        )
+
+    if limit is not None or sort is not None:
+        statement = statement.order_by(*(column.desc() if descending else column for column in key))
+
+    if limit is not None:
+        statement = statement.limit(limit)
 
     if username:
-        query = query.filter(models.User.username == username)
+        rows = list(db.execute(statement, {"username": username}))
+    else:
+        rows = list(db.execute(statement))
+
+    if limit is not None or sort is not None:
+        rows = sorted(
+            rows, key=lambda row: tuple(row._mapping[column] for column in key), reverse=descending
+        )[:limit]
+
+    return rows
+
+
+def fetch_archived_user_rows(
+    db: Session,
+    username: str,
+    filters: Sequence[schemas.ReactionFilter] = (),
+) -> List[Row]:
+    """
+    Fetches an archived user as a read-only row, with the fields of `fetch_user_rows`.
+
+    Args:
+        db (Session): The database session.
+        username (str): Username of the user.
+        filters (Sequence[schemas.ReactionFilter]): Reaction predicates the user must match.
+
+    Returns:
+        List[Row]: The archived user, if any and matching the filters.
+    """
+
+    statement = ARCHIVED_USER_ROWS_BY_USERNAME
+
+    if filters:
+        statement = statement.where(*_reaction_conditions(filters, models.ArchivedUser.__table__.c))
+
+    return list(db.execute(statement, {"username": username}))
 
-    return query.all()
+
+def search_user_rows(
+    db: Session, prefix: str, limit: int, sort: str, include_archived: bool = False
+) -> List[Row]:
+    """
+    Fetches the best users whose username starts with a prefix, whatever its case.
+
+    On PostgreSQL the prefix is matched through the `lower(username)` pattern indexes. A sharded
+    session returns the best rows of every shard, and of every archive when they are included,
+    to be ranked again by the caller.
+
+    Args:
+        db (Session): The database session.
+        prefix (str): Start of the username.
+        limit (int): Number of rows returned at most (per shard and table).
+        sort (str): One of `schemas.UserSearchSort`.
+        include_archived (bool): Also search the archived users.
+
+    Returns:
+        List[Row]: Rows with the fields username, total_reactions, sentiment_score and
+            last_reaction_at.
+    """
+
+    pattern = prefix.lower().replace("/", "//").replace("%", "/%").replace("_", "/_") + "%"
+
+    statements = [USERS_BY_PREFIX[sort]]
+
+    if include_archived:
+        statements.append(ARCHIVED_USERS_BY_PREFIX[sort])
+
+    return [
+        row
+        for statement in statements
+        for row in db.execute(statement, {"pattern": pattern, "limit": limit})
+    ]
+
+
+def iter_search_rows(connection: Connection, batch_size: int = 100_000) -> Iterator[Row]:
+    """
+    Stream the username and ranking fields of every user, through a server-side cursor.
+    """
+
+    result = connection.execution_options(stream_results=True, yield_per=batch_size).execute(
+        SEARCH_ROWS
+    )
+
+    for partition in result.partitions():
+        yield from partition
+
+
+def fetch_users_by_usernames(
+    db: Session,
+    usernames: Iterable[str],
+    for_update: bool = False,
+) -> List[models.User]:
+    """
+    Fetches every user whose username is in the given collection with a single query.
+
+    Args:
+        db (Session): The database session.
+        usernames (Iterable[str]): Usernames to look up.
+        for_update (bool): Lock the rows until the end of the transaction, before writing to them.
+
+    Returns:
+        List[models.User]: The users found. Missing usernames are simply absent.
+    """
+
+    usernames = list(set(usernames))
+
+    if not usernames:
+        return []
+
+    statement = USERS_BY_USERNAMES_FOR_UPDATE if for_update else USERS_BY_USERNAMES
+    return list(db.execute(statement, {"usernames": usernames}).scalars())
+
+
+def _changed_after(
+    columns: Any,
+    since: int,
+    after: str | None,
+    below: int | None,
+) -> List[Any]:
+    if after is None:
+        conditions = [columns.version > since]
+    else:
+        conditions = [
+            or_(columns.version > since, and_(columns.version == since, columns.id > after))
+        ]
+
+    if below is not None:
+        conditions.append(columns.version < below)
+
+    return conditions
+
+
+def fetch_user_changes(
+    db: Session,
+    since: int,
+    after: str | None,
+    below: int | None,
+    limit: int,
+) -> List[Row]:
+    """
+    Fetches the users, archived users and tombstones changed after a `(version, id)` cursor.
+
+    Rows have the fields op ("upsert" or "delete"), version, id, username, role, reactions,
+    last_reaction_at, created_at, updated_at, total_reactions and sentiment_score; the user
+    fields are None for deletions.
+
+    Args:
+        db (Session): The database session.
+        since (int): Version of the cursor.
+        after (str | None): Id of the cursor within `since`; None skips the whole version.
+        below (int | None): Exclusive upper bound of the versions, if any.
+        limit (int): Page size. One extra row is returned when more changes follow.
+
+    Returns:
+        List[Row]: Up to `limit + 1` changes ordered by version and id.
+    """
+
+    users = models.User.__table__.c
+    tombstones = models.UserTombstone.__table__.c
+    upserts, archived = (
+        select(
+            literal("upsert").label("op"),
+            table.version,
+            table.id,
+            table.username,
+            table.role,
+            table.reactions,
+            table.last_reaction_at,
+            table.created_at,
+            table.updated_at,
+            table.total_reactions,
+            table.sentiment_score,
+        )
+        .where(*_changed_after(table, since, after, below))
+        .order_by(table.version, table.id)
+        .limit(limit + 1)
+        .subquery()
+        for table in (users, models.ArchivedUser.__table__.c)
+    )
+    deletes = (
+        select(
+            literal("delete").label("op"),
+            tombstones.version,
+            tombstones.id,
+            tombstones.username,
+            cast(null(), users.role.type).label("role"),
+            cast(null(), users.reactions.type).label("reactions"),
+            cast(null(), users.last_reaction_at.type).label("last_reaction_at"),
+            cast(null(), users.created_at.type).label("created_at"),
+            cast(null(), users.updated_at.type).label("updated_at"),
+            cast(null(), users.total_reactions.type).label("total_reactions"),
+            cast(null(), users.sentiment_score.type).label("sentiment_score"),
+        )
+        .where(*_changed_after(tombstones, since, after, below))
+        .order_by(tombstones.version, tombstones.id)
+        .limit(limit + 1)
+        .subquery()
+    )
+    changes = union_all(select(upserts), select(archived), select(deletes)).subquery()
+
+    return list(
+        db.execute(select(changes).order_by(changes.c.version, changes.c.id).limit(limit + 1))
+    )
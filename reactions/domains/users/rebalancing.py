@@ -0,0 +1,125 @@
+"""
+Rebalancing of sharded users.
+
+After a shard is appended to `DATABASE_SHARD_URLS`, the consistent hash ring assigns it a share
+of the usernames that used to live on the other shards. `rebalance_users` scans every shard in
+primary key order and moves each misplaced user, archived user and tombstone to its new shard:
+rows are inserted into the target first (keeping the target's copy if it already has one) and
+deleted from the source afterwards, one batch per transaction. An interrupted run can simply be
+started again.
+
+Users written between the configuration change and the end of the run are not lost, but a
+lookup may miss a user that has not been moved yet; run it right after adding the shard.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from sqlalchemy import Table, delete, insert, select
+from sqlalchemy.engine import Engine
+
+from reactions.apps.users import models
+from reactions.core import sharding
+
+TABLES = (models.User.__table__, models.ArchivedUser.__table__, models.UserTombstone.__table__)
+
+
+@dataclass
+class RebalanceReport:
+    """
+    Counters of a rebalancing run.
+
+    Attributes:
+        scanned (int): Rows examined.
+        moved (Dict[str, int]): Rows moved to every shard.
+        elapsed (float): Duration of the run in seconds.
+    """
+
+    scanned: int = 0
+    moved: Dict[str, int] = field(default_factory=dict)
+    elapsed: float = 0.0
+
+
+def _move(table: Table, rows: List[Dict], source: Engine, target: Engine) -> None:
+    ids = [row["id"] for row in rows]
+
+    with target.begin() as connection:
+        present = set(connection.scalars(select(table.c.id).where(table.c.id.in_(ids))))
+        taken = set()
+
+        if table is not models.UserTombstone.__table__:
+            # A user created on the target after the shard was added supersedes the old copy.
+            taken = set(
+                connection.scalars(
+                    select(table.c.username).where(
+                        table.c.username.in_([row["username"] for row in rows])
+                    )
+                )
+            )
+
+        missing = [row for row in rows if row["id"] not in present and row["username"] not in taken]
+
+        if missing:
+            connection.execute(insert(table), missing)
+
+    with source.begin() as connection:
+        connection.execute(delete(table).where(table.c.id.in_(ids)))
+
+
+def rebalance_users(
+    shards: sharding.Shards,
+    batch_size: int = 10_000,
+    dry_run: bool = False,
+) -> RebalanceReport:
+    """
+    Move every user, archived user and tombstone to the shard its username hashes to.
+
+    Args:
+        shards (sharding.Shards): The shards, new ones included.
+        batch_size (int): Rows read and moved per transaction.
+        dry_run (bool): Only count the rows that would move.
+
+    Returns:
+        RebalanceReport: Rows scanned and moved.
+    """
+    report = RebalanceReport(moved={shard_id: 0 for shard_id in shards.ids})
+    started = time.perf_counter()
+
+    for table in TABLES:
+        for shard_id, source in shards.engines.items():
+            after = ""
+
+            while True:
+                with source.connect() as connection:
+                    rows = [
+                        dict(row._mapping)
+                        for row in connection.execute(
+                            select(table)
+                            .where(table.c.id > after)
+                            .order_by(table.c.id)
+                            .limit(batch_size)
+                        )
+                    ]
+
+                if not rows:
+                    break
+
+                after = rows[-1]["id"]
+                report.scanned += len(rows)
+                misplaced: Dict[str, List[Dict]] = {}
+
+                for row in rows:
+                    target_id = shards.shard_for(row["username"])
+
+                    if target_id != shard_id:
+                        misplaced.setdefault(target_id, []).append(row)
+
+                for target_id, moved in misplaced.items():
+                    report.moved[target_id] += len(moved)
+
+                    if not dry_run:
+                        _move(table, moved, source, shards.engines[target_id])
+
+    report.elapsed = time.perf_counter() - started
+    return report
@@ -5,13 +5,23 @@ This module defines Pydantic models used for data validation and serialization
 in the Users domain. These schemas are used to define the structure and validation
 rules for incoming and outgoing data related to user management, including user
 creation, updates, authentication, and more.
+
+Lists of items (bulk imports, batch operations) are validated with `validate_batch`: a whole list
+goes through one cached `TypeAdapter` call instead of one model validation per item, and large
+lists validated into plain dicts are split across the process pool of `reactions.core.pools`.
+Errors are reported per item.
 """
 
+import functools
 from datetime import datetime
+from typing import Annotated, Any, Dict, List, Literal, Sequence, Tuple, Union
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError, model_validator
 
 from reactions.apps.users import constants
+from reactions.core import pools, settings
+
+ItemErrors = Dict[int, List[Dict[str, Any]]]
 
 
 class Reactions(BaseModel):
@@ -165,3 +175,405 @@ class UserRetrieve(BaseModel):
         ...,
         description="The timestamp when the transaction was last updated.",
     )
+    total_reactions: int = Field(
+        0,
+        description="Sum of every reaction counter.",
+    )
+    sentiment_score: int = Field(
+        0,
+        description="Positive reactions (plus_one, laugh, heart, hooray, rocket) minus negative "
+        "ones (minus_one, confused).",
+    )
+
+
+UserSort = Literal[
+    "username", "total_reactions", "-total_reactions", "sentiment_score", "-sentiment_score"
+]
+
+UserSearchSort = Literal["-total_reactions", "-sentiment_score", "-last_reaction_at", "username"]
+
+
+class UserMatch(BaseModel):
+    """
+    A user matching a username prefix, with the fields it is ranked by.
+    """
+
+    username: str = Field(
+        ...,
+        description="Unique username of the user",
+    )
+    total_reactions: int = Field(
+        0,
+        description="Sum of every reaction counter.",
+    )
+    sentiment_score: int = Field(
+        0,
+        description="Positive minus negative reaction counters.",
+    )
+    last_reaction_at: str | None = Field(
+        None,
+        description="Timestamp of the user's most recent reaction (UTC)",
+    )
+
+
+class ReactionFilter(BaseModel):
+    """
+    Predicate on a reaction counter or a ranking field (e.g., heart >= 100).
+    """
+
+    kind: Literal[
+        "plus_one",
+        "minus_one",
+        "laugh",
+        "confused",
+        "heart",
+        "hooray",
+        "rocket",
+        "eyes",
+        "total_reactions",
+        "sentiment_score",
+    ] = Field(
+        ...,
+        description="Reaction counter or ranking field compared.",
+    )
+    operator: Literal["=", "!=", "<", "<=", ">", ">="] = Field(
+        ...,
+        description="Comparison operator.",
+    )
+    value: int = Field(
+        ...,
+        description="Value the counter is compared with; only the sentiment score is negative.",
+    )
+
+    @model_validator(mode="after")
+    def check_value_sign(self) -> "ReactionFilter":
+        """
+        Ensures that counters are only compared with non-negative values.
+
+        Raises:
+            ValueError: If a counter other than the sentiment score is compared with a negative
+                value.
+        """
+        if self.value < 0 and self.kind != "sentiment_score":
+            raise ValueError(f"{self.kind} is compared with a non-negative integer")
+        return self
+
+
+class UserCreateOperation(BaseModel):
+    """
+    Batch operation creating a user.
+    """
+
+    op: Literal["create"] = Field(
+        ...,
+        description="Operation type.",
+    )
+    data: UserCreate = Field(
+        ...,
+        description="Data required to create the user.",
+    )
+
+
+class UserUpdateOperation(BaseModel):
+    """
+    Batch operation updating a user.
+    """
+
+    op: Literal["update"] = Field(
+        ...,
+        description="Operation type.",
+    )
+    data: UserUpdate = Field(
+        ...,
+        description="Data required to update the user.",
+    )
+
+
+class UserDeleteOperation(BaseModel):
+    """
+    Batch operation deleting a user.
+    """
+
+    op: Literal["delete"] = Field(
+        ...,
+        description="Operation type.",
+    )
+    username: str = Field(
+        ...,
+        min_length=1,
+        max_length=39,
+        description="username of the user to delete (e.g., 'valentinc94')",
+    )
+
+
+UserOperation = Annotated[
+    Union[UserCreateOperation, UserUpdateOperation, UserDeleteOperation],
+    Field(discriminator="op"),
+]
+
+
+class UserBatch(BaseModel):
+    """
+    Schema for an ordered list of user operations applied in a single request.
+    """
+
+    operations: List[UserOperation] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BATCH_MAX_OPERATIONS,
+        description="Operations to apply, in order.",
+    )
+    chunk_size: int | None = Field(
+        None,
+        ge=1,
+        description=(
+            "Number of operations committed per transaction. "
+            "When omitted the whole batch is applied in a single transaction."
+        ),
+    )
+
+
+class UserBatchPayload(BaseModel):
+    """
+    Envelope of a batch of user operations, validated before the operations themselves.
+    """
+
+    operations: List[Any] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.BATCH_MAX_OPERATIONS,
+    )
+    chunk_size: int | None = Field(
+        None,
+        ge=1,
+    )
+
+
+class UserOperationResult(BaseModel):
+    """
+    Outcome of a single operation of a batch.
+    """
+
+    index: int = Field(
+        ...,
+        description="Position of the operation in the batch.",
+    )
+    op: str = Field(
+        ...,
+        description="Operation type.",
+    )
+    code_transaction: str = Field(
+        ...,
+        description="A code indicating the result of the operation (e.g., 'OK' for success).",
+    )
+    user_id: str | None = Field(
+        None,
+        description="The unique identifier of the affected user.",
+    )
+    message: str | None = Field(
+        None,
+        description="Human-readable description of the failure, if any.",
+    )
+
+
+class UserChange(BaseModel):
+    """
+    A user created, updated or deleted after a change version.
+    """
+
+    op: Literal["upsert", "delete"] = Field(
+        ...,
+        description="'upsert' for a created or updated user, 'delete' for a deleted one.",
+    )
+    version: int = Field(
+        ...,
+        description="Change version of the write.",
+    )
+    id: str = Field(
+        ...,
+        description="Unique identifier of the user.",
+    )
+    username: str = Field(
+        ...,
+        description="Username of the user.",
+    )
+    user: UserRetrieve | None = Field(
+        None,
+        description="Current state of the user; null for deletions.",
+    )
+
+
+class UserChanges(BaseModel):
+    """
+    A page of user changes and the cursor of the next page.
+    """
+
+    changes: List[UserChange] = Field(
+        ...,
+        description="Changes ordered by version and id.",
+    )
+    next_since: int = Field(
+        ...,
+        description="Value of `since` for the next request.",
+    )
+    next_after: str | None = Field(
+        None,
+        description="Value of `after` for the next request.",
+    )
+    has_more: bool = Field(
+        ...,
+        description="Whether more changes are available right away.",
+    )
+
+
+class ReactionDistribution(BaseModel):
+    """
+    Distribution of a reaction counter across users.
+    """
+
+    total: int = Field(
+        ...,
+        description="Sum of the counter over every user.",
+    )
+    mean: float = Field(
+        ...,
+        description="Mean value per user.",
+    )
+    max: int = Field(
+        ...,
+        description="Highest value of a single user.",
+    )
+    percentiles: Dict[str, int] = Field(
+        ...,
+        description="Percentiles of the per-user values (p50, p90, p99).",
+    )
+
+
+class RoleReactions(BaseModel):
+    """
+    Reactions given by the users of one role.
+    """
+
+    users: int = Field(
+        ...,
+        description="Number of users with the role.",
+    )
+    reactions: Dict[str, int] = Field(
+        ...,
+        description="Sum of every reaction counter over the users of the role.",
+    )
+    ratios: Dict[str, float | None] = Field(
+        ...,
+        description="Positive share of each positive/negative reaction pair.",
+    )
+
+
+class ReactionSummary(BaseModel):
+    """
+    Aggregated reaction statistics of a set of users.
+    """
+
+    users: int = Field(
+        ...,
+        description="Number of users analysed.",
+    )
+    reactions: Dict[str, ReactionDistribution] = Field(
+        ...,
+        description="Distribution of every reaction counter.",
+    )
+    total_reactions: ReactionDistribution = Field(
+        ...,
+        description="Distribution of the total number of reactions per user.",
+    )
+    ratios: Dict[str, float | None] = Field(
+        ...,
+        description=(
+            "Positive share of each positive/negative reaction pair "
+            "(plus_one vs minus_one, heart vs confused), or null without reactions."
+        ),
+    )
+    roles: Dict[str, RoleReactions] = Field(
+        ...,
+        description="Breakdown by user role.",
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def list_adapter(item_type: Any) -> TypeAdapter:
+    """
+    Return the cached adapter validating lists of `item_type` (a model or an annotated union).
+    """
+    return TypeAdapter(List[item_type])
+
+
+def validate_batch(
+    item_type: Any, records: Sequence[Any], as_dicts: bool = False
+) -> Tuple[List[Any], ItemErrors]:
+    """
+    Validate a list of records in a single call.
+
+    When some records are invalid, the valid ones are validated again without them, so a list
+    costs at most two calls. With `as_dicts`, lists of at least VALIDATION_PARALLEL_THRESHOLD
+    records are validated in chunks across the process pool: workers send back plain dicts, as
+    validated models would cost more to unpickle than to validate in the caller. Call it from the
+    threadpool, never from the event loop.
+
+    Args:
+        item_type (Any): Type of the items (e.g., `UserCreate`); it must be importable by the
+            worker processes.
+        records (Sequence[Any]): Raw records (dicts, or JSON-compatible values).
+        as_dicts (bool): Return the items as the dicts of their `model_dump()`.
+
+    Returns:
+        Tuple[List[Any], ItemErrors]: The items, aligned with the records (None for invalid
+            ones), and the validation errors of the invalid records by position, with locations
+            relative to the record.
+    """
+    if not as_dicts:
+        return _validate(item_type, records)
+
+    if len(records) < settings.VALIDATION_PARALLEL_THRESHOLD or pools.processes() <= 1:
+        return _validate_dicts(item_type, records)
+
+    size = settings.VALIDATION_CHUNK_SIZE
+    starts = range(0, len(records), size)
+    chunks = pools.get_process_pool().map(
+        functools.partial(_validate_dicts, item_type),
+        [records[start : start + size] for start in starts],
+    )
+    items: List[Any] = []
+    errors: ItemErrors = {}
+
+    for start, (chunk_items, chunk_errors) in zip(starts, chunks):
+        items.extend(chunk_items)
+        errors.update({start + index: error for index, error in chunk_errors.items()})
+
+    return items, errors
+
+
+def _validate(item_type: Any, records: Sequence[Any]) -> Tuple[List[Any], ItemErrors]:
+    adapter = list_adapter(item_type)
+
+    try:
+        return adapter.validate_python(records), {}
+    except ValidationError as e:
+        errors: ItemErrors = {}
+
+        for error in e.errors(include_url=False):
+            index, *loc = error["loc"]
+            errors.setdefault(index, []).append({**error, "loc": tuple(loc)})
+
+    positions = [index for index in range(len(records)) if index not in errors]
+    items: List[Any] = [None] * len(records)
+
+    for index, item in zip(positions, adapter.validate_python([records[i] for i in positions])):
+        items[index] = item
+
+    return items, errors
+
+
+def _validate_dicts(item_type: Any, records: Sequence[Any]) -> Tuple[List[Any], ItemErrors]:
+    # Also the task of the worker processes. The valid items are dumped in a single call.
+    items, errors = _validate(item_type, records)
+    dumped = iter(list_adapter(item_type).dump_python([item for item in items if item is not None]))
+    return [None if item is None else next(dumped) for item in items], errors
@@ -0,0 +1,204 @@
+"""
+Username prefix search.
+
+Searches are case-insensitive prefix matches on the username, ranked by a field of the user:
+total reactions, sentiment score or recency (descending, the username breaking ties in the same
+direction), or the username itself. They are answered either by the database (see
+`queries.search_user_rows`, served by the `lower(username)` pattern index on PostgreSQL) or,
+when SEARCH_INDEX_ENABLED, by a `UsernameIndex` held by every worker.
+
+A `UsernameIndex` keeps the usernames sorted by their lowercase form, so that the users matching
+a prefix are a contiguous slice found by bisection, and ranks the slice with a bounded heap.
+Results of recent searches are cached until the next change. The index is loaded from the
+database and then updated from the user change events.
+"""
+
+import bisect
+import heapq
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Tuple
+
+# Sorts after every character a username can hold, closing the slice of a prefix.
+MAX_CHARACTER = "\U0010ffff"
+
+
+class Match(NamedTuple):
+    """
+    A user as seen by the search: its username and the fields it is ranked by.
+    """
+
+    username: str
+    total_reactions: int
+    sentiment_score: int
+    last_reaction_at: str | None
+
+    @classmethod
+    def of(cls, user: Any) -> "Match":
+        """
+        Build a match from a user row or a user event payload.
+        """
+        fields = user if isinstance(user, dict) else user._mapping
+        last_reaction_at = fields["last_reaction_at"]
+
+        return cls(
+            username=fields["username"],
+            total_reactions=fields["total_reactions"],
+            sentiment_score=fields["sentiment_score"],
+            # Event payloads render a missing timestamp as "None".
+            last_reaction_at=(
+                None if last_reaction_at in (None, "None") else str(last_reaction_at)
+            ),
+        )
+
+
+def _sort_key(sort: str) -> Callable[[Match], Tuple]:
+    field = sort.lstrip("-")
+
+    if field == "username":
+        return lambda match: (match.username,)
+
+    if field == "last_reaction_at":
+        # Users who never reacted come last.
+        return lambda match: (
+            match.last_reaction_at is not None,
+            match.last_reaction_at or "",
+            match.username,
+        )
+
+    return lambda match: (getattr(match, field), match.username)
+
+
+def rank(matches: Iterable[Match], sort: str, limit: int) -> List[Match]:
+    """
+    Return the first `limit` matches in the `sort` order.
+
+    Args:
+        matches (Iterable[Match]): Matches in any order.
+        sort (str): One of `schemas.UserSearchSort`.
+        limit (int): Number of matches returned at most.
+
+    Returns:
+        List[Match]: The best matches, best first.
+    """
+    if sort.startswith("-"):
+        return heapq.nlargest(limit, matches, key=_sort_key(sort))
+
+    return heapq.nsmallest(limit, matches, key=_sort_key(sort))
+
+
+class UsernameIndex:
+    """
+    Sorted in-memory index of the usernames and their ranking fields.
+
+    Args:
+        cache_size (int): Results of recent searches kept until the next change.
+    """
+
+    def __init__(self, cache_size: int = 1024):
+        self.cache_size = cache_size
+        self.ready = False
+        self.loaded_at: float | None = None
+        self._lock = threading.Lock()
+        self._keys: List[Tuple[str, str]] = []
+        self._matches: Dict[str, Match] = {}
+        self._cache: Dict[Tuple[str, str, int], List[Match]] = {}
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._matches)
+
+    def load(self, matches: Iterable[Match]) -> int:
+        """
+        Replace the content of the index.
+
+        Args:
+            matches (Iterable[Match]): Every user.
+
+        Returns:
+            int: Number of users indexed.
+        """
+        by_username = {match.username: match for match in matches}
+        keys = sorted((username.lower(), username) for username in by_username)
+
+        with self._lock:
+            self._keys, self._matches = keys, by_username
+            self._changed()
+            self.ready = True
+            self.loaded_at = time.time()
+
+        return len(keys)
+
+    def upsert(self, match: Match) -> None:
+        """
+        Add a user or update its ranking fields.
+        """
+        with self._lock:
+            if match.username not in self._matches:
+                bisect.insort(self._keys, (match.username.lower(), match.username))
+
+            self._matches[match.username] = match
+            self._changed()
+
+    def remove(self, username: str) -> None:
+        """
+        Remove a user, if indexed.
+        """
+        with self._lock:
+            if self._matches.pop(username, None) is None:
+                return
+
+            key = (username.lower(), username)
+            del self._keys[bisect.bisect_left(self._keys, key)]
+            self._changed()
+
+    def apply(self, event_type: str, data: Dict[str, Any]) -> None:
+        """
+        Apply a user change event ("user.created", "user.updated" or "user.deleted").
+        """
+        if event_type == "user.deleted":
+            self.remove(data["username"])
+        elif event_type in ("user.created", "user.updated"):
+            self.upsert(Match.of(data))
+
+    def search(self, prefix: str, limit: int, sort: str) -> List[Match]:
+        """
+        Return the best users whose username starts with `prefix`, whatever its case.
+
+        Args:
+            prefix (str): Start of the username.
+            limit (int): Number of users returned at most.
+            sort (str): One of `schemas.UserSearchSort`.
+
+        Returns:
+            List[Match]: The best matches, best first.
+        """
+        lowered = prefix.lower()
+        cache_key = (lowered, sort, limit)
+
+        with self._lock:
+            cached = self._cache.get(cache_key)
+
+            if cached is not None:
+                return cached
+
+            generation = self._generation
+            start = bisect.bisect_left(self._keys, (lowered,))
+            end = bisect.bisect_left(self._keys, (lowered + MAX_CHARACTER,), lo=start)
+            matches = [self._matches[username] for _, username in self._keys[start:end]]
+
+        result = rank(matches, sort, limit)
+
+        with self._lock:
+            # A change since the slice was taken would make the result stale.
+            if generation == self._generation:
+                if len(self._cache) >= self.cache_size:
+                    del self._cache[next(iter(self._cache))]
+
+                self._cache[cache_key] = result
+
+        return result
+
+    def _changed(self) -> None:
+        self._generation += 1
+        self._cache.clear()
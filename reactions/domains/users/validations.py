@@ -5,9 +5,32 @@ This module contains lightweight functions to validate user-related data
 before creating, updating or querying users in the database.
 """
 
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import Select, bindparam, select
 from sqlalchemy.orm import Session
 
 from reactions.apps.users import models
+from reactions.domains.users import exceptions, schemas
+
+USERNAME_EXISTS = (
+    select(models.User.id).where(models.User.username == bindparam("username")).limit(1)
+)
+USERNAME_ARCHIVED = (
+    select(models.ArchivedUser.id)
+    .where(models.ArchivedUser.username == bindparam("username"))
+    .limit(1)
+)
+
+REACTION_FILTER = re.compile(r"^\s*(\w+)\s*(!=|<=|>=|==|=|<|>)\s*(\S+)\s*$")
+AND = re.compile(r"\s+and\s+", re.IGNORECASE)
+
+HOT_STATEMENTS: List[Tuple[Select, Dict[str, Any]]] = [
+    (USERNAME_EXISTS, {"username": ""}),
+    (USERNAME_ARCHIVED, {"username": ""}),
+]
 
 
 def check_if_username_exists(db: Session, username: str) -> bool:
@@ -21,7 +44,118 @@ def check_if_username_exists(db: Session, username: str) -> bool:
     Returns:
         bool: True if the username already exists, False otherwise.
     """
-    return (
-        db.query(models.User).filter(models.User.username == username).first()
-        is not None
-    )
+    return db.execute(USERNAME_EXISTS, {"username": username}).first() is not None
+
+
+def check_if_username_archived(db: Session, username: str) -> bool:
+    """
+    Check if a username belongs to an archived user.
+
+    Args:
+        db (Session): SQLAlchemy database session.
+        username (str): username to check (e.g., "valentinc94").
+
+    Returns:
+        bool: True if the user is in the archive, False otherwise.
+    """
+    return db.execute(USERNAME_ARCHIVED, {"username": username}).first() is not None
+
+
+def parse_reaction_filters(expressions: Iterable[str]) -> List[schemas.ReactionFilter]:
+    """
+    Parse reaction filter expressions such as "heart>=100" or "heart >= 100 AND minus_one = 0".
+
+    Args:
+        expressions (Iterable[str]): Expressions, combined with AND.
+
+    Returns:
+        List[schemas.ReactionFilter]: The parsed predicates.
+
+    Raises:
+        exceptions.InvalidReactionFilter: If an expression cannot be parsed.
+    """
+    filters = []
+
+    for expression in expressions:
+        for term in AND.split(expression.strip()):
+            match = REACTION_FILTER.match(term)
+
+            if match is None:
+                raise exceptions.InvalidReactionFilter(expression=term)
+
+            kind, operator, value = match.groups()
+
+            try:
+                filters.append(
+                    schemas.ReactionFilter(
+                        kind=kind, operator="=" if operator == "==" else operator, value=value
+                    )
+                )
+            except ValidationError as e:
+                raise exceptions.InvalidReactionFilter(expression=term) from e
+
+    return filters
+
+
+def parse_user_cursor(after: str, sort: str) -> Tuple[int | None, str]:
+    """
+    Parse the `after` cursor of a user listing sorted by `sort`.
+
+    With the username order the cursor is the last username; with a ranking field it is
+    "<value>:<username>", the value of the field of the last user first.
+
+    Args:
+        after (str): The cursor (`next_after` of the previous page).
+        sort (str): The sort of the listing (e.g., "-total_reactions").
+
+    Returns:
+        Tuple[int | None, str]: The ranking value (None with the username order) and username.
+
+    Raises:
+        exceptions.InvalidUserCursor: If the cursor does not match the sort.
+    """
+    if sort.lstrip("-") == "username":
+        return None, after
+
+    value, separator, username = after.partition(":")
+
+    if not separator or not re.fullmatch(r"-?\d+", value):
+        raise exceptions.InvalidUserCursor(after)
+
+    return int(value), username
+
+
+def parse_user_batch(payload: bytes) -> schemas.UserBatch:
+    """
+    Parse and validate a JSON batch of user operations.
+
+    The operations are validated together with `schemas.validate_batch`, off the event loop when
+    called from the threadpool.
+
+    Args:
+        payload (bytes): Body of the request.
+
+    Returns:
+        schemas.UserBatch: The validated batch.
+
+    Raises:
+        exceptions.InvalidUserBatch: With the errors of the envelope or of every invalid
+            operation, located from the root of the body.
+    """
+    try:
+        envelope = schemas.UserBatchPayload.model_validate_json(payload)
+    except ValidationError as e:
+        raise exceptions.InvalidUserBatch(errors=e.errors(include_url=False)) from e
+
+    operations, errors = schemas.validate_batch(schemas.UserOperation, envelope.operations)
+
+    if errors:
+        raise exceptions.InvalidUserBatch(
+            errors=[
+                {**error, "loc": ("operations", index, *error["loc"])}
+                for index, operation_errors in sorted(errors.items())
+                for error in operation_errors
+            ]
+        )
+
+    return schemas.UserBatch.model_construct(operations=operations, chunk_size=envelope.chunk_size)
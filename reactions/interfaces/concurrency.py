@@ -0,0 +1,112 @@
+"""
+Execution helpers for route handlers.
+
+Blocking work (database access, business processes) is run in the threadpool so that the event
+loop stays free to watch the request: when its deadline passes or the client disconnects, the
+statement in progress is cancelled and the request fails fast instead of holding a pooled
+connection.
+"""
+
+import asyncio
+import functools
+from typing import Any, Callable, TypeVar
+
+from fastapi import HTTPException, Request, status
+from starlette.concurrency import run_in_threadpool
+
+from reactions.core import deadlines, profiling, querylog, settings
+
+T = TypeVar("T")
+
+HTTP_499_CLIENT_CLOSED_REQUEST = 499
+
+
+async def run(request: Request, func: Callable[..., T], **kwargs: Any) -> T:
+    """
+    Run a blocking callable in the threadpool under the deadline of the request.
+
+    Args:
+        request (Request): The request being served. Its deadline is read from
+            `request.state.deadline`, set by `database.get_db`; without one the callable just
+            runs in the threadpool. The callable is sampled when `request.state.profile` is set
+            by the profiling middleware, and its statements are logged under the route of the
+            request when slow.
+        func (Callable[..., T]): The blocking callable.
+        **kwargs: Keyword arguments for the callable.
+
+    Returns:
+        T: The value returned by the callable.
+
+    Raises:
+        HTTPException: 504 `DEADLINE_EXCEEDED` when a statement was cancelled because the
+            deadline passed, or 499 `REQUEST_CANCELLED` when it was cancelled because the client
+            disconnected. Any other exception of the callable is raised unchanged.
+    """
+    deadline: deadlines.Deadline | None = getattr(request.state, "deadline", None)
+    profile: profiling.Profile | None = getattr(request.state, "profile", None)
+    call = functools.partial(func, **kwargs)
+
+    if profile is not None:
+        call = profile.wrap(call)
+
+    route = request.scope.get("route")
+    token = querylog.route.set(f"{request.method} {getattr(route, 'path', request.url.path)}")
+
+    try:
+        task = asyncio.ensure_future(run_in_threadpool(call))
+    finally:
+        querylog.route.reset(token)
+
+    if deadline is not None:
+        await _watch(request, task, deadline)
+
+    try:
+        return await task
+    except Exception as e:
+        # Only a cancelled statement is the deadline's doing; any other error, even one raised as
+        # the deadline fires, is the callable's own.
+        if deadline is None or not deadlines.is_cancellation(e):
+            raise
+
+        if deadline.reason == deadlines.DISCONNECT:
+            raise HTTPException(
+                status_code=HTTP_499_CLIENT_CLOSED_REQUEST,
+                detail={
+                    "code_transaction": "REQUEST_CANCELLED",
+                    "message": "The client disconnected before the request completed.",
+                },
+            ) from e
+
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail={
+                "code_transaction": "DEADLINE_EXCEEDED",
+                "message": f"The request did not complete within {deadline.timeout:g} seconds.",
+            },
+        ) from e
+
+
+async def _watch(request: Request, task: asyncio.Future, deadline: deadlines.Deadline) -> None:
+    """
+    Wait for a task, cancelling its statements once the deadline passes or the client leaves.
+
+    Cancellation is repeated on every poll until the task finishes, so work that goes on to
+    issue further statements is interrupted as well.
+    """
+    while not task.done():
+        timeout = settings.REQUEST_DEADLINE_POLL_SECONDS
+
+        if deadline.reason is None:
+            timeout = min(timeout, deadline.remaining)
+
+        await asyncio.wait({task}, timeout=timeout)
+
+        if task.done():
+            return
+
+        if deadline.reason is not None:
+            deadline.cancel()
+        elif deadline.expired:
+            deadline.cancel(reason=deadlines.TIMEOUT)
+        elif await request.is_disconnected():
+            deadline.cancel(reason=deadlines.DISCONNECT)
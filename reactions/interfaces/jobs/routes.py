@@ -0,0 +1,213 @@
+"""
+Routes for background jobs.
+
+Includes endpoints to upload input files, submit jobs, poll their progress and fetch their results
+and files. Jobs run in the workers of `reactions.domains.jobs.runner`, never in the request.
+"""
+
+import os
+
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, responses, status
+from sqlalchemy.orm import Session
+
+from reactions.core import database
+from reactions.domains.commons import schemas as commons_schemas
+from reactions.domains.jobs import exceptions, processes, schemas
+from reactions.interfaces import concurrency
+from reactions.interfaces.jobs import schemas as jobs_schemas
+
+router = APIRouter()
+
+UPLOAD_EXTENSIONS = ("csv", "ndjson")
+
+
+@router.post(
+    "/v1/jobs/uploads/",
+    response_model=jobs_schemas.UploadResponse,
+    tags=["Jobs"],
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        400: {
+            "description": "Bad Request",
+            "model": commons_schemas.ErrorResponse,
+        }
+    },
+)
+async def upload_file(request: Request, file: UploadFile = File(...)) -> responses.JSONResponse:
+    extension = os.path.splitext(file.filename or "")[1].lstrip(".").lower()
+
+    if extension not in UPLOAD_EXTENSIONS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code_transaction": "UNABLE_TO_UPLOAD_FILE",
+                "message": f"Uploads are {' or '.join(UPLOAD_EXTENSIONS)} files.",
+            },
+        )
+
+    name = await concurrency.run(
+        request, processes.save_upload, stream=file.file, extension=extension
+    )
+
+    return responses.JSONResponse(
+        status_code=status.HTTP_201_CREATED,
+        content={
+            "code_transaction": "OK",
+            "upload": name,
+        },
+    )
+
+
+@router.post(
+    "/v1/jobs/",
+    response_model=jobs_schemas.JobResponse,
+    tags=["Jobs"],
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        400: {
+            "description": "Bad Request",
+            "model": commons_schemas.ErrorResponse,
+        }
+    },
+)
+async def submit_job(
+    request: Request,
+    job_data: schemas.JobCreate,
+    db: Session = Depends(database.get_db),
+) -> responses.JSONResponse:
+    try:
+        job = await concurrency.run(request, processes.submit_job, db=db, job_data=job_data)
+    except exceptions.UnknownJobKind as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code_transaction": "UNKNOWN_JOB_KIND",
+                "message": str(e),
+            },
+        ) from e
+    except exceptions.InvalidJobParams as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code_transaction": "INVALID_JOB_PARAMS",
+                "message": str(e),
+                "errors": e.errors,
+            },
+        ) from e
+
+    return responses.JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "code_transaction": "OK",
+            "job_id": job.id,
+        },
+    )
+
+
+@router.get(
+    "/v1/jobs/{job_id}/",
+    response_model=jobs_schemas.JobRetrieveResponse,
+    tags=["Jobs"],
+    responses={
+        400: {
+            "description": "Bad Request",
+            "model": commons_schemas.ErrorResponse,
+        }
+    },
+)
+async def retrieve_job(
+    request: Request,
+    job_id: str,
+    db: Session = Depends(database.get_db),
+) -> responses.JSONResponse:
+    try:
+        job = await concurrency.run(request, processes.retrieve_job, db=db, job_id=job_id)
+    except exceptions.JobDoesNotExist as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code_transaction": "UNABLE_TO_RETRIEVE_JOB",
+                "message": str(e),
+            },
+        ) from e
+
+    return responses.JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "code_transaction": "OK",
+            "data": job.model_dump(mode="json"),
+        },
+    )
+
+
+@router.get(
+    "/v1/jobs/{job_id}/result/",
+    response_model=jobs_schemas.JobResultResponse,
+    tags=["Jobs"],
+    responses={
+        400: {
+            "description": "Bad Request",
+            "model": commons_schemas.ErrorResponse,
+        }
+    },
+)
+async def retrieve_job_result(
+    request: Request,
+    job_id: str,
+    db: Session = Depends(database.get_db),
+) -> responses.JSONResponse:
+    try:
+        result = await concurrency.run(request, processes.retrieve_job_result, db=db, job_id=job_id)
+    except (exceptions.JobDoesNotExist, exceptions.JobNotFinished) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code_transaction": "UNABLE_TO_RETRIEVE_JOB_RESULT",
+                "message": str(e),
+            },
+        ) from e
+
+    return responses.JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "code_transaction": "OK",
+            "data": result.model_dump(mode="json"),
+        },
+    )
+
+
+@router.get(
+    "/v1/jobs/{job_id}/files/{name}",
+    tags=["Jobs"],
+    response_class=responses.FileResponse,
+    responses={
+        400: {
+            "description": "Bad Request",
+            "model": commons_schemas.ErrorResponse,
+        }
+    },
+)
+async def retrieve_job_file(
+    request: Request,
+    job_id: str,
+    name: str,
+    db: Session = Depends(database.get_db),
+) -> responses.FileResponse:
+    try:
+        path = await concurrency.run(
+            request, processes.retrieve_job_file, db=db, job_id=job_id, name=name
+        )
+    except (
+        exceptions.JobDoesNotExist,
+        exceptions.JobNotFinished,
+        exceptions.JobFileDoesNotExist,
+    ) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code_transaction": "UNABLE_TO_RETRIEVE_JOB_FILE",
+                "message": str(e),
+            },
+        ) from e
+
+    return responses.FileResponse(path, filename=name)
@@ -0,0 +1,86 @@
+"""
+Pydantic schema for job responses.
+
+Includes the schema for job-related data structures.
+"""
+
+from pydantic import BaseModel, Field
+
+from reactions.domains.jobs import schemas
+
+
+class JobResponse(BaseModel):
+    """
+    Schema for the response of a job submission.
+
+    Attributes:
+        code_transaction (str): A code indicating the result of the transaction (e.g., "OK" for
+            success).
+        job_id (str): The unique identifier of the submitted job.
+    """
+
+    code_transaction: str = Field(
+        ...,
+        description="A code indicating the result of the transaction (e.g., 'OK' for success).",
+    )
+    job_id: str = Field(
+        ...,
+        description="The unique identifier of the submitted job, to poll its progress.",
+    )
+
+
+class UploadResponse(BaseModel):
+    """
+    Schema for the response of a file upload.
+
+    Attributes:
+        code_transaction (str): A code indicating the result of the transaction.
+        upload (str): Name of the stored file, to be passed to a job.
+    """
+
+    code_transaction: str = Field(
+        ...,
+        description="A code indicating the result of the transaction (e.g., 'OK' for success).",
+    )
+    upload: str = Field(
+        ...,
+        description="Name of the stored file, to be passed as the 'upload' parameter of a job.",
+    )
+
+
+class JobRetrieveResponse(BaseModel):
+    """
+    Schema for the response returned when polling a job.
+
+    Attributes:
+        code_transaction (str): A string representing the status of the operation.
+        data (schemas.JobRetrieve): Status and progress of the job.
+    """
+
+    code_transaction: str = Field(
+        "OK",
+        description="A string representing the status of the operation (e.g., 'OK' for success).",
+    )
+    data: schemas.JobRetrieve = Field(
+        ...,
+        description="Status and progress of the job.",
+    )
+
+
+class JobResultResponse(BaseModel):
+    """
+    Schema for the response returned when fetching the result of a job.
+
+    Attributes:
+        code_transaction (str): A string representing the status of the operation.
+        data (schemas.JobResult): Result of the job.
+    """
+
+    code_transaction: str = Field(
+        "OK",
+        description="A string representing the status of the operation (e.g., 'OK' for success).",
+    )
+    data: schemas.JobResult = Field(
+        ...,
+        description="Result of the job and the files it produced.",
+    )
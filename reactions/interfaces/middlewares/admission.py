@@ -0,0 +1,75 @@
+"""
+Admission control in front of the database pool.
+
+Requests to database-backed routes go through an admission gate chosen by their route class:
+reads (GET, HEAD) and writes (everything else) are limited independently. A request that cannot
+be admitted within the queue deadline is answered right away with 503 and a `Retry-After`
+header instead of waiting for a pooled connection.
+"""
+
+from typing import Iterable
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from reactions.core import admission
+from reactions.interfaces.middlewares import responses
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware bounding concurrent database-using requests.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        read_gate (admission.AdmissionGate): Gate for read requests.
+        write_gate (admission.AdmissionGate): Gate for write requests.
+        retry_after (int): Seconds advertised in the `Retry-After` header of shed requests.
+        path_prefix (str): Only paths starting with this prefix are controlled.
+        exclude_prefixes (Iterable[str]): Paths under the prefix that do not use the database.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        read_gate: admission.AdmissionGate,
+        write_gate: admission.AdmissionGate,
+        retry_after: int = 1,
+        path_prefix: str = "/",
+        exclude_prefixes: Iterable[str] = (),
+    ):
+        self.app = app
+        self.read_gate = read_gate
+        self.write_gate = write_gate
+        self.retry_after = retry_after
+        self.path_prefix = path_prefix
+        self.exclude_prefixes = tuple(exclude_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+
+        if (
+            scope["type"] != "http"
+            or not path.startswith(self.path_prefix)
+            or path.startswith(self.exclude_prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        gate = self.read_gate if scope["method"] in READ_METHODS else self.write_gate
+
+        if not await gate.acquire():
+            await responses.send_error(
+                send,
+                status=503,
+                code_transaction="SERVICE_OVERLOADED",
+                message="The service is overloaded, please retry later.",
+                headers=[(b"retry-after", str(self.retry_after).encode())],
+            )
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
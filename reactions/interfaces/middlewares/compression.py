@@ -0,0 +1,77 @@
+"""
+Response compression.
+
+Responses are gzipped for clients accepting it, except those under GZIP_MINIMUM_SIZE, event
+streams and content that is compressed already (gzipped export parts, archives). Streaming
+responses are compressed chunk by chunk: every chunk is flushed out of the compressor as soon as
+it is produced, so a streamed download or feed is never held back until the compressor's window
+fills or the stream ends.
+"""
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+EXCLUDED_CONTENT_TYPES = (
+    "text/event-stream",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zip",
+    "application/octet-stream",
+)
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    ASGI middleware gzipping responses, flushing streamed chunks as they go.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        minimum_size (int): Responses with a smaller single-message body are sent as is.
+        compresslevel (int): Gzip level, from 1 (fastest) to 9 (smallest).
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        responder: ASGIApp
+
+        if "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = FlushingGZipResponder(
+                self.app, self.minimum_size, compresslevel=self.compresslevel
+            )
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+
+        await responder(scope, receive, send)
+
+
+class FlushingGZipResponder(GZipResponder):
+    """
+    Gzip responder emitting a complete deflate block for every streamed chunk.
+    """
+
+    async def send_with_compression(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            await super().send_with_compression(message)
+            self.content_type_is_excluded = content_type.startswith(EXCLUDED_CONTENT_TYPES)
+            return
+
+        await super().send_with_compression(message)
+
+    def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        self.gzip_file.write(body)
+
+        if more_body:
+            self.gzip_file.flush()
+        else:
+            self.gzip_file.close()
+
+        body = self.gzip_buffer.getvalue()
+        self.gzip_buffer.seek(0)
+        self.gzip_buffer.truncate()
+
+        return body
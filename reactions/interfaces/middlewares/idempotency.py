@@ -0,0 +1,152 @@
+"""
+Idempotency-Key support for write endpoints.
+
+Requests carrying an `Idempotency-Key` header are executed once per key: the response of the
+first execution is stored and replayed for every duplicate delivery, and duplicates arriving
+while the first execution is still running wait for it to finish. Server errors (5xx) and
+requests cancelled or timed out before completing (408, 499) are not stored, so a retry after one
+executes the request again.
+"""
+
+import hashlib
+from typing import Iterable, List
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from reactions.core import idempotency
+from reactions.interfaces.middlewares import responses
+
+HEADER = b"idempotency-key"
+REPLAYED_HEADER = b"idempotent-replayed"
+MAX_KEY_LENGTH = 255
+# Outcomes of requests that did not complete (their writes were rolled back), besides 5xx.
+UNSTORED_STATUSES = {408, 499}
+
+
+class IdempotencyMiddleware:
+    """
+    ASGI middleware replaying stored responses for repeated idempotency keys.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        store (idempotency.IdempotencyStore): Where responses are kept.
+        methods (Iterable[str]): HTTP methods the middleware applies to.
+        path_prefix (str): Only paths starting with this prefix are handled.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        store: idempotency.IdempotencyStore,
+        methods: Iterable[str] = ("POST", "PUT", "DELETE"),
+        path_prefix: str = "/",
+    ):
+        self.app = app
+        self.store = store
+        self.methods = set(methods)
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in self.methods
+            or not scope["path"].startswith(self.path_prefix)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        key = dict(scope["headers"]).get(HEADER)
+
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await responses.send_error(
+                send,
+                status=400,
+                code_transaction="INVALID_IDEMPOTENCY_KEY",
+                message=f"The Idempotency-Key header must have 1 to {MAX_KEY_LENGTH} characters.",
+            )
+            return
+
+        messages = await _read_request(receive)
+        fingerprint = hashlib.sha256(b"".join(m.get("body", b"") for m in messages)).hexdigest()
+        store_key = f"{scope['method']} {scope['path']} {key.decode('latin-1')}"
+
+        stored = await self.store.acquire(store_key)
+
+        if stored is not None:
+            await _replay(send, stored, fingerprint)
+            return
+
+        captured: idempotency.StoredResponse | None = None
+
+        try:
+            captured = await self._execute(scope, messages, receive, send, fingerprint)
+        finally:
+            self.store.release(store_key, captured)
+
+    async def _execute(
+        self,
+        scope: Scope,
+        messages: List[Message],
+        receive: Receive,
+        send: Send,
+        fingerprint: str,
+    ) -> idempotency.StoredResponse | None:
+        pending = list(messages)
+        response = idempotency.StoredResponse(fingerprint=fingerprint, status=500)
+        body: List[bytes] = []
+
+        async def replay_receive() -> Message:
+            if pending:
+                return pending.pop(0)
+            return await receive()
+
+        async def capture_send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response.status = message["status"]
+                response.headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, replay_receive, capture_send)
+
+        if response.status >= 500 or response.status in UNSTORED_STATUSES:
+            return None
+
+        response.body = b"".join(body)
+        return response
+
+
+async def _read_request(receive: Receive) -> List[Message]:
+    messages = []
+
+    while True:
+        message = await receive()
+        messages.append(message)
+
+        if message["type"] != "http.request" or not message.get("more_body", False):
+            return messages
+
+
+async def _replay(send: Send, stored: idempotency.StoredResponse, fingerprint: str) -> None:
+    if stored.fingerprint != fingerprint:
+        await responses.send_error(
+            send,
+            status=422,
+            code_transaction="IDEMPOTENCY_KEY_REUSED",
+            message="The Idempotency-Key was already used with a different request body.",
+        )
+        return
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": stored.status,
+            "headers": stored.headers + [(REPLAYED_HEADER, b"true")],
+        }
+    )
+    await send({"type": "http.response.body", "body": stored.body})
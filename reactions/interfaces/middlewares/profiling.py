@@ -0,0 +1,114 @@
+"""
+On-demand profiling of requests.
+
+A request is profiled when it carries the privileged `X-Profile` header set to PROFILING_TOKEN,
+when it is drawn by PROFILING_SAMPLE_RATE, or, with PROFILING_SLOW_SECONDS, always; in the last
+case its dump is only kept when the request turned out slower than the threshold. The profile is
+stored in the request state for `interfaces.concurrency.run` to sample the blocking calls of the
+request (see `reactions.core.profiling`). Profiled responses carry their `X-Request-ID`, which
+names the dump.
+"""
+
+import hmac
+import logging
+import random
+import re
+import time
+from typing import Callable
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from reactions.core import profiling
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-profile"
+REQUEST_ID_HEADER = b"x-request-id"
+REQUEST_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware profiling selected requests.
+
+    Args:
+        app (ASGIApp): The wrapped application.
+        sampler (profiling.Sampler): Sampler of the process.
+        store (profiling.ProfileStore): Directory the kept profiles are written to.
+        sample_rate (float): Fraction of the requests profiled and kept.
+        slow_seconds (float): Profile every request and keep those at least this slow; 0 disables.
+        token (str): Value of the `X-Profile` header forcing a profile; empty disables it.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sampler: profiling.Sampler,
+        store: profiling.ProfileStore,
+        sample_rate: float = 0.0,
+        slow_seconds: float = 0.0,
+        token: str = "",
+        draw: Callable[[], float] = random.random,
+    ):
+        self.app = app
+        self.sampler = sampler
+        self.store = store
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.token = token.encode()
+        self._draw = draw
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        requested = bool(self.token) and hmac.compare_digest(
+            headers.get(PROFILE_HEADER, b""), self.token
+        )
+        sampled = requested or (self.sample_rate > 0 and self._draw() < self.sample_rate)
+
+        if not sampled and self.slow_seconds <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = headers.get(REQUEST_ID_HEADER, b"").decode("latin-1")
+
+        if not REQUEST_ID.match(request_id):
+            request_id = profiling.new_request_id()
+
+        profile = profiling.Profile(route=scope["path"], request_id=request_id)
+        scope.setdefault("state", {})["profile"] = profile
+
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message = {
+                    **message,
+                    "headers": [
+                        *message.get("headers", []),
+                        (REQUEST_ID_HEADER, request_id.encode()),
+                    ],
+                }
+
+            await send(message)
+
+        self.sampler.start(profile)
+        started = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            duration = time.perf_counter() - started
+            self.sampler.stop(profile)
+            route = scope.get("route")
+            profile.route = f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+            if sampled or duration >= self.slow_seconds:
+                try:
+                    await run_in_threadpool(
+                        self.store.save, profile, duration, self.sampler.interval
+                    )
+                except OSError:
+                    logger.warning("Unable to write the profile of %s", request_id, exc_info=True)
@@ -0,0 +1,45 @@
+"""
+Helpers for middlewares answering requests on their own.
+
+Errors follow the same `detail` structure raised by the API routes through `HTTPException`.
+"""
+
+import json
+from typing import Iterable, Tuple
+
+from starlette.types import Send
+
+
+async def send_error(
+    send: Send,
+    status: int,
+    code_transaction: str,
+    message: str,
+    headers: Iterable[Tuple[bytes, bytes]] = (),
+) -> None:
+    """
+    Send a complete JSON error response through a raw ASGI `send` callable.
+
+    Args:
+        send (Send): The ASGI send callable.
+        status (int): HTTP status code.
+        code_transaction (str): Identifier of the error (e.g., "SERVICE_OVERLOADED").
+        message (str): Human-readable description of the error.
+        headers (Iterable[Tuple[bytes, bytes]]): Extra raw headers to include.
+    """
+    body = json.dumps(
+        {"detail": {"code_transaction": code_transaction, "message": message}}
+    ).encode()
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *headers,
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,173 @@
+"""
+Content negotiation for the user read endpoints.
+
+Responses are encoded as JSON or MessagePack, with the rows of the response either as one object
+per row (the default) or as columns: one array per field, nested fields such as the reaction
+counters becoming nested columns, so that field names are sent once per page instead of once
+per row. The columns follow the schema of the rows, so every page has the same layout whatever
+its rows hold. The encoding and layout are chosen from the `Accept` header:
+
+- application/json: JSON rows (also the answer to */*, application/* and unsupported types);
+- application/msgpack (or application/x-msgpack): MessagePack rows;
+- application/vnd.reactions.columns+json: JSON columns;
+- application/vnd.reactions.columns+msgpack: MessagePack columns.
+"""
+
+import types
+from typing import Any, Dict, List, Sequence, Type, Union, get_args, get_origin
+
+import msgpack
+from fastapi import responses
+from pydantic import BaseModel
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+COLUMNS_JSON = "application/vnd.reactions.columns+json"
+COLUMNS_MSGPACK = "application/vnd.reactions.columns+msgpack"
+
+MEDIA_TYPES = (JSON, MSGPACK, COLUMNS_JSON, COLUMNS_MSGPACK)
+ALIASES = {"application/x-msgpack": MSGPACK, "*/*": JSON, "application/*": JSON}
+
+# OpenAPI description of the alternative encodings, for the `responses` of a route.
+CONTENT = {media_type: {} for media_type in MEDIA_TYPES[1:]}
+
+
+def negotiate(accept: str | None) -> str:
+    """
+    Return the supported media type preferred by an `Accept` header.
+
+    Args:
+        accept (str | None): Value of the header (e.g., "application/msgpack, */*;q=0.1").
+
+    Returns:
+        str: One of `MEDIA_TYPES`; JSON when nothing acceptable is supported.
+    """
+    ranges = []
+
+    for position, item in enumerate((accept or "").split(",")):
+        media_range, *parameters = (part.strip() for part in item.split(";"))
+        quality = 1.0
+
+        for parameter in parameters:
+            name, _, value = parameter.partition("=")
+
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+
+        if quality > 0:
+            ranges.append((-quality, position, media_range.lower()))
+
+    for _, _, media_range in sorted(ranges):
+        media_type = ALIASES.get(media_range, media_range)
+
+        if media_type in MEDIA_TYPES:
+            return media_type
+
+    return JSON
+
+
+def columns(rows: Sequence[Dict[str, Any]], schema: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Turn rows into columns, fields holding a model into nested columns.
+
+    The layout is taken from the schema: a nested field is nested on every page, its columns
+    holding null for the rows where it is null.
+
+    Args:
+        rows (Sequence[Dict[str, Any]]): Rows dumped from `schema`.
+        schema (Type[BaseModel]): Model of the rows.
+
+    Returns:
+        Dict[str, Any]: One list per field, in row order (e.g., {"username": [...],
+            "reactions": {"heart": [...], ...}}).
+    """
+    table: Dict[str, Any] = {}
+
+    for name, field in schema.model_fields.items():
+        values: List[Any] = [row.get(name) for row in rows]
+        model = _nested_model(field.annotation)
+        table[name] = values if model is None else columns([value or {} for value in values], model)
+
+    return table
+
+
+def _nested_model(annotation: Any) -> Type[BaseModel] | None:
+    # A model, or an optional model; lists and dicts of models stay plain columns.
+    candidates = (
+        get_args(annotation)
+        if get_origin(annotation) in (Union, types.UnionType)
+        else (annotation,)
+    )
+
+    for candidate in candidates:
+        if isinstance(candidate, type) and issubclass(candidate, BaseModel):
+            return candidate
+
+    return None
+
+
+def render(
+    content: Dict[str, Any],
+    media_type: str,
+    schema: Type[BaseModel],
+    rows: Sequence[str] = ("data",),
+) -> bytes:
+    """
+    Encode a response document.
+
+    Args:
+        content (Dict[str, Any]): The document, made of JSON types.
+        media_type (str): One of `MEDIA_TYPES`.
+        schema (Type[BaseModel]): Model of the rows.
+        rows (Sequence[str]): Path of the list of rows in the document, laid out as columns with
+            the columnar media types.
+
+    Returns:
+        bytes: The encoded document.
+    """
+    if media_type in (COLUMNS_JSON, COLUMNS_MSGPACK):
+        content = _with_columns(content, schema, rows)
+
+    if media_type in (MSGPACK, COLUMNS_MSGPACK):
+        return msgpack.packb(content, use_bin_type=True)
+
+    return responses.JSONResponse(content=None).render(content)
+
+
+def _with_columns(
+    content: Dict[str, Any], schema: Type[BaseModel], path: Sequence[str]
+) -> Dict[str, Any]:
+    name, *rest = path
+
+    if rest:
+        return {**content, name: _with_columns(content[name], schema, rest)}
+
+    return {**content, name: columns(content[name], schema)}
+
+
+def response(
+    content: Dict[str, Any],
+    media_type: str,
+    schema: Type[BaseModel],
+    rows: Sequence[str] = ("data",),
+    status_code: int = 200,
+) -> responses.Response:
+    """
+    Return the response encoding a document in the negotiated media type.
+    """
+    return encoded_response(render(content, media_type, schema, rows), media_type, status_code)
+
+
+def encoded_response(body: bytes, media_type: str, status_code: int = 200) -> responses.Response:
+    """
+    Return the response of an already encoded document.
+    """
+    return responses.Response(
+        content=body,
+        status_code=status_code,
+        media_type=media_type,
+        headers={"Vary": "Accept"},
+    )
@@ -1,29 +1,267 @@
 """
 Defines the FastAPI application and includes API routers.
 
-Sets up global middleware and routes for users.
+Sets up global middleware and routes for users and operational endpoints. The application is
+built by `create_app`; the database engine of each worker process is created, warmed up and
+disposed of in the application lifespan. Warm-up runs in the background and the worker only
+reports itself ready (`app.state.ready`) once it is done. The change feed broker is started
+with the engine and stopped before it is disposed of, and so are the background job workers when
+JOBS_IN_APP is set, the username search index when SEARCH_INDEX_ENABLED is and the event loop
+monitor when LOOP_MONITOR_ENABLED is.
 """
 
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware import cors
+from starlette.concurrency import run_in_threadpool
 
+from reactions.core import (
+    admission,
+    coalescing,
+    database,
+    events,
+    idempotency,
+    loopmonitor,
+    pools,
+    profiling,
+    settings,
+)
+from reactions.domains.jobs import runner as jobs_runner
+from reactions.domains.users import processes as users_processes
+from reactions.domains.users import search as users_search
+from reactions.interfaces.jobs import routes as jobs_routes
+from reactions.interfaces.middlewares import admission as admission_middleware
+from reactions.interfaces.middlewares import compression as compression_middleware
+from reactions.interfaces.middlewares import idempotency as idempotency_middleware
+from reactions.interfaces.middlewares import profiling as profiling_middleware
+from reactions.interfaces.system import routes as system_routes
 from reactions.interfaces.users import routes as users_routes
 
-app = FastAPI(
-    title="Reactions",
-)
+logger = logging.getLogger(__name__)
+
+
+def warm_up() -> None:
+    """
+    Fill the pools of the current process and compile the hot statements.
+    """
+    database.init_engine()
+
+    for engine in database.engines():
+        database.warm_up(engine, settings.DB_POOL_WARMUP_CONNECTIONS)
+
+    with database.SessionLocal() as db:
+        users_processes.warm_up(db=db)
+
+
+async def _warm_up_until_ready(app: FastAPI) -> None:
+    while True:
+        try:
+            await run_in_threadpool(warm_up)
+        except Exception:
+            # Not only database errors: a worker whose warm-up failed would never become ready.
+            logger.warning("Unable to warm up the database, retrying", exc_info=True)
+            await asyncio.sleep(settings.DB_WARMUP_RETRY_SECONDS)
+        else:
+            app.state.ready = True
+            return
+
+
+def _load_search_index(index: users_search.UsernameIndex) -> int:
+    with database.SessionLocal() as db:
+        return users_processes.load_search_index(db=db, index=index)
+
+
+async def _maintain_search_index(
+    index: users_search.UsernameIndex, broker: events.InProcessBroker
+) -> None:
+    # Subscribing before loading means that no change is missed between the two; changes already
+    # loaded are applied twice, which is harmless. A subscription that fell behind is dropped by
+    # the broker, so the index is reloaded with a new one, as it is every refresh interval and after
+    # an event that could not be applied.
+    loop = asyncio.get_running_loop()
+
+    while True:
+        async with broker.subscribe() as subscription:
+            try:
+                loaded = await run_in_threadpool(_load_search_index, index)
+            except Exception:
+                # Not only database errors: the task would end and the index would go stale.
+                logger.warning("Unable to load the username search index, retrying", exc_info=True)
+                await asyncio.sleep(settings.DB_WARMUP_RETRY_SECONDS)
+                continue
+
+            logger.info("Username search index loaded with %d users", loaded)
+            refresh_at = loop.time() + settings.SEARCH_INDEX_REFRESH_SECONDS
+
+            while (remaining := refresh_at - loop.time()) > 0:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=remaining)
+                except TimeoutError:
+                    break
+
+                if event is None or event.type == events.RESET:
+                    break
+
+                try:
+                    index.apply(event.type, event.data)
+                except Exception:
+                    logger.warning(
+                        "Unable to apply %s to the search index", event.type, exc_info=True
+                    )
+                    break
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Manage the resources of a worker process for the lifetime of the application.
+    """
+    engine = database.init_engine()
+    broker = events.create_broker(engine)
+    broker.start()
+    events.set_broker(broker)
+    job_workers = None
+
+    if settings.JOBS_IN_APP and settings.JOBS_WORKERS > 0:
+        job_workers = jobs_runner.WorkerPool()
+        job_workers.start()
+
+    search_index_task = None
+
+    if getattr(app.state, "users_search_index", None) is not None:
+        search_index_task = asyncio.create_task(
+            _maintain_search_index(app.state.users_search_index, broker)
+        )
+
+    loop_monitor_task = None
+
+    if getattr(app.state, "loop_monitor", None) is not None:
+        loop_monitor_task = asyncio.create_task(app.state.loop_monitor.run())
+
+    app.state.ready = not settings.WARMUP_ENABLED
+    warm_up_task = None
+
+    if settings.WARMUP_ENABLED:
+        warm_up_task = asyncio.create_task(_warm_up_until_ready(app))
+
+    try:
+        yield
+    finally:
+        for task in (warm_up_task, search_index_task, loop_monitor_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        if job_workers is not None:
+            await run_in_threadpool(job_workers.stop)
+
+        events.set_broker(None)
+        broker.stop()
+        pools.shutdown_process_pool()
+        database.dispose_engine()
+
+
+def create_app() -> FastAPI:
+    """
+    Build the FastAPI application.
+
+    Returns:
+        FastAPI: A new application with its middleware, routers and lifespan configured.
+    """
+    app = FastAPI(
+        title="Reactions",
+        lifespan=lifespan,
+    )
+
+    # Include global middleware (the last one added is the outermost)
+    if settings.ADMISSION_ENABLED:
+        app.state.admission_gates = [
+            admission.AdmissionGate(
+                name="read",
+                limit=settings.ADMISSION_READ_LIMIT,
+                queue_size=settings.ADMISSION_READ_QUEUE,
+                queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            ),
+            admission.AdmissionGate(
+                name="write",
+                limit=settings.ADMISSION_WRITE_LIMIT,
+                queue_size=settings.ADMISSION_WRITE_QUEUE,
+                queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            ),
+        ]
+        app.add_middleware(
+            admission_middleware.AdmissionControlMiddleware,
+            read_gate=app.state.admission_gates[0],
+            write_gate=app.state.admission_gates[1],
+            retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+            path_prefix="/api/",
+            # The change feed holds its connection open and would pin an admission slot.
+            exclude_prefixes=["/api/v1/system/", "/api/v1/users/events/"],
+        )
+
+    if settings.COALESCING_ENABLED:
+        app.state.users_flights = coalescing.SingleFlight(
+            name="users", wait_timeout=settings.COALESCING_WAIT_SECONDS
+        )
+
+    if settings.SEARCH_INDEX_ENABLED:
+        app.state.users_search_index = users_search.UsernameIndex()
+
+    if settings.LOOP_MONITOR_ENABLED:
+        app.state.loop_monitor = loopmonitor.LoopMonitor(
+            interval=settings.LOOP_MONITOR_INTERVAL_SECONDS,
+            threshold=settings.LOOP_BLOCKING_THRESHOLD_SECONDS,
+        )
+
+    app.add_middleware(
+        idempotency_middleware.IdempotencyMiddleware,
+        store=idempotency.IdempotencyStore(
+            max_keys=settings.IDEMPOTENCY_MAX_KEYS,
+            ttl_seconds=settings.IDEMPOTENCY_TTL_SECONDS,
+        ),
+        path_prefix="/api/v1/users/",
+    )
+    if settings.PROFILING_ENABLED or settings.PROFILING_TOKEN:
+        # Outside admission control, so that time spent queuing counts towards
+        # PROFILING_SLOW_SECONDS.
+        app.add_middleware(
+            profiling_middleware.ProfilingMiddleware,
+            sampler=profiling.get_sampler(),
+            store=profiling.get_store(),
+            sample_rate=settings.PROFILING_SAMPLE_RATE if settings.PROFILING_ENABLED else 0.0,
+            slow_seconds=settings.PROFILING_SLOW_SECONDS if settings.PROFILING_ENABLED else 0.0,
+            token=settings.PROFILING_TOKEN,
+        )
+
+    if settings.GZIP_ENABLED:
+        # Outside idempotency, so that replayed responses are encoded for the client replaying.
+        app.add_middleware(
+            compression_middleware.CompressionMiddleware,
+            minimum_size=settings.GZIP_MINIMUM_SIZE,
+            compresslevel=settings.GZIP_LEVEL,
+        )
+
+    app.add_middleware(
+        cors.CORSMiddleware,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        allow_origins=[
+            "http://localhost:3000",
+            "https://foundeaver.ai",
+        ],
+    )
+
+    # Include API routers
+    app.include_router(users_routes.router, prefix="/api")
+    app.include_router(jobs_routes.router, prefix="/api")
+    app.include_router(system_routes.router, prefix="/api")
+
+    return app
 
-# Include global middleware
-app.add_middleware(
-    cors.CORSMiddleware,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-    allow_origins=[
-        "http://localhost:3000",
-        "https://foundeaver.ai",
-    ],
-)
 
-# Include API routers
-app.include_router(users_routes.router, prefix="/api")
+app = create_app()
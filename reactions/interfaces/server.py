@@ -0,0 +1,29 @@
+"""
+Multi-worker entry point.
+
+Runs the application with uvicorn through the `create_app` factory, so that every worker process
+builds its own application and database engine after it has been forked:
+
+    python -m reactions.interfaces.server
+
+The number of workers, the bind address and the per-worker pool are configured with the
+WEB_CONCURRENCY, HOST, PORT, DB_POOL_SIZE and DB_MAX_OVERFLOW environment variables.
+"""
+
+import uvicorn
+
+from reactions.core import settings
+
+
+def main() -> None:
+    uvicorn.run(
+        "reactions.interfaces.routes:create_app",
+        factory=True,
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=settings.WEB_CONCURRENCY,
+    )
+
+
+if __name__ == "__main__":
+    main()
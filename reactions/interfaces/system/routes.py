@@ -0,0 +1,160 @@
+"""
+Routes for operational endpoints.
+
+Includes endpoints exposing the readiness, runtime metrics, event loop health, profiles and slow
+statements of the application.
+"""
+
+import hmac
+from typing import Literal
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request, responses, status
+from starlette.concurrency import run_in_threadpool
+
+from reactions.core import profiling, querylog, settings
+from reactions.domains.commons import schemas as commons_schemas
+from reactions.interfaces.system import schemas as system_schemas
+
+router = APIRouter()
+
+
+@router.get(
+    "/v1/system/admission/",
+    response_model=system_schemas.AdmissionMetricsResponse,
+    tags=["System"],
+)
+async def get_admission_metrics(request: Request) -> responses.JSONResponse:
+    gates = getattr(request.app.state, "admission_gates", [])
+
+    return responses.JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "code_transaction": "OK",
+            "data": [gate.snapshot() for gate in gates],
+        },
+    )
+
+
+@router.get(
+    "/v1/system/coalescing/",
+    response_model=system_schemas.CoalescingMetricsResponse,
+    tags=["System"],
+)
+async def get_coalescing_metrics(request: Request) -> responses.JSONResponse:
+    flights = getattr(request.app.state, "users_flights", None)
+
+    return responses.JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "code_transaction": "OK",
+            "data": [flights.snapshot()] if flights is not None else [],
+        },
+    )
+
+
+@router.get(
+    "/v1/system/loop/",
+    response_model=system_schemas.LoopMetricsResponse,
+    tags=["System"],
+)
+async def get_loop_metrics(request: Request) -> responses.JSONResponse:
+    monitor = getattr(request.app.state, "loop_monitor", None)
+
+    return responses.JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "code_transaction": "OK",
+            "data": [monitor.snapshot()] if monitor is not None else [],
+        },
+    )
+
+
+@router.get(
+    "/v1/system/ready/",
+    response_model=system_schemas.ReadinessResponse,
+    tags=["System"],
+    responses={
+        503: {
+            "description": "Service Unavailable",
+            "model": commons_schemas.ErrorResponse,
+        }
+    },
+)
+async def get_readiness(request: Request) -> responses.JSONResponse:
+    if not getattr(request.app.state, "ready", False):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={
+                "code_transaction": "NOT_READY",
+                "message": "The worker is still warming up.",
+            },
+        )
+
+    return responses.JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "code_transaction": "OK",
+            "ready": True,
+        },
+    )
+
+
+@router.get(
+    "/v1/system/profiles/",
+    response_model=system_schemas.ProfileSummaryResponse,
+    tags=["System"],
+    responses={
+        403: {
+            "description": "Forbidden",
+            "model": commons_schemas.ErrorResponse,
+        }
+    },
+)
+async def get_profile_summary(
+    limit: int = Query(default=20, ge=1, le=200, description="Number of functions returned."),
+    route: str | None = Query(
+        default=None,
+        description="Only aggregate the profiles of this route (e.g., 'GET /api/v1/users/').",
+    ),
+    x_profile: str = Header(default="", description="PROFILING_TOKEN, when one is configured."),
+) -> responses.JSONResponse:
+    if settings.PROFILING_TOKEN and not hmac.compare_digest(x_profile, settings.PROFILING_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={
+                "code_transaction": "PROFILING_FORBIDDEN",
+                "message": "Profiles are only available with the X-Profile token.",
+            },
+        )
+
+    summary = await run_in_threadpool(profiling.get_store().summary, limit=limit, route=route)
+
+    return responses.JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "code_transaction": "OK",
+            "data": summary,
+        },
+    )
+
+
+@router.get(
+    "/v1/system/slow-queries/",
+    response_model=system_schemas.SlowQueriesResponse,
+    tags=["System"],
+)
+async def get_slow_queries(
+    limit: int = Query(default=10, ge=1, le=200, description="Number of shapes returned."),
+    order: Literal["total", "max", "count"] = Query(
+        default="total",
+        description="Rank shapes by total time, slowest execution or number of executions.",
+    ),
+) -> responses.JSONResponse:
+    return responses.JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "code_transaction": "OK",
+            "threshold": settings.SLOW_QUERY_SECONDS,
+            "data": querylog.get_log().top(limit=limit, order=order),
+        },
+    )
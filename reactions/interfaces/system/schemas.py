@@ -0,0 +1,223 @@
+"""
+Pydantic schemas for operational endpoints.
+
+Includes the schemas describing the readiness, runtime metrics, event loop health, profiles and
+slow statements of the application.
+"""
+
+from typing import Any, Dict, List
+
+from pydantic import BaseModel, Field
+
+
+class AdmissionGateMetrics(BaseModel):
+    """
+    State and counters of an admission gate.
+    """
+
+    name: str = Field(..., description="Route class controlled by the gate (read or write).")
+    limit: int = Field(..., description="Maximum number of concurrently admitted requests.")
+    queue_size: int = Field(..., description="Maximum number of waiting requests.")
+    queue_timeout: float = Field(..., description="Seconds a request may wait for a slot.")
+    active: int = Field(..., description="Requests currently admitted.")
+    waiting: int = Field(..., description="Requests currently waiting for a slot.")
+    admitted: int = Field(..., description="Requests admitted since start.")
+    queued: int = Field(..., description="Requests that had to wait since start.")
+    shed: int = Field(..., description="Requests rejected with 503 since start.")
+    timed_out: int = Field(..., description="Shed requests that waited until the deadline.")
+    queue_time_total: float = Field(..., description="Total seconds spent waiting.")
+    queue_time_max: float = Field(..., description="Longest wait in seconds.")
+
+
+class AdmissionMetricsResponse(BaseModel):
+    """
+    Schema for the response returned when retrieving admission control metrics.
+    """
+
+    code_transaction: str = Field(
+        "OK",
+        description="A string representing the status of the operation (e.g., 'OK' for success).",
+    )
+    data: List[AdmissionGateMetrics] = Field(
+        ...,
+        description="Metrics of every admission gate.",
+    )
+
+
+class SingleFlightMetrics(BaseModel):
+    """
+    State and counters of a single-flight group.
+    """
+
+    name: str = Field(..., description="Read path coalesced by the group (e.g., users).")
+    wait_timeout: float = Field(..., description="Seconds a follower waits for the leader.")
+    in_flight: int = Field(..., description="Distinct reads currently in flight.")
+    leaders: int = Field(..., description="Reads run against the database since start.")
+    coalesced: int = Field(..., description="Requests served by another request's read.")
+    timed_out: int = Field(..., description="Followers that stopped waiting and read alone.")
+    retried: int = Field(..., description="Followers whose leader failed for itself only.")
+
+
+class CoalescingMetricsResponse(BaseModel):
+    """
+    Schema for the response returned when retrieving request coalescing metrics.
+    """
+
+    code_transaction: str = Field(
+        "OK",
+        description="A string representing the status of the operation (e.g., 'OK' for success).",
+    )
+    data: List[SingleFlightMetrics] = Field(
+        ...,
+        description="Metrics of every single-flight group.",
+    )
+
+
+class BlockingRoute(BaseModel):
+    """
+    Stalls of the event loop attributed to a route or background task.
+    """
+
+    route: str = Field(..., description="Route ('GET /api/v1/users/'), 'task <name>' or '-'.")
+    count: int = Field(..., description="Stalls since start.")
+    total: float = Field(..., description="Total seconds of lag of the stalls.")
+    max: float = Field(..., description="Longest stall in seconds of lag.")
+    last_seen: float = Field(..., description="Unix time of the last stall.")
+    last_location: str | None = Field(None, description="Innermost application frame stalled.")
+
+
+class PoolUsage(BaseModel):
+    """
+    Utilization of the threadpool or of a database connection pool.
+    """
+
+    name: str = Field(..., description="'threadpool' or the database URL, password hidden.")
+    kind: str = Field(..., description="What the pool holds (threads or connections).")
+    capacity: int = Field(..., description="Threads or connections available at most.")
+    in_use: int = Field(..., description="Threads or connections in use when last sampled.")
+    waiting: int = Field(..., description="Calls waiting for a thread when last sampled.")
+    max_in_use: int = Field(..., description="Most threads or connections in use since start.")
+    saturated: bool = Field(..., description="Whether the pool was saturated when last sampled.")
+    saturated_samples: int = Field(..., description="Samples finding the pool saturated.")
+
+
+class LoopMetrics(BaseModel):
+    """
+    Lag and stalls of the event loop of the worker, and utilization of its pools.
+    """
+
+    interval: float = Field(..., description="Seconds between two lag samples.")
+    threshold: float = Field(..., description="Seconds of lag from which the loop is blocked.")
+    samples: int = Field(..., description="Lag samples since start.")
+    lag_last: float = Field(..., description="Last lag in seconds.")
+    lag_max: float = Field(..., description="Highest lag in seconds.")
+    lag_mean: float = Field(..., description="Mean lag in seconds.")
+    blocked: int = Field(..., description="Stalls of at least the threshold since start.")
+    blocking: List[BlockingRoute] = Field(..., description="Stalls by route, most time first.")
+    pools: List[PoolUsage] = Field(..., description="Threadpool and connection pools.")
+
+
+class LoopMetricsResponse(BaseModel):
+    """
+    Schema for the response returned when retrieving event loop metrics.
+    """
+
+    code_transaction: str = Field(
+        "OK",
+        description="A string representing the status of the operation (e.g., 'OK' for success).",
+    )
+    data: List[LoopMetrics] = Field(
+        ...,
+        description="Metrics of the event loop monitor of the worker, when enabled.",
+    )
+
+
+class ReadinessResponse(BaseModel):
+    """
+    Schema for the response returned when the worker is ready to serve traffic.
+    """
+
+    code_transaction: str = Field(
+        "OK",
+        description="A string representing the status of the operation (e.g., 'OK' for success).",
+    )
+    ready: bool = Field(
+        ...,
+        description="Whether the worker finished warming up.",
+    )
+
+
+class ProfiledFunction(BaseModel):
+    """
+    Time attributed to a function by the kept profiles.
+    """
+
+    function: str = Field(..., description="Function name, file and first line.")
+    cumulative_samples: int = Field(..., description="Samples with the function on the stack.")
+    self_samples: int = Field(..., description="Samples with the function as innermost frame.")
+    cumulative_seconds: float = Field(..., description="Cumulative samples times the interval.")
+
+
+class ProfileSummary(BaseModel):
+    """
+    Aggregate of the kept profiles.
+    """
+
+    profiles: int = Field(..., description="Profiles aggregated.")
+    samples: int = Field(..., description="Stack samples aggregated.")
+    functions: List[ProfiledFunction] = Field(
+        ...,
+        description="Functions with the most cumulative samples first.",
+    )
+
+
+class ProfileSummaryResponse(BaseModel):
+    """
+    Schema for the response returned when retrieving the profile summary.
+    """
+
+    code_transaction: str = Field(
+        "OK",
+        description="A string representing the status of the operation (e.g., 'OK' for success).",
+    )
+    data: ProfileSummary = Field(
+        ...,
+        description="Top functions of the kept profiles.",
+    )
+
+
+class SlowStatement(BaseModel):
+    """
+    Slow executions of a statement shape.
+    """
+
+    fingerprint: str = Field(..., description="Hash identifying the shape.")
+    statement: str = Field(..., description="Statement with its literals and parameters as '?'.")
+    count: int = Field(..., description="Slow executions since start.")
+    total: float = Field(..., description="Total seconds of the slow executions.")
+    max: float = Field(..., description="Slowest execution in seconds.")
+    last_seen: float = Field(..., description="Unix time of the last slow execution.")
+    last_route: str | None = Field(None, description="Route or job of the last slow execution.")
+    last_parameters: Any = Field(None, description="Types of the last parameters.")
+    routes: Dict[str, int] = Field(..., description="Slow executions by route or job.")
+    plan: str | None = Field(None, description="Last captured plan (PostgreSQL).")
+    explained_at: float | None = Field(None, description="Unix time of the plan capture.")
+
+
+class SlowQueriesResponse(BaseModel):
+    """
+    Schema for the response returned when retrieving the slow statement report.
+    """
+
+    code_transaction: str = Field(
+        "OK",
+        description="A string representing the status of the operation (e.g., 'OK' for success).",
+    )
+    threshold: float = Field(
+        ...,
+        description="Seconds from which a statement is logged (SLOW_QUERY_SECONDS).",
+    )
+    data: List[SlowStatement] = Field(
+        ...,
+        description="Slowest statement shapes first.",
+    )
@@ -1,15 +1,33 @@
 """
 Routes for user management.
 
-Includes endpoints for creating, retrieving, and updating user information.
+Includes endpoints for creating, retrieving, searching, updating and batch-applying user
+operations, and the change feed streaming user events.
 """
 
-from fastapi import APIRouter, Depends, Form, HTTPException, Query, responses, status
+import asyncio
+import functools
+from typing import Any, AsyncIterator, Dict, Hashable, List, Type
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    responses,
+    status,
+)
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from reactions.core import database
+from reactions.core import coalescing, database, events, settings
 from reactions.domains.commons import schemas as commons_schemas
-from reactions.domains.users import exceptions, processes, schemas
+from reactions.domains.users import exceptions, processes, schemas, search, validations
+from reactions.interfaces import concurrency, negotiation
 from reactions.interfaces.users import schemas as users_schemas
 
 router = APIRouter()
@@ -27,11 +45,12 @@ router = APIRouter()
     },
 )
 async def create_user(
+    request: Request,
     user_data: schemas.UserCreate,
     db: Session = Depends(database.get_db),
 ) -> responses.JSONResponse:
     try:
-        user = processes.create_user(db=db, user_data=user_data)
+        user = await concurrency.run(request, processes.create_user, db=db, user_data=user_data)
     except exceptions.UsernameAlreadyExists as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -62,11 +81,12 @@ async def create_user(
     },
 )
 async def update_user(
+    request: Request,
     user_data: schemas.UserUpdate,
     db: Session = Depends(database.get_db),
 ) -> responses.JSONResponse:
     try:
-        user = processes.update_user(db=db, user_data=user_data)
+        user = await concurrency.run(request, processes.update_user, db=db, user_data=user_data)
     except exceptions.UserDoesNotExist as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -97,13 +117,14 @@ async def update_user(
     },
 )
 async def delete_user(
+    request: Request,
     username: str = Form(
         ...,
     ),
     db: Session = Depends(database.get_db),
 ) -> responses.JSONResponse:
     try:
-        processes.delete_user(db=db, username=username)
+        await concurrency.run(request, processes.delete_user, db=db, username=username)
     except exceptions.UserDoesNotExist as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -122,31 +143,410 @@ async def delete_user(
     )
 
 
+def _request_body(model: Type[BaseModel]) -> Dict[str, Any]:
+    # OpenAPI description of a body that the route reads and validates itself.
+    schema = model.model_json_schema()
+    definitions = schema.pop("$defs", {})
+
+    def inline(node: Any) -> Any:
+        if isinstance(node, list):
+            return [inline(item) for item in node]
+        if not isinstance(node, dict):
+            return node
+        if "$ref" in node:
+            return inline(definitions[node["$ref"].rsplit("/", 1)[1]])
+
+        return {
+            key: (
+                {"propertyName": value["propertyName"]} if key == "discriminator" else inline(value)
+            )
+            for key, value in node.items()
+        }
+
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": inline(schema)}},
+        }
+    }
+
+
+@router.post(
+    "/v1/users/batch/",
+    response_model=users_schemas.BatchResponse,
+    tags=["Users"],
+    openapi_extra=_request_body(schemas.UserBatch),
+)
+async def apply_user_operations(
+    request: Request,
+    db: Session = Depends(database.get_db),
+) -> responses.JSONResponse:
+    # Parsed and validated as models in the threadpool, off the event loop: a batch holds at most
+    # BATCH_MAX_OPERATIONS operations, too few for the process pool of bulk imports to pay off.
+    payload = await request.body()
+
+    try:
+        batch = await concurrency.run(request, validations.parse_user_batch, payload=payload)
+    except exceptions.InvalidUserBatch as e:
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in e.errors]
+        ) from e
+
+    results = await concurrency.run(
+        request,
+        processes.apply_user_operations,
+        db=db,
+        operations=batch.operations,
+        chunk_size=batch.chunk_size,
+    )
+    applied = all(result.code_transaction == "OK" for result in results)
+
+    return responses.JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "code_transaction": "OK" if applied else "PARTIALLY_APPLIED",
+            "results": [result.model_dump() for result in results],
+        },
+    )
+
+
 @router.get(
     "/v1/users/",
     response_model=users_schemas.UserRetrieveResponse,
     tags=["Users"],
     responses={
+        200: {"content": negotiation.CONTENT},
         400: {
             "description": "Bad Request",
             "model": commons_schemas.ErrorResponse,
-        }
+        },
     },
 )
 async def get_users(
+    request: Request,
     username: str | None = Query(
         default=None,
         description="Optional filter to retrieve user by their username.",
     ),
+    reaction_filters: List[str] = Query(
+        default=[],
+        alias="filter",
+        description=(
+            "Reaction predicates combined with AND, repeated or joined with AND "
+            "(e.g., 'heart>=100', 'heart >= 100 AND minus_one = 0')."
+        ),
+    ),
+    after: str | None = Query(
+        default=None,
+        description="Cursor of the last user of the previous page (use `next_after`).",
+    ),
+    limit: int | None = Query(
+        default=None,
+        ge=1,
+        le=settings.USERS_MAX_PAGE_SIZE,
+        description="Page size; users are then ordered by `sort`. All users when omitted.",
+    ),
+    sort: schemas.UserSort = Query(
+        default="username",
+        description=(
+            "Order of the users: username, or a ranking field, descending when prefixed with '-' "
+            "(e.g., '-total_reactions')."
+        ),
+    ),
+    db: Session = Depends(database.get_db),
+) -> responses.Response:
+    media_type = negotiation.negotiate(request.headers.get("accept"))
+    retrieve = functools.partial(
+        _retrieve_users,
+        request,
+        media_type=media_type,
+        db=db,
+        username=username,
+        reaction_filters=reaction_filters,
+        after=after,
+        limit=limit,
+        sort=sort,
+    )
+    flights: coalescing.SingleFlight | None = getattr(request.app.state, "users_flights", None)
+
+    if flights is None:
+        body = await retrieve()
+    else:
+        key = _users_key(
+            username=username,
+            reaction_filters=reaction_filters,
+            after=after,
+            limit=limit,
+            sort=sort,
+            media_type=media_type,
+        )
+        body = await flights.do(key, retrieve, is_shared=_is_shared)
+
+    return negotiation.encoded_response(body, media_type)
+
+
+async def _retrieve_users(
+    request: Request,
+    media_type: str,
+    db: Session,
+    username: str | None,
+    reaction_filters: List[str],
+    after: str | None,
+    limit: int | None,
+    sort: str,
+) -> bytes:
+    try:
+        users_data = await concurrency.run(
+            request,
+            processes.retrieve_users,
+            db=db,
+            username=username,
+            reaction_filters=reaction_filters,
+            after=after,
+            limit=limit,
+            sort=sort,
+        )
+    except exceptions.InvalidReactionFilter as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code_transaction": "INVALID_REACTION_FILTER",
+                "message": str(e),
+            },
+        ) from e
+    except exceptions.InvalidUserCursor as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code_transaction": "INVALID_USER_CURSOR",
+                "message": str(e),
+            },
+        ) from e
+
+    data = [user.model_dump(mode="json") for user in users_data]
+    next_after = (
+        processes.user_cursor(users_data[-1], sort)
+        if limit is not None and len(data) == limit
+        else None
+    )
+
+    return negotiation.render(
+        {
+            "code_transaction": "OK",
+            "data": data,
+            "next_after": next_after,
+        },
+        media_type,
+        schemas.UserRetrieve,
+    )
+
+
+def _users_key(
+    username: str | None,
+    reaction_filters: List[str],
+    after: str | None,
+    limit: int | None,
+    sort: str,
+    media_type: str,
+) -> Hashable:
+    # Filters are combined with AND: their order, spacing and repetitions do not change the result.
+    try:
+        filters: Hashable = frozenset(
+            (item.kind, item.operator, item.value)
+            for item in validations.parse_reaction_filters(reaction_filters)
+        )
+    except exceptions.InvalidReactionFilter:
+        filters = tuple(reaction_filters)
+
+    return username, filters, after, limit, sort, media_type
+
+
+def _is_shared(error: BaseException) -> bool:
+    # A leader whose client left fails for itself only; its followers run the read again.
+    return not (
+        isinstance(error, HTTPException)
+        and error.status_code == concurrency.HTTP_499_CLIENT_CLOSED_REQUEST
+    )
+
+
+@router.get(
+    "/v1/users/search/",
+    response_model=users_schemas.UserSearchResponse,
+    tags=["Users"],
+    responses={200: {"content": negotiation.CONTENT}},
+)
+async def search_users(
+    request: Request,
+    prefix: str = Query(
+        ...,
+        min_length=1,
+        max_length=39,
+        description="Start of the username, matched whatever its case (e.g., 'valen').",
+    ),
+    limit: int = Query(
+        default=10,
+        ge=1,
+        le=settings.SEARCH_MAX_RESULTS,
+        description="Maximum number of users returned.",
+    ),
+    sort: schemas.UserSearchSort = Query(
+        default="-total_reactions",
+        description=(
+            "Ranking of the users: '-total_reactions', '-sentiment_score', '-last_reaction_at' "
+            "(most recent first) or 'username'."
+        ),
+    ),
+    include_archived: bool = Query(
+        default=False,
+        description="Also search the archived users, which the database then answers.",
+    ),
+    db: Session = Depends(database.get_db),
+) -> responses.Response:
+    index: search.UsernameIndex | None = getattr(request.app.state, "users_search_index", None)
+
+    if index is not None and index.ready and not include_archived:
+        # Answered from memory on the event loop, without a trip through the thread pool.
+        users = processes.search_users(db=db, prefix=prefix, limit=limit, sort=sort, index=index)
+    else:
+        users = await concurrency.run(
+            request,
+            processes.search_users,
+            db=db,
+            prefix=prefix,
+            limit=limit,
+            sort=sort,
+            include_archived=include_archived,
+        )
+
+    return negotiation.response(
+        {
+            "code_transaction": "OK",
+            "data": [user.model_dump() for user in users],
+        },
+        negotiation.negotiate(request.headers.get("accept")),
+        schemas.UserMatch,
+    )
+
+
+@router.get(
+    "/v1/users/changes/",
+    response_model=users_schemas.UserChangesResponse,
+    tags=["Users"],
+    responses={
+        200: {"content": negotiation.CONTENT},
+        400: {
+            "description": "Bad Request",
+            "model": commons_schemas.ErrorResponse,
+        },
+    },
+)
+async def get_user_changes(
+    request: Request,
+    since: int = Query(
+        default=0,
+        ge=0,
+        description="Version of the last change already applied; 0 reads every user.",
+    ),
+    after: str | None = Query(
+        default=None,
+        description="Id of the last change already applied within `since`.",
+    ),
+    limit: int = Query(
+        default=settings.CHANGES_PAGE_SIZE,
+        ge=1,
+        le=settings.CHANGES_MAX_PAGE_SIZE,
+        description="Maximum number of changes returned.",
+    ),
+    db: Session = Depends(database.get_db),
+) -> responses.Response:
+    try:
+        changes = await concurrency.run(
+            request, processes.retrieve_changes, db=db, since=since, after=after, limit=limit
+        )
+    except exceptions.UnableToRetrieveChanges as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "code_transaction": "UNABLE_TO_RETRIEVE_CHANGES",
+                "message": str(e),
+            },
+        ) from e
+
+    return negotiation.response(
+        {
+            "code_transaction": "OK",
+            "data": changes.model_dump(mode="json"),
+        },
+        negotiation.negotiate(request.headers.get("accept")),
+        schemas.UserChange,
+        rows=("data", "changes"),
+    )
+
+
+@router.get(
+    "/v1/users/analytics/",
+    response_model=users_schemas.ReactionSummaryResponse,
+    tags=["Users"],
+)
+async def get_reaction_summary(
+    request: Request,
+    include_archived: bool = Query(
+        default=True,
+        description="Also count the archived users; false covers the active users only.",
+    ),
     db: Session = Depends(database.get_db),
 ) -> responses.JSONResponse:
-    users_data = processes.retrieve_users(db=db, username=username)
-    data = [user.model_dump() for user in users_data]
+    summary = await concurrency.run(
+        request, processes.summarize_reactions, db=db, include_archived=include_archived
+    )
 
     return responses.JSONResponse(
         status_code=status.HTTP_200_OK,
         content={
             "code_transaction": "OK",
-            "data": data,
+            "data": summary.model_dump(),
         },
     )
+
+
+@router.get(
+    "/v1/users/events/",
+    response_class=responses.StreamingResponse,
+    tags=["Users"],
+    responses={
+        200: {
+            "description": "Server-Sent Events stream of user changes.",
+            "content": {"text/event-stream": {}},
+        }
+    },
+)
+async def stream_user_events(
+    last_event_id: int | None = Header(
+        default=None,
+        description="Resume after this event id (sent automatically by EventSource clients).",
+    ),
+) -> responses.StreamingResponse:
+    subscription = events.get_broker().subscribe(last_event_id=last_event_id)
+
+    return responses.StreamingResponse(
+        _event_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _event_stream(subscription: events.Subscription) -> AsyncIterator[str]:
+    async with subscription:
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.get(), timeout=settings.EVENTS_HEARTBEAT_SECONDS
+                )
+            except TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            if event is None:
+                return
+
+            yield event.encode()
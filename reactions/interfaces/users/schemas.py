@@ -58,6 +58,7 @@ class UserRetrieveResponse(BaseModel):
         code_transaction (str): A string representing the status of the operation
             (e.g., "OK" for success, "ERROR" for failure).
         data (List[schemas.UserRetrieve]): The list of retrieved users.
+        next_after (str | None): Cursor of the next page, if any.
     """
 
     code_transaction: str = Field(
@@ -68,3 +69,83 @@ class UserRetrieveResponse(BaseModel):
         ...,
         description="The list of retrieved users.",
     )
+    next_after: str | None = Field(
+        None,
+        description="Cursor of the next page when a limit was given and the page is full.",
+    )
+
+
+class UserSearchResponse(BaseModel):
+    """
+    Schema for the response returned when searching users by username prefix.
+
+    Attributes:
+        code_transaction (str): A string representing the status of the operation.
+        data (List[schemas.UserMatch]): The best matching users, best first.
+    """
+
+    code_transaction: str = Field(
+        "OK",
+        description="A string representing the status of the operation (e.g., 'OK' for success).",
+    )
+    data: List[schemas.UserMatch] = Field(
+        ...,
+        description="The best matching users, best first.",
+    )
+
+
+class BatchResponse(BaseModel):
+    """
+    Schema for the response of a batch of user operations.
+
+    Attributes:
+        code_transaction (str): "OK" when every operation succeeded, "PARTIALLY_APPLIED" otherwise.
+        results (List[schemas.UserOperationResult]): One result per operation, in request order.
+    """
+
+    code_transaction: str = Field(
+        ...,
+        description="'OK' when every operation succeeded, 'PARTIALLY_APPLIED' otherwise.",
+    )
+    results: List[schemas.UserOperationResult] = Field(
+        ...,
+        description="One result per operation, in request order.",
+    )
+
+
+class ReactionSummaryResponse(BaseModel):
+    """
+    Schema for the response returned when summarizing reactions.
+
+    Attributes:
+        code_transaction (str): A string representing the status of the operation.
+        data (schemas.ReactionSummary): The reaction statistics.
+    """
+
+    code_transaction: str = Field(
+        "OK",
+        description="A string representing the status of the operation (e.g., 'OK' for success).",
+    )
+    data: schemas.ReactionSummary = Field(
+        ...,
+        description="Reaction statistics over every user.",
+    )
+
+
+class UserChangesResponse(BaseModel):
+    """
+    Schema for the response returned when retrieving user changes.
+
+    Attributes:
+        code_transaction (str): A string representing the status of the operation.
+        data (schemas.UserChanges): The page of changes and the cursor of the next page.
+    """
+
+    code_transaction: str = Field(
+        "OK",
+        description="A string representing the status of the operation (e.g., 'OK' for success).",
+    )
+    data: schemas.UserChanges = Field(
+        ...,
+        description="The page of changes and the cursor of the next page.",
+    )
@@ -0,0 +1,41 @@
+"""
+Jobs worker entry point.
+
+Runs the background job workers on their own, next to or instead of the ones started by the
+application (see JOBS_IN_APP):
+
+    python -m reactions.interfaces.worker
+
+The number of workers and whether they run as threads or processes are configured with the
+JOBS_WORKERS and JOBS_EXECUTION environment variables. SIGTERM and SIGINT stop the workers once
+their current job is done or checkpointed.
+"""
+
+import logging
+import signal
+import threading
+
+from reactions.core import database
+from reactions.domains.jobs import runner
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    stop = threading.Event()
+
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+
+    pool = runner.WorkerPool()
+    pool.start()
+
+    try:
+        while not stop.wait(1):
+            pass
+    finally:
+        pool.stop()
+        database.dispose_engine()
+
+
+if __name__ == "__main__":
+    main()
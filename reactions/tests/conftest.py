@@ -14,7 +14,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker
 
-from reactions.core import database
+from reactions.core import database, settings
 from reactions.interfaces import routes
 
 
@@ -41,6 +41,26 @@ class TestDatabase:
         return self.session_local()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def app_database(tmp_path_factory: pytest.TempPathFactory) -> Generator[str, None, None]:
+    """
+    Provide the database used by the application lifespan (engine creation and warm-up).
+
+    Sessions used by the tests come from TestDatabase; when no DATABASE_URL is configured a
+    throwaway SQLite file with the schema created is used.
+    """
+    database_url = settings.DATABASE_URL
+
+    if not database_url:
+        database_url = f"sqlite:///{tmp_path_factory.mktemp('app')}/app.db"
+        engine = create_engine(database_url)
+        database.Base.metadata.create_all(bind=engine)
+        engine.dispose()
+        settings.DATABASE_URL = database_url
+
+    yield database_url
+
+
 @pytest.fixture(scope="function")
 def db_session() -> Generator[Session, None, None]:
     """Fixture to manage a test database session."""
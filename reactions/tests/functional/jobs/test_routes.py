@@ -0,0 +1,191 @@
+import asyncio
+import gzip
+import zlib
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from reactions.apps.jobs import constants, models
+from reactions.core import settings
+
+
+class TestJobSubmit:
+    """
+    Tests for job submission and polling via API endpoints.
+    """
+
+    def test_submit_job_returns_pending_job(self, client: TestClient):
+        """
+        Validates that a submitted job is accepted and reported as pending.
+        """
+
+        response = client.post(
+            "/api/v1/jobs/",
+            json={"kind": "export_users", "params": {"format": "csv", "partitions": 2}},
+        )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        job_id = response.json()["job_id"]
+
+        response = client.get(f"/api/v1/jobs/{job_id}/")
+
+        assert response.status_code == status.HTTP_200_OK
+        job = response.json()["data"]
+        assert job["status"] == "pending"
+        assert job["params"] == {
+            "format": "csv",
+            "compression": "none",
+            "partitions": 2,
+            "include_archived": True,
+        }
+        assert job["progress"] == {"done": 0, "total": None}
+
+        response = client.get(f"/api/v1/jobs/{job_id}/result/")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"]["code_transaction"] == "UNABLE_TO_RETRIEVE_JOB_RESULT"
+
+    def test_submit_invalid_jobs_returns_bad_request(self, client: TestClient):
+        """
+        Validates that unknown kinds and invalid parameters are rejected on submission.
+        """
+
+        response = client.post("/api/v1/jobs/", json={"kind": "reindex"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"]["code_transaction"] == "UNKNOWN_JOB_KIND"
+
+        response = client.post(
+            "/api/v1/jobs/", json={"kind": "import_users", "params": {"upload": "../etc/passwd"}}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"]["code_transaction"] == "INVALID_JOB_PARAMS"
+        assert response.json()["detail"]["errors"][0]["loc"] == ["upload"]
+
+
+class TestJobResult:
+    """
+    Tests for uploads, results and files of jobs via API endpoints.
+    """
+
+    def test_upload_file_returns_its_name(self, client: TestClient, tmp_path, monkeypatch):
+        """
+        Validates that uploaded files are stored for import jobs.
+        """
+        monkeypatch.setattr(settings, "JOBS_DIRECTORY", str(tmp_path))
+
+        response = client.post(
+            "/api/v1/jobs/uploads/",
+            files={"file": ("users.csv", b"username,role\nbob_esponja,admin\n", "text/csv")},
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        upload = response.json()["upload"]
+        assert upload.endswith(".csv")
+        assert (tmp_path / "uploads" / upload).read_bytes() == b"username,role\nbob_esponja,admin\n"
+
+        response = client.post(
+            "/api/v1/jobs/", json={"kind": "import_users", "params": {"upload": upload}}
+        )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+
+    def test_retrieve_result_and_files_of_succeeded_job(
+        self, client: TestClient, db_session: Session, tmp_path, monkeypatch
+    ):
+        """
+        Validates that a succeeded job exposes its result and only the files it produced.
+        """
+        monkeypatch.setattr(settings, "JOBS_DIRECTORY", str(tmp_path))
+        job = models.Job.new(kind="export_users", params={})
+        job.status = constants.JobStatus.SUCCEEDED
+        job.result = {"data": {"rows": 1}, "files": ["users.csv"]}
+        db_session.add(job)
+        db_session.commit()
+        (tmp_path / job.id).mkdir()
+        (tmp_path / job.id / "users.csv").write_text("id,username\n1,bob_esponja\n")
+
+        response = client.get(f"/api/v1/jobs/{job.id}/result/")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["data"] == {"data": {"rows": 1}, "files": ["users.csv"]}
+
+        response = client.get(f"/api/v1/jobs/{job.id}/files/users.csv")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.text == "id,username\n1,bob_esponja\n"
+
+        response = client.get(f"/api/v1/jobs/{job.id}/files/users.db")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"]["code_transaction"] == "UNABLE_TO_RETRIEVE_JOB_FILE"
+
+
+class TestJobFileCompression:
+    """
+    Tests for the compression of job files and responses.
+    """
+
+    def test_large_file_is_gzipped_chunk_by_chunk(
+        self, client: TestClient, db_session: Session, tmp_path, monkeypatch
+    ):
+        """
+        Validates that a chunked export download is compressed as it streams: every chunk is
+        sent compressed on its own instead of being buffered until the end of the file.
+        """
+        monkeypatch.setattr(settings, "JOBS_DIRECTORY", str(tmp_path))
+        job = models.Job.new(kind="export_users", params={})
+        job.status = constants.JobStatus.SUCCEEDED
+        job.result = {"data": {"rows": 20000}, "files": ["users.csv"]}
+        db_session.add(job)
+        db_session.commit()
+        content = "id,username\n" + "".join(f"{index},user_{index}\n" for index in range(20000))
+        (tmp_path / job.id).mkdir()
+        (tmp_path / job.id / "users.csv").write_text(content)
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": f"/api/v1/jobs/{job.id}/files/users.csv",
+            "raw_path": f"/api/v1/jobs/{job.id}/files/users.csv".encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"testserver"), (b"accept-encoding", b"gzip")],
+            "client": ("testclient", 50000),
+            "server": ("testserver", 80),
+        }
+        asyncio.run(client.app(scope, receive, send))
+
+        start, *bodies = messages
+        headers = dict(start["headers"])
+        assert start["status"] == status.HTTP_200_OK
+        assert headers[b"content-encoding"] == b"gzip"
+        assert b"content-length" not in headers
+        assert len(bodies) > 2
+        assert all(message["body"] for message in bodies if message.get("more_body"))
+
+        decompressor = zlib.decompressobj(wbits=31)
+        first = decompressor.decompress(bodies[0]["body"])
+        assert first and content.startswith(first.decode())
+        assert gzip.decompress(b"".join(message["body"] for message in bodies)) == content.encode()
+
+    def test_small_responses_are_not_compressed(self, client: TestClient):
+        response = client.get(
+            "/api/v1/jobs/unknown/",
+            headers={"Accept-Encoding": "gzip"},
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "content-encoding" not in response.headers
@@ -0,0 +1,133 @@
+import csv
+import io
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from reactions.apps.jobs import constants, models
+from reactions.apps.users import models as users_models
+from reactions.core import database, settings
+from reactions.domains.jobs import handlers, processes, runner, schemas
+
+
+@pytest.fixture(scope="function")
+def jobs_engine(tmp_path, monkeypatch):
+    """Provide a SQLite file database with the schema created, and a jobs directory."""
+    monkeypatch.setattr(settings, "JOBS_DIRECTORY", str(tmp_path / "jobs"))
+    engine = create_engine(f"sqlite:///{tmp_path}/jobs.db")
+    database.Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def _worker(engine) -> runner.Worker:
+    return runner.Worker(name="worker", storage=engine, session_factory=sessionmaker(bind=engine))
+
+
+class TestWorker:
+    """
+    Tests for the workers running background jobs.
+    """
+
+    def test_export_job_runs_to_completion(self, jobs_engine):
+        with Session(jobs_engine) as db:
+            for username in ("bob_esponja", "calamardo", "patricio"):
+                db.add(users_models.User.new(username=username, reactions={"heart": 1}))
+            db.commit()
+            job = processes.submit_job(
+                db, schemas.JobCreate(kind="export_users", params={"partitions": 2})
+            )
+
+        assert _worker(jobs_engine).run_once() == job.id
+        assert _worker(jobs_engine).run_once() is None
+
+        with Session(jobs_engine) as db:
+            job = db.get(models.Job, job.id)
+            assert job.status == constants.JobStatus.SUCCEEDED
+            assert job.progress_done == 3
+            assert job.result["data"]["rows"] == 3
+            assert job.result["files"] == ["users.csv.part-000", "users.csv.part-001"]
+
+        usernames = []
+        for name in job.result["files"]:
+            with open(f"{handlers.job_directory(job.id)}/{name}", newline="") as stream:
+                usernames += [row["username"] for row in csv.DictReader(stream)]
+        assert sorted(usernames) == ["bob_esponja", "calamardo", "patricio"]
+
+    def test_stale_import_job_resumes_from_checkpoint(self, jobs_engine):
+        """
+        Validates that a job abandoned by a dead worker is claimed again and skips the records
+        committed before its last checkpoint.
+        """
+        with Session(jobs_engine) as db:
+            job = processes.submit_job(
+                db,
+                schemas.JobCreate(
+                    kind="import_users",
+                    params={
+                        "upload": processes.save_upload(
+                            io.BytesIO(
+                                b"username,role\nbob_esponja,admin\ncalamardo,external\n"
+                                b"patricio,external\n,external\narenita,internal\n"
+                            ),
+                            "csv",
+                        ),
+                        "chunk_size": 2,
+                    },
+                ),
+            )
+            job.status = constants.JobStatus.RUNNING
+            job.worker = "dead-worker"
+            job.attempts = 1
+            job.heartbeat_at = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(
+                seconds=settings.JOBS_STALE_SECONDS + 1
+            )
+            job.checkpoint = {
+                "report": {"read": 2, "inserted": 2, "elapsed": 1.0},
+                "rejects_size": 0,
+            }
+            db.commit()
+            job_id = job.id
+
+        assert _worker(jobs_engine).run_once() == job_id
+
+        with Session(jobs_engine) as db:
+            job = db.get(models.Job, job_id)
+            assert job.status == constants.JobStatus.SUCCEEDED
+            assert job.attempts == 2
+            assert job.worker == "worker"
+            assert job.result["data"]["read"] == 5
+            assert job.result["data"]["inserted"] == 4
+            assert job.result["data"]["rejected"] == 1
+            assert job.result["files"] == ["rejects.ndjson"]
+            assert set(db.scalars(select(users_models.User.username))) == {"patricio", "arenita"}
+
+    def test_failing_job_is_marked_failed(self, jobs_engine):
+        class Params(BaseModel):
+            pass
+
+        def explode(context: handlers.JobContext) -> schemas.JobResult:
+            context.save({"step": 1}, done=1)
+            raise RuntimeError("disk full")
+
+        with Session(jobs_engine) as db:
+            db.add(models.Job.new(kind="explode", params={}))
+            db.commit()
+
+        worker = runner.Worker(
+            name="worker",
+            job_handlers={"explode": handlers.Handler(params=Params, run=explode)},
+            storage=jobs_engine,
+            session_factory=sessionmaker(bind=jobs_engine),
+        )
+        worker.run_once()
+
+        with Session(jobs_engine) as db:
+            job = db.scalars(select(models.Job)).one()
+            assert job.status == constants.JobStatus.FAILED
+            assert job.error == "disk full"
+            assert job.checkpoint == {"step": 1}
+            assert job.finished_at is not None
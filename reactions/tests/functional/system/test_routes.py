@@ -0,0 +1,291 @@
+import asyncio
+import time
+
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from reactions.apps.users import models
+from reactions.core import database, events, querylog, settings
+from reactions.domains.users import processes, schemas
+from reactions.domains.users import search as users_search
+from reactions.interfaces import routes
+
+
+class TestAdmissionMetrics:
+    """
+    Tests for the admission control metrics endpoint.
+    """
+
+    def test_admission_metrics_return_success(
+        self,
+        client: TestClient,
+    ):
+        client.get("/api/v1/users/")
+
+        response = client.get("/api/v1/system/admission/")
+
+        assert response.status_code == status.HTTP_200_OK
+
+        results = response.json()
+
+        assert results["code_transaction"] == "OK"
+        assert {gate["name"] for gate in results["data"]} == {"read", "write"}
+        assert all(gate["active"] == 0 for gate in results["data"])
+
+
+class TestReadiness:
+    """
+    Tests for the readiness endpoint.
+    """
+
+    def test_ready_once_warmed_up(
+        self,
+        client: TestClient,
+    ):
+        for _ in range(100):
+            response = client.get("/api/v1/system/ready/")
+
+            if response.status_code == status.HTTP_200_OK:
+                break
+
+            assert response.json()["detail"]["code_transaction"] == "NOT_READY"
+            time.sleep(0.01)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["ready"] is True
+
+    def test_warm_up_reads_no_users(
+        self,
+        db_session: Session,
+    ):
+        for username in ("bob_esponja", "calamardo"):
+            processes.create_user(db=db_session, user_data=schemas.UserCreate(username=username))
+
+        statements = []
+        loaded = []
+
+        def executed(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        def load(user, context):
+            loaded.append(user)
+
+        connection = db_session.connection()
+        event.listen(connection, "after_cursor_execute", executed)
+        event.listen(models.User, "load", load)
+
+        try:
+            compiled = processes.warm_up(db=db_session)
+        finally:
+            event.remove(connection, "after_cursor_execute", executed)
+            event.remove(models.User, "load", load)
+
+        selects = [statement for statement in statements if statement.startswith("SELECT")]
+
+        assert compiled == len(selects)
+        assert loaded == []
+        assert all("WHERE" in statement or "LIMIT" in statement for statement in selects)
+
+
+class TestProfiling:
+    """
+    Tests for request profiling and the profile summary endpoint.
+    """
+
+    def test_privileged_requests_are_profiled(
+        self,
+        db_session: Session,
+        monkeypatch,
+        tmp_path,
+    ):
+        monkeypatch.setattr(settings, "PROFILING_TOKEN", "secret")
+        monkeypatch.setattr(settings, "PROFILING_DIRECTORY", str(tmp_path))
+        monkeypatch.setattr(settings, "PROFILING_MAX_DUMPS", 2)
+
+        def busy_retrieve_users(**kwargs):
+            started = time.perf_counter()
+
+            while time.perf_counter() - started < 0.1:
+                pass
+
+            return []
+
+        monkeypatch.setattr(processes, "retrieve_users", busy_retrieve_users)
+        app = routes.create_app()
+        app.dependency_overrides[database.get_db] = lambda: db_session
+
+        with TestClient(app) as client:
+            response = client.get("/api/v1/users/")
+
+            assert "x-request-id" not in response.headers
+            assert not list(tmp_path.iterdir())
+
+            for request_id in ("first", "second", "third"):
+                response = client.get(
+                    "/api/v1/users/",
+                    params={"username": request_id},
+                    headers={"X-Profile": "secret", "X-Request-ID": request_id},
+                )
+
+                assert response.status_code == status.HTTP_200_OK
+                assert response.headers["x-request-id"] == request_id
+
+            assert sorted(path.name.split("-", 1)[1] for path in tmp_path.iterdir()) == [
+                "second.profile.json",
+                "third.profile.json",
+            ]
+
+            response = client.get("/api/v1/system/profiles/")
+
+            assert response.status_code == status.HTTP_403_FORBIDDEN
+            assert response.json()["detail"]["code_transaction"] == "PROFILING_FORBIDDEN"
+
+            response = client.get(
+                "/api/v1/system/profiles/",
+                params={"route": "GET /api/v1/users/"},
+                headers={"X-Profile": "secret"},
+            )
+
+        assert response.status_code == status.HTTP_200_OK
+        summary = response.json()["data"]
+        assert summary["profiles"] == 2
+        assert summary["samples"] > 0
+        assert any(
+            function["function"].startswith("busy_retrieve_users")
+            for function in summary["functions"]
+        )
+
+
+class TestSlowQueries:
+    """
+    Tests for the slow statement report endpoint.
+    """
+
+    def test_slow_queries_return_top_shapes(
+        self,
+        client: TestClient,
+    ):
+        log = querylog.get_log()
+        log.clear()
+        token = querylog.route.set("GET /api/v1/users/")
+
+        try:
+            for duration in (0.7, 0.9):
+                log.record(
+                    None, "SELECT users.id FROM users WHERE users.username = ?", {}, duration
+                )
+            log.record(None, "SELECT jobs.id FROM jobs LIMIT 1", {}, duration=1.2)
+        finally:
+            querylog.route.reset(token)
+
+        response = client.get("/api/v1/system/slow-queries/", params={"limit": 1})
+
+        assert response.status_code == status.HTTP_200_OK
+
+        [entry] = response.json()["data"]
+
+        assert entry["statement"] == "SELECT users.id FROM users WHERE users.username = ?"
+        assert entry["count"] == 2
+        assert entry["max"] == 0.9
+        assert entry["routes"] == {"GET /api/v1/users/": 2}
+
+        response = client.get("/api/v1/system/slow-queries/", params={"order": "max"})
+
+        assert response.json()["data"][0]["statement"] == "SELECT jobs.id FROM jobs LIMIT ?"
+        log.clear()
+
+
+class TestLoopMetrics:
+    """
+    Tests for the event loop monitor and its metrics endpoint.
+    """
+
+    def test_blocking_routes_are_reported(
+        self,
+        db_session: Session,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(settings, "LOOP_MONITOR_INTERVAL_SECONDS", 0.01)
+        monkeypatch.setattr(settings, "LOOP_BLOCKING_THRESHOLD_SECONDS", 0.05)
+        app = routes.create_app()
+        app.dependency_overrides[database.get_db] = lambda: db_session
+
+        @app.get("/api/v1/blocking/")
+        async def block():
+            time.sleep(0.3)
+
+        with TestClient(app) as client:
+            time.sleep(0.05)
+            client.get("/api/v1/blocking/")
+
+            for _ in range(100):
+                response = client.get("/api/v1/system/loop/")
+
+                if response.json()["data"][0]["blocked"]:
+                    break
+
+                time.sleep(0.01)
+
+        assert response.status_code == status.HTTP_200_OK
+
+        [metrics] = response.json()["data"]
+
+        assert metrics["threshold"] == 0.05
+        assert [entry["route"] for entry in metrics["blocking"]] == ["GET /api/v1/blocking/"]
+        assert "threadpool" in {usage["name"] for usage in metrics["pools"]}
+
+
+class TestSearchIndexMaintenance:
+    """
+    Tests for the background task maintaining the username search index.
+    """
+
+    def test_failures_are_retried(
+        self,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(settings, "DB_WARMUP_RETRY_SECONDS", 0)
+        index = users_search.UsernameIndex()
+        loads = []
+
+        def load(index):
+            loads.append(index)
+
+            if len(loads) == 1:
+                raise RuntimeError("not a database error")
+
+            return 0
+
+        monkeypatch.setattr(routes, "_load_search_index", load)
+
+        async def main():
+            broker = events.InProcessBroker()
+            task = asyncio.create_task(routes._maintain_search_index(index, broker))
+
+            while len(loads) < 2:
+                await asyncio.sleep(0.01)
+
+            # An event that cannot be applied reloads the index instead of ending the task.
+            broker.publish("user.updated", {})
+
+            while len(loads) < 3:
+                await asyncio.sleep(0.01)
+
+            broker.publish(
+                "user.created",
+                {
+                    "username": "calamardo",
+                    "total_reactions": 0,
+                    "sentiment_score": 0,
+                    "last_reaction_at": "None",
+                },
+            )
+            await asyncio.sleep(0.01)
+            task.cancel()
+
+        asyncio.run(asyncio.wait_for(main(), timeout=5))
+
+        assert len(loads) == 3
+        assert [match.username for match in index.search("cal", 10, "username")] == ["calamardo"]
@@ -0,0 +1,267 @@
+import csv
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, func, select, update
+from sqlalchemy.orm import Session
+
+from reactions.apps.users import constants, models
+from reactions.commands import archive_users, export_users, import_users, reaction_stats
+from reactions.core import database
+from reactions.domains.users import processes
+
+
+@pytest.fixture(scope="function")
+def database_url(tmp_path) -> str:
+    """Provide an empty SQLite file database with the schema created."""
+    url = f"sqlite:///{tmp_path}/commands.db"
+    engine = create_engine(url)
+    database.Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    return url
+
+
+def _users(database_url: str) -> dict:
+    engine = create_engine(database_url)
+
+    with Session(engine) as db:
+        users = {user.username: user for user in processes.retrieve_users(db=db)}
+
+    engine.dispose()
+    return users
+
+
+class TestImportUsers:
+    """
+    Tests for the bulk import command.
+    """
+
+    def test_import_csv_with_flattened_reactions(self, tmp_path, database_url: str):
+        path = tmp_path / "users.csv"
+        path.write_text(
+            "username,role,plus_one,heart,last_reaction_at\n"
+            "bob_esponja,admin,3,1,2026-01-01T10:00:00Z\n"
+            "calamardo,external,,,\n"
+            ",external,1,,\n"
+            "patricio,unknown,,,\n"
+        )
+        rejects = tmp_path / "rejects.ndjson"
+
+        report = import_users.main(
+            [
+                str(path),
+                "--database-url",
+                database_url,
+                "--chunk-size",
+                "2",
+                "--rejects",
+                str(rejects),
+            ]
+        )
+
+        assert (report.read, report.inserted, report.rejected) == (4, 2, 2)
+        assert [json.loads(line)["line"] for line in rejects.read_text().splitlines()] == [3, 4]
+
+        users = _users(database_url)
+
+        assert users["bob_esponja"].role == constants.Role.ADMIN
+        assert users["bob_esponja"].reactions.plus_one == 3
+        assert users["bob_esponja"].reactions.heart == 1
+
+    def test_import_rejects_malformed_json(self, tmp_path, database_url: str):
+        path = tmp_path / "users.ndjson"
+        path.write_text('{"username": "bob_esponja"}\n{bad json\n{"username": "calamardo"}\n')
+        rejects = tmp_path / "rejects.ndjson"
+
+        report = import_users.main(
+            [
+                str(path),
+                "--database-url",
+                database_url,
+                "--chunk-size",
+                "2",
+                "--rejects",
+                str(rejects),
+            ]
+        )
+
+        assert (report.read, report.inserted, report.rejected) == (3, 2, 1)
+
+        [rejection] = [json.loads(line) for line in rejects.read_text().splitlines()]
+
+        assert rejection["line"] == 2
+        assert rejection["errors"][0]["type"] == "json_invalid"
+
+        path = tmp_path / "users.csv"
+        path.write_text('username,reactions\npatricio,"{""heart"": 2}"\narenita,{heart\n')
+
+        report = import_users.main([str(path), "--database-url", database_url])
+
+        assert (report.read, report.inserted, report.rejected) == (2, 1, 1)
+        assert _users(database_url)["patricio"].reactions.heart == 2
+
+    def test_import_ndjson_conflicts(self, tmp_path, database_url: str):
+        path = tmp_path / "users.ndjson"
+        path.write_text(
+            '{"username": "bob_esponja", "reactions": {"heart": 1}}\n' '{"username": "calamardo"}\n'
+        )
+
+        import_users.main([str(path), "--database-url", database_url])
+
+        path.write_text('{"username": "bob_esponja", "reactions": {"heart": 7}}\n')
+
+        skipped = import_users.main([str(path), "--database-url", database_url])
+
+        assert (skipped.inserted, skipped.skipped) == (0, 1)
+        assert _users(database_url)["bob_esponja"].reactions.heart == 1
+
+        updated = import_users.main(
+            [str(path), "--database-url", database_url, "--on-conflict", "update"]
+        )
+
+        assert (updated.inserted, updated.updated) == (0, 1)
+        assert _users(database_url)["bob_esponja"].reactions.heart == 7
+
+
+class TestArchiveUsers:
+    """
+    Tests for the archival command.
+    """
+
+    def test_inactive_users_are_archived_and_imports_restore_them(
+        self, tmp_path, database_url: str
+    ):
+        path = tmp_path / "users.ndjson"
+        path.write_text(
+            "".join(
+                f'{{"username": "user_{index}", "last_reaction_at": "2020-01-01T00:00:00Z"}}\n'
+                for index in range(5)
+            )
+            + f'{{"username": "bob_esponja", "last_reaction_at": "{datetime.now().isoformat()}"}}\n'
+        )
+        import_users.main([str(path), "--database-url", database_url])
+        engine = create_engine(database_url)
+
+        with engine.begin() as connection:
+            connection.execute(
+                update(models.User).values(
+                    created_at=datetime(2020, 1, 1), updated_at=datetime(2020, 1, 1)
+                )
+            )
+
+        dry_run = archive_users.main(["--database-url", database_url, "--dry-run"])
+        report = archive_users.main(["--database-url", database_url, "--batch-size", "2"])
+
+        assert (dry_run.archived, report.archived) == (5, 5)
+        assert set(_users(database_url)) == {"bob_esponja"}
+
+        export = export_users.main([str(tmp_path / "all.csv"), "--database-url", database_url])
+        active = export_users.main(
+            [str(tmp_path / "active.csv"), "--database-url", database_url, "--active-only"]
+        )
+
+        with open(export.paths[0], newline="") as stream:
+            rows = list(csv.DictReader(stream))
+
+        assert (export.rows, active.rows) == (6, 1)
+        assert sorted(rows, key=lambda row: row["id"]) == rows
+
+        path.write_text('{"username": "user_1", "reactions": {"heart": 2}}\n')
+        skipped = import_users.main([str(path), "--database-url", database_url])
+        updated = import_users.main(
+            [str(path), "--database-url", database_url, "--on-conflict", "update"]
+        )
+
+        assert (skipped.inserted, skipped.skipped) == (0, 1)
+        assert (updated.inserted, updated.updated) == (0, 1)
+        assert _users(database_url)["user_1"].reactions.heart == 2
+
+        with engine.connect() as connection:
+            assert connection.scalar(select(func.count()).select_from(models.ArchivedUser)) == 4
+
+        engine.dispose()
+
+
+class TestExportUsers:
+    """
+    Tests for the bulk export command.
+    """
+
+    def test_partitioned_csv_export_round_trips(self, tmp_path, database_url: str):
+        source = tmp_path / "users.ndjson"
+        source.write_text(
+            "".join(
+                f'{{"username": "user_{index}", "reactions": {{"heart": {index}}}}}\n'
+                for index in range(50)
+            )
+        )
+        import_users.main([str(source), "--database-url", database_url])
+
+        report = export_users.main(
+            [
+                str(tmp_path / "users.csv.gz"),
+                "--database-url",
+                database_url,
+                "--compression",
+                "gzip",
+                "--partitions",
+                "3",
+                "--batch-size",
+                "7",
+            ]
+        )
+
+        assert report.rows == 50
+        assert len(report.paths) == 3
+
+        rows = []
+
+        for path in report.paths:
+            with gzip.open(path, "rt", newline="") as stream:
+                rows.extend(csv.DictReader(stream))
+
+        assert len(rows) == 50
+        assert sorted(rows, key=lambda row: row["id"]) == rows
+        assert {row["username"]: int(row["heart"]) for row in rows}["user_7"] == 7
+
+    def test_parquet_export(self, tmp_path, database_url: str):
+        parquet = pytest.importorskip("pyarrow.parquet")
+        source = tmp_path / "users.ndjson"
+        source.write_text('{"username": "bob_esponja", "reactions": {"plus_one": 2}}\n')
+        import_users.main([str(source), "--database-url", database_url])
+
+        report = export_users.main(
+            [str(tmp_path / "users.parquet"), "--database-url", database_url]
+        )
+        table = parquet.read_table(report.paths[0])
+
+        assert table.num_rows == 1
+        assert table.column("plus_one").to_pylist() == [2]
+        assert table.column("role").to_pylist() == ["external"]
+
+
+class TestReactionStats:
+    """
+    Tests for the reaction analytics command.
+    """
+
+    def test_file_and_database_summaries_match(self, tmp_path, database_url: str):
+        source = tmp_path / "users.ndjson"
+        source.write_text(
+            "".join(
+                f'{{"username": "user_{index}", "role": "{role}", '
+                f'"reactions": {{"heart": {index % 7}, "confused": {index % 3}}}}}\n'
+                for index, role in zip(range(40), ["admin", "internal", "external"] * 14)
+            )
+        )
+        import_users.main([str(source), "--database-url", database_url])
+        export = export_users.main([str(tmp_path / "users.csv"), "--database-url", database_url])
+
+        from_database = reaction_stats.main(["--database-url", database_url, "--chunk-size", "6"])
+        from_file = reaction_stats.main(["--from-file", export.paths[0], "--chunk-size", "9"])
+
+        assert from_database == from_file
+        assert from_file.users == 40
+        assert from_file.reactions["heart"].total == sum(index % 7 for index in range(40))
@@ -1,9 +1,19 @@
-from fastapi import status
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import msgpack
+from fastapi import HTTPException, Request, status
 from fastapi.testclient import TestClient
+from sqlalchemy import func, select, text, update
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
-from reactions.apps.users import constants
-from reactions.domains.users import processes, schemas
+from reactions.apps.users import constants, models
+from reactions.core import database, deadlines, repository
+from reactions.domains.users import archival, exceptions, processes, schemas, search
+from reactions.interfaces import concurrency
 
 
 class TestUserCreate:
@@ -251,4 +261,795 @@ class TestUserRetrieve:
         results = response.json()
 
         assert results["code_transaction"] == "OK"
-        assert len(results["data"]) == 0
\ No newline at end of file
+        assert len(results["data"]) == 0
+
+    def test_retrieve_users_by_reaction_filters(
+        self,
+        client: TestClient,
+        db_session: Session,
+    ):
+        for username, reactions in (
+            ("valentinc94", {"heart": 150, "minus_one": 0, "eyes": 2}),
+            ("octocat", {"heart": 150, "minus_one": 3, "eyes": 2}),
+            ("hubot", {"heart": 20, "minus_one": 0, "eyes": 2}),
+        ):
+            processes.create_user(
+                db=db_session,
+                user_data=schemas.UserCreate(username=username, reactions=reactions),
+            )
+
+        response = client.get(
+            "/api/v1/users/", params={"filter": ["heart >= 100 AND minus_one = 0", "eyes=2"]}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [user["username"] for user in response.json()["data"]] == ["valentinc94"]
+
+    def test_retrieve_users_with_invalid_reaction_filter(
+        self,
+        client: TestClient,
+    ):
+        response = client.get("/api/v1/users/", params={"filter": "thumbs>=1"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"]["code_transaction"] == "INVALID_REACTION_FILTER"
+
+    def test_retrieve_users_sorted_by_ranking_field(
+        self,
+        client: TestClient,
+        db_session: Session,
+    ):
+        for username, reactions in (
+            ("valentinc94", {"heart": 5, "confused": 1}),
+            ("octocat", {"minus_one": 4, "eyes": 3}),
+            ("hubot", {"rocket": 2, "eyes": 5}),
+            ("monalisa", {"plus_one": 7}),
+        ):
+            processes.create_user(
+                db=db_session,
+                user_data=schemas.UserCreate(username=username, reactions=reactions),
+            )
+
+        response = client.get("/api/v1/users/", params={"sort": "-total_reactions", "limit": 2})
+
+        assert response.status_code == status.HTTP_200_OK
+        results = response.json()
+        assert [user["username"] for user in results["data"]] == ["octocat", "monalisa"]
+        assert results["data"][0]["total_reactions"] == 7
+        assert results["data"][0]["sentiment_score"] == -4
+        assert results["next_after"] == "7:monalisa"
+
+        response = client.get(
+            "/api/v1/users/",
+            params={"sort": "-total_reactions", "limit": 2, "after": results["next_after"]},
+        )
+
+        assert [user["username"] for user in response.json()["data"]] == ["hubot", "valentinc94"]
+
+        response = client.get(
+            "/api/v1/users/", params={"sort": "sentiment_score", "filter": "sentiment_score>=0"}
+        )
+
+        assert [user["username"] for user in response.json()["data"]] == [
+            "hubot",
+            "valentinc94",
+            "monalisa",
+        ]
+
+        response = client.get(
+            "/api/v1/users/", params={"sort": "-total_reactions", "after": "monalisa"}
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"]["code_transaction"] == "INVALID_USER_CURSOR"
+
+    def test_retrieve_users_in_negotiated_format(
+        self,
+        client: TestClient,
+        db_session: Session,
+    ):
+        for username, reactions in (("octocat", {"heart": 3}), ("hubot", {"eyes": 1})):
+            processes.create_user(
+                db=db_session,
+                user_data=schemas.UserCreate(username=username, reactions=reactions),
+            )
+
+        response = client.get("/api/v1/users/", params={"limit": 10})
+        rows = response.json()
+
+        response = client.get(
+            "/api/v1/users/",
+            params={"limit": 10},
+            headers={"Accept": "application/msgpack;q=0.9, text/html;q=1"},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/msgpack"
+        assert response.headers["vary"] == "Accept"
+        assert msgpack.unpackb(response.content) == rows
+
+        response = client.get(
+            "/api/v1/users/",
+            params={"limit": 10},
+            headers={"Accept": "application/vnd.reactions.columns+json"},
+        )
+
+        data = response.json()["data"]
+        assert data["username"] == ["hubot", "octocat"]
+        assert data["reactions"]["heart"] == [0, 3]
+        assert data["reactions"]["eyes"] == [1, 0]
+
+        response = client.get(
+            "/api/v1/users/changes/",
+            headers={"Accept": "application/vnd.reactions.columns+msgpack"},
+        )
+
+        data = msgpack.unpackb(response.content)["data"]
+        assert data["changes"]["op"] == ["upsert", "upsert"]
+        assert sorted(data["changes"]["user"]["username"]) == ["hubot", "octocat"]
+        assert data["has_more"] is False
+
+        processes.delete_user(db=db_session, username="hubot")
+        response = client.get(
+            "/api/v1/users/changes/",
+            params={"since": data["next_since"]},
+            headers={"Accept": "application/vnd.reactions.columns+json"},
+        )
+
+        data = response.json()["data"]
+        assert data["changes"]["op"] == ["delete"]
+        assert data["changes"]["user"]["username"] == [None]
+        assert data["changes"]["user"]["reactions"]["heart"] == [None]
+
+    def test_ranking_fields_follow_reaction_updates(
+        self,
+        client: TestClient,
+        db_session: Session,
+    ):
+        processes.create_user(
+            db=db_session,
+            user_data=schemas.UserCreate(username="valentinc94", reactions={"heart": 3}),
+        )
+
+        response = client.put(
+            "/api/v1/users/",
+            json={"username": "valentinc94", "reactions": {"heart": 1, "minus_one": 4}},
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+
+        [user] = processes.retrieve_users(db=db_session, username="valentinc94")
+
+        assert user.total_reactions == 5
+        assert user.sentiment_score == -3
+
+
+class TestUserBatch:
+    """
+    Tests for batch user operations via API endpoints.
+    """
+
+    def test_batch_applies_operations_in_order(
+        self,
+        client: TestClient,
+        db_session: Session,
+    ):
+        processes.create_user(
+            db=db_session,
+            user_data=schemas.UserCreate(username="calamardo"),
+        )
+
+        response = client.post(
+            "/api/v1/users/batch/",
+            json={
+                "operations": [
+                    {"op": "create", "data": {"username": "bob_esponja"}},
+                    {"op": "update", "data": {"username": "bob_esponja", "role": "admin"}},
+                    {"op": "delete", "username": "calamardo"},
+                    {"op": "create", "data": {"username": "calamardo"}},
+                ]
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+
+        results = response.json()
+
+        assert results["code_transaction"] == "OK"
+        assert [result["code_transaction"] for result in results["results"]] == ["OK"] * 4
+        assert results["results"][0]["user_id"] == results["results"][1]["user_id"]
+        assert results["results"][2]["user_id"] != results["results"][3]["user_id"]
+
+        users = {user.username: user for user in processes.retrieve_users(db=db_session)}
+
+        assert set(users) == {"bob_esponja", "calamardo"}
+        assert users["bob_esponja"].role == constants.Role.ADMIN
+
+    def test_batch_reports_failed_operations(
+        self,
+        client: TestClient,
+        db_session: Session,
+    ):
+        response = client.post(
+            "/api/v1/users/batch/",
+            json={
+                "operations": [
+                    {"op": "create", "data": {"username": "bob_esponja"}},
+                    {"op": "create", "data": {"username": "bob_esponja"}},
+                    {"op": "update", "data": {"username": "ghost_user", "role": "admin"}},
+                    {"op": "delete", "username": "ghost_user"},
+                ],
+                "chunk_size": 1,
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+
+        results = response.json()
+
+        assert results["code_transaction"] == "PARTIALLY_APPLIED"
+        assert [result["code_transaction"] for result in results["results"]] == [
+            "OK",
+            "UNABLE_TO_CREATE_USER",
+            "UNABLE_TO_UPDATE_USER",
+            "UNABLE_TO_DELETE_USER",
+        ]
+        assert [result["index"] for result in results["results"]] == [0, 1, 2, 3]
+        assert len(processes.retrieve_users(db=db_session)) == 1
+
+    def test_batch_rolls_back_the_chunk_when_a_flush_fails(
+        self,
+        client: TestClient,
+        db_session: Session,
+        monkeypatch,
+    ):
+        processes.create_user(db=db_session, user_data=schemas.UserCreate(username="calamardo"))
+
+        def failing_flush(db):
+            raise OperationalError("INSERT", {}, Exception("disk I/O error"))
+
+        monkeypatch.setattr(repository, "flush", failing_flush)
+
+        response = client.post(
+            "/api/v1/users/batch/",
+            json={
+                "operations": [
+                    {"op": "create", "data": {"username": "calamardo"}},
+                    {"op": "delete", "username": "calamardo"},
+                    {"op": "create", "data": {"username": "calamardo"}},
+                    {"op": "create", "data": {"username": "bob_esponja"}},
+                ]
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [result["code_transaction"] for result in response.json()["results"]] == [
+            "UNABLE_TO_CREATE_USER",
+            "UNABLE_TO_APPLY_BATCH",
+            "UNABLE_TO_APPLY_BATCH",
+            "UNABLE_TO_APPLY_BATCH",
+        ]
+        assert "bob_esponja" not in {
+            user.username for user in processes.retrieve_users(db=db_session)
+        }
+
+    def test_batch_reports_a_failed_restore(
+        self,
+        client: TestClient,
+        monkeypatch,
+    ):
+        def failing_restore(db, usernames):
+            raise OperationalError("INSERT", {}, Exception("disk I/O error"))
+
+        monkeypatch.setattr(archival, "restore_users", failing_restore)
+
+        response = client.post(
+            "/api/v1/users/batch/",
+            json={
+                "operations": [{"op": "update", "data": {"username": "calamardo", "role": "admin"}}]
+            },
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["results"][0]["code_transaction"] == "UNABLE_TO_APPLY_BATCH"
+
+    def test_batch_with_invalid_operations_reports_every_one(
+        self,
+        client: TestClient,
+        db_session: Session,
+    ):
+        response = client.post(
+            "/api/v1/users/batch/",
+            json={
+                "operations": [
+                    {"op": "create", "data": {"username": "bob_esponja"}},
+                    {"op": "create", "data": {"username": ""}},
+                    {"op": "update", "data": {"username": "bob_esponja"}},
+                    {"op": "rename", "username": "calamardo"},
+                ]
+            },
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+        assert [error["loc"] for error in response.json()["detail"]] == [
+            ["body", "operations", 1, "create", "data", "username"],
+            ["body", "operations", 2, "update", "data"],
+            ["body", "operations", 3],
+        ]
+        assert processes.retrieve_users(db=db_session) == []
+
+
+class TestUserIdempotency:
+    """
+    Tests for Idempotency-Key handling on user write endpoints.
+    """
+
+    def test_duplicate_create_is_replayed(
+        self,
+        client: TestClient,
+        db_session: Session,
+    ):
+        user_data = schemas.UserCreate(username="valentinc94")
+        headers = {"Idempotency-Key": "create-valentinc94"}
+
+        first = client.post("/api/v1/users/", json=user_data.model_dump(), headers=headers)
+        second = client.post("/api/v1/users/", json=user_data.model_dump(), headers=headers)
+
+        assert first.status_code == second.status_code == status.HTTP_201_CREATED
+        assert first.json() == second.json()
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert len(processes.retrieve_users(db=db_session)) == 1
+
+    def test_key_reused_with_another_body_is_rejected(
+        self,
+        client: TestClient,
+    ):
+        headers = {"Idempotency-Key": "create-user"}
+
+        client.post("/api/v1/users/", json={"username": "bob_esponja"}, headers=headers)
+        response = client.post("/api/v1/users/", json={"username": "calamardo"}, headers=headers)
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_CONTENT
+        assert response.json()["detail"]["code_transaction"] == "IDEMPOTENCY_KEY_REUSED"
+
+    def test_cancelled_create_is_executed_again(
+        self,
+        client: TestClient,
+        db_session: Session,
+        monkeypatch,
+    ):
+        create_user = processes.create_user
+
+        def cancelled(**kwargs):
+            monkeypatch.setattr(processes, "create_user", create_user)
+            raise HTTPException(
+                status_code=concurrency.HTTP_499_CLIENT_CLOSED_REQUEST,
+                detail={"code_transaction": "REQUEST_CANCELLED", "message": "Cancelled."},
+            )
+
+        monkeypatch.setattr(processes, "create_user", cancelled)
+        headers = {"Idempotency-Key": "create-patricio"}
+
+        first = client.post("/api/v1/users/", json={"username": "patricio"}, headers=headers)
+        second = client.post("/api/v1/users/", json={"username": "patricio"}, headers=headers)
+
+        assert first.status_code == concurrency.HTTP_499_CLIENT_CLOSED_REQUEST
+        assert second.status_code == status.HTTP_201_CREATED
+        assert "Idempotent-Replayed" not in second.headers
+        assert len(processes.retrieve_users(db=db_session)) == 1
+
+
+class TestUserDeadlines:
+    """
+    Tests for request deadlines on user endpoints.
+    """
+
+    def test_slow_retrieve_returns_deadline_exceeded(
+        self,
+        client: TestClient,
+        db_session: Session,
+        monkeypatch,
+    ):
+        def get_db(request: Request):
+            deadline = deadlines.Deadline(timeout=0.1)
+            deadline.bind(db_session)
+            request.state.deadline = deadline
+            yield db_session
+
+        def slow_retrieve_users(db: Session, **kwargs):
+            db.execute(
+                text(
+                    "WITH RECURSIVE c(x) AS "
+                    "(SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 100000000) "
+                    "SELECT count(*) FROM c"
+                )
+            )
+            return []
+
+        client.app.dependency_overrides[database.get_db] = get_db
+        monkeypatch.setattr(processes, "retrieve_users", slow_retrieve_users)
+
+        response = client.get("/api/v1/users/")
+
+        assert response.status_code == status.HTTP_504_GATEWAY_TIMEOUT
+        assert response.json()["detail"]["code_transaction"] == "DEADLINE_EXCEEDED"
+
+    def test_errors_raised_as_the_deadline_fires_are_kept(
+        self,
+        client: TestClient,
+        db_session: Session,
+        monkeypatch,
+    ):
+        deadline = deadlines.Deadline(timeout=60)
+
+        def get_db(request: Request):
+            request.state.deadline = deadline
+            yield db_session
+
+        def retrieve_users(**kwargs):
+            deadline.cancel(reason=deadlines.TIMEOUT)
+            raise exceptions.InvalidReactionFilter("heart >>= 1")
+
+        client.app.dependency_overrides[database.get_db] = get_db
+        monkeypatch.setattr(processes, "retrieve_users", retrieve_users)
+
+        response = client.get("/api/v1/users/")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"]["code_transaction"] == "INVALID_REACTION_FILTER"
+
+
+class TestUserCoalescing:
+    """
+    Tests for the coalescing of identical concurrent user reads.
+    """
+
+    def test_identical_concurrent_reads_share_one_query(
+        self,
+        client: TestClient,
+        db_session: Session,
+        monkeypatch,
+    ):
+        processes.create_user(
+            db=db_session,
+            user_data=schemas.UserCreate(username="octocat", reactions={"heart": 3}),
+        )
+        retrieve_users = processes.retrieve_users
+        calls = []
+
+        def slow_retrieve_users(**kwargs):
+            calls.append(kwargs)
+            time.sleep(0.3)
+            return retrieve_users(**kwargs)
+
+        monkeypatch.setattr(processes, "retrieve_users", slow_retrieve_users)
+        params = [
+            {"username": "octocat", "filter": ["heart>=1", "eyes = 0"]},
+            {"username": "octocat", "filter": ["eyes=0 AND heart >= 1"]},
+        ]
+
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            responses = list(
+                executor.map(lambda i: client.get("/api/v1/users/", params=params[i % 2]), range(6))
+            )
+
+        assert [response.status_code for response in responses] == [status.HTTP_200_OK] * 6
+        assert len({response.content for response in responses}) == 1
+        assert responses[0].json()["data"][0]["username"] == "octocat"
+        assert len(calls) == 1
+
+
+class TestReactionSummary:
+    """
+    Tests for the reaction analytics endpoint.
+    """
+
+    def test_summary_return_success(
+        self,
+        client: TestClient,
+        db_session: Session,
+    ):
+        for username, role, reactions in (
+            ("bob_esponja", constants.Role.ADMIN, {"plus_one": 3, "minus_one": 1, "heart": 2}),
+            ("calamardo", constants.Role.EXTERNAL, {"minus_one": 3, "confused": 2}),
+            ("patricio", constants.Role.EXTERNAL, {}),
+        ):
+            processes.create_user(
+                db=db_session,
+                user_data=schemas.UserCreate(
+                    username=username,
+                    role=role,
+                    reactions=schemas.Reactions(**reactions),
+                ),
+            )
+
+        response = client.get("/api/v1/users/analytics/")
+
+        assert response.status_code == status.HTTP_200_OK
+
+        results = response.json()
+        summary = results["data"]
+
+        assert results["code_transaction"] == "OK"
+        assert summary["users"] == 3
+        assert summary["reactions"]["minus_one"]["total"] == 4
+        assert summary["reactions"]["minus_one"]["max"] == 3
+        assert summary["total_reactions"]["percentiles"] == {"p50": 5, "p90": 6, "p99": 6}
+        assert summary["ratios"] == {"plus_one_vs_minus_one": 3 / 7, "heart_vs_confused": 0.5}
+        assert summary["roles"]["external"]["users"] == 2
+        assert summary["roles"]["admin"]["ratios"]["heart_vs_confused"] == 1.0
+        assert summary["roles"]["internal"]["ratios"]["heart_vs_confused"] is None
+
+
+class TestUserEvents:
+    """
+    Tests for the user change feed.
+
+    The test client buffers whole responses, so the endless event stream is read by calling
+    the application directly and disconnecting once the expected events have arrived.
+    """
+
+    @staticmethod
+    async def read_events(app, headers, count):
+        received = []
+        requested = False
+        disconnected = asyncio.Event()
+
+        async def receive():
+            nonlocal requested
+
+            if not requested:
+                requested = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                assert message["status"] == status.HTTP_200_OK
+                assert (b"content-type", b"text/event-stream; charset=utf-8") in message["headers"]
+
+            for line in message.get("body", b"").decode().splitlines():
+                if line.startswith("event: "):
+                    received.append(line.removeprefix("event: "))
+
+            if len(received) >= count:
+                disconnected.set()
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/v1/users/events/",
+            "raw_path": b"/api/v1/users/events/",
+            "query_string": b"",
+            "root_path": "",
+            "headers": headers,
+            "client": ("testclient", 50000),
+            "server": ("testserver", 80),
+        }
+        await asyncio.wait_for(app(scope, receive, send), timeout=5)
+
+        return received
+
+    def test_change_feed_replays_events_after_last_event_id(
+        self,
+        client: TestClient,
+        db_session: Session,
+    ):
+        """
+        Validates that committed changes are streamed as Server-Sent Events.
+        """
+
+        processes.create_user(db=db_session, user_data=schemas.UserCreate(username="valentinc94"))
+        processes.delete_user(db=db_session, username="valentinc94")
+
+        received = asyncio.run(
+            self.read_events(client.app, headers=[(b"last-event-id", b"0")], count=2)
+        )
+
+        assert received == ["user.created", "user.deleted"]
+
+
+class TestUserChanges:
+    """
+    Tests for incremental synchronization of users.
+    """
+
+    def test_changes_are_paged_after_the_cursor(
+        self,
+        client: TestClient,
+        db_session: Session,
+    ):
+        """
+        Validates that only changes after the cursor are returned, deletions included.
+        """
+
+        processes.create_user(db=db_session, user_data=schemas.UserCreate(username="valentinc94"))
+        processes.create_user(db=db_session, user_data=schemas.UserCreate(username="octocat"))
+
+        response = client.get("/api/v1/users/changes/", params={"since": 0, "limit": 1})
+        page = response.json()["data"]
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [change["username"] for change in page["changes"]] == ["valentinc94"]
+        assert page["has_more"]
+
+        cursor = {"since": page["next_since"], "after": page["next_after"]}
+        processes.update_user(
+            db=db_session,
+            user_data=schemas.UserUpdate(username="valentinc94", role=constants.Role.ADMIN),
+        )
+        processes.delete_user(db=db_session, username="octocat")
+
+        page = client.get("/api/v1/users/changes/", params=cursor).json()["data"]
+
+        assert [(change["op"], change["username"]) for change in page["changes"]] == [
+            ("upsert", "valentinc94"),
+            ("delete", "octocat"),
+        ]
+        assert page["changes"][0]["user"]["role"] == constants.Role.ADMIN.value
+        assert page["changes"][1]["user"] is None
+        assert not page["has_more"]
+
+        cursor = {"since": page["next_since"], "after": page["next_after"]}
+        page = client.get("/api/v1/users/changes/", params=cursor).json()["data"]
+
+        assert page["changes"] == []
+        assert (page["next_since"], page["next_after"]) == (cursor["since"], cursor["after"])
+
+    def test_update_touches_updated_at(
+        self,
+        db_session: Session,
+    ):
+        """
+        Validates that updating a user refreshes its last update timestamp and version.
+        """
+
+        user = processes.create_user(
+            db=db_session, user_data=schemas.UserCreate(username="valentinc94")
+        )
+        updated_at, version = user.updated_at, user.version
+
+        processes.update_user(
+            db=db_session,
+            user_data=schemas.UserUpdate(username="valentinc94", role=constants.Role.ADMIN),
+        )
+
+        assert user.updated_at > updated_at
+        assert user.version > version
+
+
+class TestUserArchive:
+    """
+    Tests for the hot/cold storage of inactive users.
+    """
+
+    def test_archived_user_is_read_by_username_and_restored_on_write(
+        self,
+        client: TestClient,
+        db_session: Session,
+    ):
+        """
+        Validates that archived users are only found by username, keep their username and
+        move back to the users table on their next write.
+        """
+
+        processes.create_user(db=db_session, user_data=schemas.UserCreate(username="valentinc94"))
+        processes.create_user(
+            db=db_session,
+            user_data=schemas.UserCreate(username="octocat", reactions={"heart": 3}),
+        )
+        long_ago = datetime(2020, 1, 1)
+        db_session.execute(
+            update(models.User)
+            .where(models.User.username == "octocat")
+            .values(last_reaction_at=long_ago, created_at=long_ago, updated_at=long_ago)
+        )
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=365)
+
+        assert len(archival.archive_batch(db_session.connection(), cutoff)) == 1
+
+        db_session.commit()
+        users = client.get("/api/v1/users/").json()["data"]
+        [archived] = client.get("/api/v1/users/", params={"username": "octocat"}).json()["data"]
+        changes = client.get("/api/v1/users/changes/", params={"since": 0}).json()["data"]
+
+        assert [user["username"] for user in users] == ["valentinc94"]
+        assert archived["reactions"]["heart"] == 3
+        assert [change["username"] for change in changes["changes"]] == ["valentinc94", "octocat"]
+
+        summary = client.get("/api/v1/users/analytics/").json()["data"]
+        active = client.get("/api/v1/users/analytics/", params={"include_archived": False})
+        found = client.get("/api/v1/users/search/", params={"prefix": "oct"}).json()["data"]
+        archived_found = client.get(
+            "/api/v1/users/search/", params={"prefix": "oct", "include_archived": True}
+        ).json()["data"]
+
+        assert summary["users"] == 2
+        assert summary["reactions"]["heart"]["total"] == 3
+        assert active.json()["data"]["users"] == 1
+        assert found == []
+        assert [match["username"] for match in archived_found] == ["octocat"]
+
+        response = client.post("/api/v1/users/", json={"username": "octocat"})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = client.post(
+            "/api/v1/users/batch/",
+            json={"operations": [{"op": "create", "data": {"username": "octocat"}}]},
+        )
+
+        assert response.json()["results"][0]["code_transaction"] == "UNABLE_TO_CREATE_USER"
+        assert db_session.scalar(select(func.count()).select_from(models.ArchivedUser)) == 1
+
+        response = client.put("/api/v1/users/", json={"username": "octocat", "role": "admin"})
+        users = client.get("/api/v1/users/").json()["data"]
+
+        assert response.status_code == status.HTTP_200_OK
+        assert {user["username"]: user["role"] for user in users} == {
+            "octocat": constants.Role.ADMIN.value,
+            "valentinc94": constants.Role.EXTERNAL.value,
+        }
+        assert db_session.scalar(select(func.count()).select_from(models.ArchivedUser)) == 0
+
+
+class TestUserSearch:
+    """
+    Tests for the username prefix search.
+    """
+
+    def test_search_ranks_prefix_matches(
+        self,
+        client: TestClient,
+        db_session: Session,
+    ):
+        for username, heart in (("valentinc94", 3), ("valeria", 8), ("val_x", 1), ("octocat", 9)):
+            processes.create_user(
+                db=db_session,
+                user_data=schemas.UserCreate(username=username, reactions={"heart": heart}),
+            )
+
+        response = client.get("/api/v1/users/search/", params={"prefix": "VAL", "limit": 2})
+        by_name = client.get(
+            "/api/v1/users/search/", params={"prefix": "val_", "sort": "username"}
+        ).json()["data"]
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["data"] == [
+            {
+                "username": "valeria",
+                "total_reactions": 8,
+                "sentiment_score": 8,
+                "last_reaction_at": None,
+            },
+            {
+                "username": "valentinc94",
+                "total_reactions": 3,
+                "sentiment_score": 3,
+                "last_reaction_at": None,
+            },
+        ]
+        assert [user["username"] for user in by_name] == ["val_x"]
+
+    def test_search_is_answered_by_the_index_once_loaded(
+        self,
+        client: TestClient,
+        db_session: Session,
+    ):
+        processes.create_user(db=db_session, user_data=schemas.UserCreate(username="octocat"))
+        index = search.UsernameIndex()
+        processes.load_search_index(db=db_session, index=index)
+        index.upsert(search.Match("octopus", 1, 1, None))
+        client.app.state.users_search_index = index
+
+        try:
+            data = client.get("/api/v1/users/search/", params={"prefix": "oc"}).json()["data"]
+        finally:
+            del client.app.state.users_search_index
+
+        assert [user["username"] for user in data] == ["octopus", "octocat"]
@@ -0,0 +1,220 @@
+from typing import Generator, List
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from reactions.apps.users import constants, models
+from reactions.commands import rebalance_users
+from reactions.core import database, sharding
+from reactions.domains.users import archival, exports, processes, schemas
+
+
+def _shard_urls(tmp_path, count: int) -> List[str]:
+    urls = [f"sqlite:///{tmp_path}/shard-{index}.db" for index in range(count)]
+
+    for url in urls:
+        engine = create_engine(url)
+        database.Base.metadata.create_all(bind=engine)
+        engine.dispose()
+
+    return urls
+
+
+@pytest.fixture(scope="function")
+def shards(tmp_path) -> Generator[sharding.Shards, None, None]:
+    """Provide three SQLite shards with the schema created."""
+    shards = database.create_shards(_shard_urls(tmp_path, 3))
+
+    yield shards
+
+    shards.dispose()
+
+
+@pytest.fixture(scope="function")
+def sharded_session(
+    shards: sharding.Shards,  # pylint: disable=redefined-outer-name
+) -> Generator[Session, None, None]:
+    """Provide a session routing through the shards."""
+    session = sharding.ShardedSession(shards=shards)
+
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _usernames(shards: sharding.Shards, shard_id: str, table=models.User.__table__) -> set:
+    with shards.engines[shard_id].connect() as connection:
+        return set(connection.scalars(select(table.c.username)))
+
+
+class TestShardedUsers:
+    """
+    Tests for users spread over several databases.
+    """
+
+    def test_users_are_written_to_the_shard_of_their_username(
+        self,
+        shards: sharding.Shards,
+        sharded_session: Session,
+    ):
+        for number in range(20):
+            processes.create_user(
+                db=sharded_session, user_data=schemas.UserCreate(username=f"user{number}")
+            )
+
+        processes.delete_user(db=sharded_session, username="user7")
+
+        placed = {shard_id: _usernames(shards, shard_id) for shard_id in shards.ids}
+
+        assert sum(len(usernames) for usernames in placed.values()) == 19
+        assert all(len(usernames) > 0 for usernames in placed.values())
+        assert all(
+            shards.shard_for(username) == shard_id
+            for shard_id, usernames in placed.items()
+            for username in usernames
+        )
+        assert _usernames(shards, shards.shard_for("user7"), models.UserTombstone.__table__) == {
+            "user7"
+        }
+
+        [user] = processes.retrieve_users(db=sharded_session, username="user12")
+
+        assert user.username == "user12"
+
+    def test_batch_operations_span_shards(
+        self,
+        sharded_session: Session,
+    ):
+        results = processes.apply_user_operations(
+            db=sharded_session,
+            operations=schemas.UserBatch.model_validate(
+                {
+                    "operations": [
+                        {"op": "create", "data": {"username": f"user{number}"}}
+                        for number in range(10)
+                    ]
+                    + [{"op": "update", "data": {"username": "user3", "role": "admin"}}]
+                }
+            ).operations,
+        )
+
+        assert all(result.code_transaction == "OK" for result in results)
+        assert processes.summarize_reactions(db=sharded_session).users == 10
+
+    def test_list_is_paged_across_shards(
+        self,
+        client: TestClient,
+        sharded_session: Session,
+    ):
+        for number in range(25):
+            processes.create_user(
+                db=sharded_session, user_data=schemas.UserCreate(username=f"user{number:02d}")
+            )
+
+        client.app.dependency_overrides[database.get_db] = lambda: sharded_session
+        usernames, after = [], None
+
+        while True:
+            params = {"limit": 10, **({"after": after} if after else {})}
+            page = client.get("/api/v1/users/", params=params).json()
+            usernames += [user["username"] for user in page["data"]]
+            after = page["next_after"]
+
+            if after is None:
+                break
+
+        assert usernames == [f"user{number:02d}" for number in range(25)]
+
+        response = client.get("/api/v1/users/changes/")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()["detail"]["code_transaction"] == "UNABLE_TO_RETRIEVE_CHANGES"
+
+    def test_export_reads_every_shard(
+        self,
+        tmp_path,
+        shards: sharding.Shards,
+        sharded_session: Session,
+    ):
+        for number in range(12):
+            processes.create_user(
+                db=sharded_session, user_data=schemas.UserCreate(username=f"user{number}")
+            )
+
+        report = exports.export_users(engine=shards, path=str(tmp_path / "users.csv"))
+
+        assert report.rows == 12
+        assert len(report.paths) == 3
+
+    def test_archived_users_are_restored_to_their_shard(
+        self,
+        shards: sharding.Shards,
+        sharded_session: Session,
+    ):
+        for number in range(20):
+            processes.create_user(
+                db=sharded_session, user_data=schemas.UserCreate(username=f"user{number}")
+            )
+
+        report = archival.archive_users(engine=shards, inactive_days=-1, batch_size=3)
+
+        assert report.archived == 20
+        assert processes.retrieve_users(db=sharded_session) == []
+
+        processes.update_user(
+            db=sharded_session,
+            user_data=schemas.UserUpdate(username="user12", role=constants.Role.ADMIN),
+        )
+        processes.delete_user(db=sharded_session, username="user7")
+        [user] = processes.retrieve_users(db=sharded_session, username="user3")
+
+        assert user.username == "user3"
+        assert _usernames(shards, shards.shard_for("user12")) == {"user12"}
+        assert all(
+            _usernames(shards, shard_id) == set()
+            for shard_id in shards.ids
+            if shard_id != shards.shard_for("user12")
+        )
+        assert (
+            sum(
+                len(_usernames(shards, shard_id, models.ArchivedUser.__table__))
+                for shard_id in shards.ids
+            )
+            == 18
+        )
+
+    def test_rebalance_moves_users_to_a_new_shard(self, tmp_path):
+        urls = _shard_urls(tmp_path, 3)
+        shards = database.create_shards(urls[:2])
+
+        with sharding.ShardedSession(shards=shards) as db:
+            for number in range(60):
+                processes.create_user(db=db, user_data=schemas.UserCreate(username=f"user{number}"))
+
+            processes.delete_user(db=db, username="user1")
+
+        shards.dispose()
+
+        report = rebalance_users.main([f"--shard-url={url}" for url in urls])
+        shards = database.create_shards(urls)
+
+        placed = {shard_id: _usernames(shards, shard_id) for shard_id in shards.ids}
+
+        assert report.moved["2"] >= len(placed["2"]) > 0
+        assert sum(len(usernames) for usernames in placed.values()) == 59
+        assert all(
+            shards.shard_for(username) == shard_id
+            for shard_id, usernames in placed.items()
+            for username in usernames
+        )
+
+        with shards.engines[shards.shard_for("user1")].connect() as connection:
+            assert connection.scalar(select(func.count()).select_from(models.UserTombstone)) == 1
+
+        assert sum(rebalance_users.main([f"--shard-url={url}" for url in urls]).moved.values()) == 0
+
+        shards.dispose()
@@ -0,0 +1,53 @@
+import asyncio
+
+from reactions.core import admission
+
+
+class TestAdmissionGate:
+    """
+    Tests for the admission gate.
+    """
+
+    def test_requests_over_the_queue_are_shed(self):
+        gate = admission.AdmissionGate(name="read", limit=1, queue_size=1, queue_timeout=1)
+
+        async def main():
+            assert await gate.acquire()
+
+            waiting = asyncio.ensure_future(gate.acquire())
+            await asyncio.sleep(0)
+
+            assert not await gate.acquire()
+
+            gate.release()
+
+            assert await waiting
+
+            gate.release()
+
+        asyncio.run(main())
+
+        metrics = gate.snapshot()
+
+        assert metrics["active"] == 0
+        assert metrics["admitted"] == 2
+        assert metrics["queued"] == 1
+        assert metrics["shed"] == 1
+
+    def test_waiting_requests_are_shed_after_the_deadline(self):
+        gate = admission.AdmissionGate(name="write", limit=1, queue_size=5, queue_timeout=0.01)
+
+        async def main():
+            assert await gate.acquire()
+            assert not await gate.acquire()
+
+            gate.release()
+
+        asyncio.run(main())
+
+        metrics = gate.snapshot()
+
+        assert metrics["active"] == 0
+        assert metrics["waiting"] == 0
+        assert metrics["timed_out"] == 1
+        assert metrics["queue_time_max"] > 0
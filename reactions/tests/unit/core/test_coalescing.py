@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from reactions.core import coalescing
+
+
+class TestSingleFlight:
+    """
+    Tests for the single-flight coalescing of identical calls.
+    """
+
+    def test_identical_calls_share_one_run(self):
+        group = coalescing.SingleFlight(name="users", wait_timeout=1)
+        runs = []
+
+        async def read():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+            return b"users"
+
+        async def main():
+            return await asyncio.gather(*(group.do(("octocat",), read) for _ in range(5)))
+
+        assert asyncio.run(main()) == [b"users"] * 5
+        assert len(runs) == 1
+
+        metrics = group.snapshot()
+
+        assert metrics["in_flight"] == 0
+        assert metrics["leaders"] == 1
+        assert metrics["coalesced"] == 4
+
+    def test_errors_are_shared_unless_they_belong_to_the_leader(self):
+        group = coalescing.SingleFlight(name="users", wait_timeout=1)
+        runs = []
+
+        async def read():
+            runs.append(1)
+            await asyncio.sleep(0.01)
+
+            if len(runs) == 1:
+                raise ConnectionAbortedError("client left")
+
+            raise LookupError("no such user")
+
+        async def main():
+            return await asyncio.gather(
+                *(
+                    group.do(
+                        "key",
+                        read,
+                        is_shared=lambda error: not isinstance(error, ConnectionAbortedError),
+                    )
+                    for _ in range(3)
+                ),
+                return_exceptions=True,
+            )
+
+        first, *followers = asyncio.run(main())
+
+        assert isinstance(first, ConnectionAbortedError)
+        assert all(isinstance(error, LookupError) for error in followers)
+        assert len(runs) == 2
+        assert group.snapshot()["retried"] == 2
+
+    def test_followers_read_alone_after_the_deadline(self):
+        group = coalescing.SingleFlight(name="users", wait_timeout=0.01)
+
+        async def slow():
+            await asyncio.sleep(0.1)
+            return "slow"
+
+        async def fast():
+            return "fast"
+
+        async def main():
+            leader = asyncio.ensure_future(group.do("key", slow))
+            await asyncio.sleep(0)
+
+            assert await group.do("key", fast) == "fast"
+            assert await leader == "slow"
+
+        asyncio.run(main())
+
+        assert group.snapshot()["timed_out"] == 1
+
+    def test_cancelled_leader_hands_over_to_a_follower(self):
+        group = coalescing.SingleFlight(name="users", wait_timeout=1)
+
+        async def read():
+            await asyncio.sleep(0.01)
+            return "users"
+
+        async def main():
+            leader = asyncio.ensure_future(group.do("key", read))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(group.do("key", read))
+            await asyncio.sleep(0)
+            leader.cancel()
+
+            with pytest.raises(asyncio.CancelledError):
+                await leader
+
+            assert await follower == "users"
+
+        asyncio.run(main())
+
+        assert group.snapshot()["leaders"] == 2
@@ -0,0 +1,48 @@
+import multiprocessing
+import os
+
+from fastapi.testclient import TestClient
+
+from reactions.core import database
+from reactions.interfaces import routes
+
+
+def _serve_in_worker(_) -> dict:
+    """
+    Run the application lifespan in a forked worker and report who opened its connection.
+    """
+    with TestClient(routes.create_app()):
+        with database.get_engine().connect() as connection:
+            owner = connection.connection.info["pid"]
+
+    return {"pid": os.getpid(), "owner": owner, "disposed": database.engine is None}
+
+
+class TestEngineLifecycle:
+    """
+    Tests for the per-process engine lifecycle.
+    """
+
+    def test_forked_workers_do_not_share_connections(
+        self,
+        tmp_path,
+        monkeypatch,
+    ):
+        monkeypatch.setattr(database.settings, "DATABASE_URL", f"sqlite:///{tmp_path}/workers.db")
+        database.dispose_engine()
+
+        try:
+            engine = database.init_engine()
+            database.Base.metadata.create_all(bind=engine)
+            database.warm_up(engine, connections=2)
+
+            context = multiprocessing.get_context("fork")
+
+            with context.Pool(processes=2) as pool:
+                workers = pool.map(_serve_in_worker, range(2))
+        finally:
+            database.dispose_engine()
+
+        assert len({worker["pid"] for worker in workers}) == 2
+        assert all(worker["owner"] == worker["pid"] != os.getpid() for worker in workers)
+        assert all(worker["disposed"] for worker in workers)
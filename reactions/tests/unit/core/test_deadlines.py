@@ -0,0 +1,45 @@
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from reactions.core import deadlines
+
+SLOW_QUERY = text(
+    "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 100000000) "
+    "SELECT count(*) FROM c"
+)
+
+
+class TestDeadline:
+    """
+    Tests for request deadlines bound to database sessions.
+    """
+
+    def test_cancel_interrupts_the_running_statement(
+        self,
+        db_session: Session,
+    ):
+        deadline = deadlines.Deadline(timeout=60)
+        deadline.bind(db_session)
+        db_session.execute(text("SELECT 1"))
+
+        timer = threading.Timer(0.05, deadline.cancel)
+        timer.start()
+
+        with pytest.raises(OperationalError) as error:
+            db_session.execute(SLOW_QUERY)
+
+        timer.join()
+
+        assert deadlines.is_cancellation(error.value)
+        assert deadline.reason == deadlines.TIMEOUT
+
+    def test_timeout_for_uses_route_configuration(self, monkeypatch):
+        monkeypatch.setattr(deadlines.settings, "REQUEST_DEADLINES", {"GET /api/v1/users/": 1.5})
+        monkeypatch.setattr(deadlines.settings, "REQUEST_DEADLINE_SECONDS", 30.0)
+
+        assert deadlines.timeout_for("GET", "/api/v1/users/") == 1.5
+        assert deadlines.timeout_for("POST", "/api/v1/users/") == 30.0
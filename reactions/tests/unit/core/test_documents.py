@@ -0,0 +1,24 @@
+from sqlalchemy import JSON, Column, MetaData, Table, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from reactions.core import documents
+
+users = Table("users", MetaData(), Column("reactions", JSON))
+
+
+class TestJsonInteger:
+    """
+    Tests for the rendering of integer fields of JSON documents.
+    """
+
+    def test_counters_are_read_as_bigint(self):
+        statement = select(users.c.reactions).where(
+            documents.json_integer(users.c.reactions, "heart") >= 3_000_000_000
+        )
+
+        assert "((users.reactions ->> 'heart')::bigint) >=" in str(
+            statement.compile(dialect=postgresql.dialect())
+        )
+        assert "CAST(json_extract(users.reactions, '$.heart') AS BIGINT) >=" in str(
+            statement.compile(dialect=sqlite.dialect())
+        )
@@ -0,0 +1,110 @@
+import asyncio
+
+from reactions.core import events
+
+
+class TestInProcessBroker:
+    """
+    Tests for the in-process change feed broker.
+    """
+
+    def test_events_are_fanned_out_to_every_subscriber(self):
+        broker = events.InProcessBroker(buffer_size=10, replay_size=10)
+
+        async def main():
+            first = broker.subscribe()
+            second = broker.subscribe()
+
+            broker.publish("user.created", {"username": "valentinc94"})
+            await asyncio.sleep(0)
+
+            return await first.get(), await second.get()
+
+        first, second = asyncio.run(main())
+
+        assert first == second
+        assert first.id == 1
+        assert first.type == "user.created"
+
+    def test_subscription_resumes_after_last_event_id(self):
+        broker = events.InProcessBroker(buffer_size=10, replay_size=10)
+
+        for number in range(3):
+            broker.publish("user.updated", {"number": number})
+
+        async def main():
+            subscription = broker.subscribe(last_event_id=1)
+            return [await subscription.get(), await subscription.get()]
+
+        replayed = asyncio.run(main())
+
+        assert [event.id for event in replayed] == [2, 3]
+
+    def test_subscription_is_reset_when_events_were_evicted(self):
+        broker = events.InProcessBroker(buffer_size=10, replay_size=2)
+
+        for number in range(5):
+            broker.publish("user.updated", {"number": number})
+
+        async def main():
+            subscription = broker.subscribe(last_event_id=1)
+            return await subscription.get(), await subscription.get()
+
+        event, end = asyncio.run(main())
+
+        assert event.type == events.RESET
+        assert end is None
+
+    def test_slow_subscriber_is_dropped_when_its_buffer_overflows(self):
+        broker = events.InProcessBroker(buffer_size=2, replay_size=10)
+
+        async def main():
+            subscription = broker.subscribe()
+
+            for number in range(5):
+                broker.publish("user.updated", {"number": number})
+
+            await asyncio.sleep(0)
+
+            received = []
+            while (event := await subscription.get()) is not None:
+                received.append(event)
+
+            return received
+
+        received = asyncio.run(main())
+
+        assert [event.type for event in received] == ["user.updated", "user.updated", events.RESET]
+        assert broker._subscribers == []
+
+    def test_subscription_is_reset_when_more_events_were_missed_than_it_buffers(self):
+        broker = events.InProcessBroker(buffer_size=2, replay_size=10)
+
+        for number in range(5):
+            broker.publish("user.updated", {"number": number})
+
+        async def main():
+            subscription = broker.subscribe(last_event_id=1)
+            return await subscription.get(), await subscription.get()
+
+        event, end = asyncio.run(main())
+
+        assert event.type == events.RESET
+        assert end is None
+        assert broker._subscribers == []
+
+    def test_replayed_events_come_before_new_ones(self):
+        broker = events.InProcessBroker(buffer_size=10, replay_size=10)
+        broker._dispatch("user.updated", {"number": 0}, event_id=41)
+        broker._dispatch("user.updated", {"number": 1}, event_id=42)
+
+        async def main():
+            subscription = broker.subscribe(last_event_id=41)
+            broker.publish("user.updated", {"number": 2})
+            await asyncio.sleep(0)
+
+            return [await subscription.get(), await subscription.get()]
+
+        received = asyncio.run(main())
+
+        assert [event.id for event in received] == [42, 43]
@@ -0,0 +1,48 @@
+import asyncio
+
+from reactions.core import idempotency
+
+
+class TestIdempotencyStore:
+    """
+    Tests for the in-memory idempotency store.
+    """
+
+    def test_concurrent_duplicates_wait_for_the_first_execution(self):
+        store = idempotency.IdempotencyStore(max_keys=10, ttl_seconds=60)
+        executions = []
+
+        async def deliver():
+            stored = await store.acquire("key")
+
+            if stored is not None:
+                return stored
+
+            executions.append(1)
+            await asyncio.sleep(0.01)
+            response = idempotency.StoredResponse(fingerprint="f", status=201, body=b"ok")
+            store.release("key", response)
+            return response
+
+        async def main():
+            return await asyncio.gather(*(deliver() for _ in range(5)))
+
+        responses = asyncio.run(main())
+
+        assert len(executions) == 1
+        assert {response.body for response in responses} == {b"ok"}
+
+    def test_store_is_bounded_and_expires(self):
+        now = [0.0]
+        store = idempotency.IdempotencyStore(max_keys=2, ttl_seconds=10, clock=lambda: now[0])
+
+        for key in ("a", "b", "c"):
+            store.release(key, idempotency.StoredResponse(fingerprint=key, status=200))
+
+        assert store.get("a") is None
+        assert store.get("c") is not None
+
+        now[0] = 11.0
+
+        assert store.get("b") is None
+        assert store.get("c") is None
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+
+from reactions.core import loopmonitor
+
+
+def _serve_blocking(scope, seconds):
+    time.sleep(seconds)
+
+
+async def _handle(scope, seconds):
+    _serve_blocking(scope, seconds)
+
+
+class TestLoopMonitor:
+    """
+    Tests for the event loop monitor.
+    """
+
+    def test_stalls_are_attributed_to_the_route_served(self):
+        monitor = loopmonitor.LoopMonitor(interval=0.01, threshold=0.05)
+        scope = {"type": "http", "method": "GET", "route": SimpleNamespace(path="/api/v1/users/")}
+
+        async def main():
+            task = asyncio.create_task(monitor.run())
+            await asyncio.sleep(0.05)
+            await _handle(scope, seconds=0.3)
+            await asyncio.sleep(0.05)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        asyncio.run(main())
+        snapshot = monitor.snapshot()
+        [entry] = snapshot["blocking"]
+
+        assert snapshot["blocked"] == 1
+        assert snapshot["lag_max"] >= 0.2
+        assert entry["route"] == "GET /api/v1/users/"
+        assert entry["count"] == 1
+        assert entry["last_location"].startswith("_serve_blocking (")
+        assert {usage["name"] for usage in snapshot["pools"]} == {"threadpool"}
+
+    def test_background_tasks_are_named(self):
+        async def maintain():
+            return loopmonitor.culprit(None, asyncio.current_task())
+
+        assert asyncio.run(maintain()) == (
+            "task TestLoopMonitor.test_background_tasks_are_named.<locals>.maintain",
+            None,
+        )
+
+    def test_saturation_is_logged_when_it_starts(self, caplog):
+        monitor = loopmonitor.LoopMonitor(interval=1, threshold=1)
+
+        with caplog.at_level(logging.WARNING, logger=loopmonitor.__name__):
+            for in_use, waiting in ((1, 0), (2, 0), (2, 3), (1, 0)):
+                monitor.gauge("threadpool", "threads", capacity=2, in_use=in_use, waiting=waiting)
+
+        [usage] = monitor.snapshot()["pools"]
+
+        assert len(caplog.records) == 1
+        assert usage["saturated_samples"] == 2
+        assert usage["max_in_use"] == 2
+        assert usage["saturated"] is False
@@ -0,0 +1,63 @@
+from sqlalchemy import create_engine, text
+
+from reactions.core import querylog
+
+
+class TestSlowQueryLog:
+    """
+    Tests for the slow statement log.
+    """
+
+    def test_statements_are_aggregated_by_shape(self):
+        log = querylog.SlowQueryLog(threshold=0)
+        engine = create_engine("sqlite://")
+        log.instrument(engine)
+        token = querylog.route.set("GET /api/v1/users/")
+
+        try:
+            with engine.connect() as connection:
+                for username, limit in (("octocat", 1), ("hubot", 5)):
+                    connection.execute(
+                        text(f"SELECT :username AS username LIMIT {limit}"),
+                        {"username": username},
+                    )
+        finally:
+            querylog.route.reset(token)
+
+        [entry] = log.top()
+
+        assert entry["statement"] == "SELECT ? AS username LIMIT ?"
+        assert entry["count"] == 2
+        assert entry["routes"] == {"GET /api/v1/users/": 2}
+        assert entry["last_parameters"] == ["str"]
+        assert entry["plan"] is None
+
+    def test_shapes_collapse_literals_and_in_lists(self):
+        assert (
+            querylog.shape(
+                "SELECT users.id FROM users WHERE users.username IN (%(p_1_1)s, %(p_1_2)s)\n"
+                "  AND (reactions ->> 'heart')::integer >= 100 LIMIT %(param_1)s"
+            )
+            == "SELECT users.id FROM users WHERE users.username IN (...) "
+            "AND (reactions ->> ?)::integer >= ? LIMIT ?"
+        )
+        assert querylog.redact({"username": "octocat", "limit": 10}) == {
+            "username": "str",
+            "limit": "int",
+        }
+        assert querylog.redact([{"username": "octocat"}] * 3) == {
+            "executemany": 3,
+            "first": {"username": "str"},
+        }
+
+    def test_shapes_with_least_time_are_evicted(self):
+        log = querylog.SlowQueryLog(threshold=0, max_shapes=2)
+
+        log.record(None, "SELECT 1 FROM users", {}, duration=3.0)
+        log.record(None, "SELECT 1 FROM jobs", {}, duration=1.0)
+        log.record(None, "SELECT 1 FROM users_tombstones", {}, duration=2.0)
+
+        assert [entry["statement"] for entry in log.top(order="max")] == [
+            "SELECT ? FROM users",
+            "SELECT ? FROM users_tombstones",
+        ]
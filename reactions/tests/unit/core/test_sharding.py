@@ -0,0 +1,22 @@
+from reactions.core import sharding
+
+
+class TestHashRing:
+    """
+    Tests for the consistent hash ring.
+    """
+
+    def test_keys_are_normalized(self):
+        ring = sharding.HashRing(["0", "1", "2"])
+
+        assert ring.shard_for("ValentinC94") == ring.shard_for(" valentinc94 ")
+
+    def test_adding_a_shard_only_moves_keys_to_it(self):
+        keys = [f"user{number}" for number in range(10_000)]
+        before = sharding.HashRing(["0", "1", "2"])
+        after = sharding.HashRing(["0", "1", "2", "3"])
+
+        moved = [key for key in keys if before.shard_for(key) != after.shard_for(key)]
+
+        assert {after.shard_for(key) for key in moved} == {"3"}
+        assert 0.15 < len(moved) / len(keys) < 0.35
@@ -0,0 +1,42 @@
+from reactions.core import pools, settings
+from reactions.domains.users import schemas
+
+RECORDS = [
+    {"username": "bob_esponja", "reactions": {"heart": 3}},
+    {"username": "", "role": "admin"},
+    {"username": "calamardo", "role": "internal"},
+    {"username": "patricio", "reactions": {"heart": -1}},
+    {"username": "arenita"},
+]
+
+
+def test_validate_batch_reports_errors_per_item():
+    items, errors = schemas.validate_batch(schemas.UserCreate, RECORDS)
+
+    assert [item.username if item else None for item in items] == [
+        "bob_esponja",
+        None,
+        "calamardo",
+        None,
+        "arenita",
+    ]
+    assert items[0].reactions.heart == 3
+    assert {index: [error["loc"] for error in item] for index, item in errors.items()} == {
+        1: [("username",)],
+        3: [("reactions", "heart")],
+    }
+
+
+def test_validate_batch_as_dicts_across_processes_matches_single_call(monkeypatch):
+    monkeypatch.setattr(settings, "VALIDATION_PROCESSES", 2)
+    monkeypatch.setattr(settings, "VALIDATION_PARALLEL_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "VALIDATION_CHUNK_SIZE", 2)
+    items, errors = schemas.validate_batch(schemas.UserCreate, RECORDS)
+
+    try:
+        assert schemas.validate_batch(schemas.UserCreate, RECORDS, as_dicts=True) == (
+            [item.model_dump() if item else None for item in items],
+            errors,
+        )
+    finally:
+        pools.shutdown_process_pool()
@@ -0,0 +1,67 @@
+from reactions.domains.users import search
+
+
+def _match(username, total_reactions=0, sentiment_score=0, last_reaction_at=None):
+    return search.Match(username, total_reactions, sentiment_score, last_reaction_at)
+
+
+class TestUsernameIndex:
+    """
+    Tests for the in-memory username prefix index.
+    """
+
+    def test_prefix_matches_are_ranked(self):
+        index = search.UsernameIndex()
+        index.load(
+            [
+                _match("valentin", 5, last_reaction_at="2026-01-02 00:00:00"),
+                _match("Valeria", 9),
+                _match("valencia", 5, last_reaction_at="2026-03-01 00:00:00"),
+                _match("octocat", 99),
+                _match("val%", 1),
+            ]
+        )
+
+        assert [match.username for match in index.search("VAL", 3, "-total_reactions")] == [
+            "Valeria",
+            "valentin",
+            "valencia",
+        ]
+        assert [match.username for match in index.search("vale", 3, "-last_reaction_at")] == [
+            "valencia",
+            "valentin",
+            "Valeria",
+        ]
+        assert [match.username for match in index.search("val", 10, "username")] == [
+            "Valeria",
+            "val%",
+            "valencia",
+            "valentin",
+        ]
+        assert index.search("x", 10, "username") == []
+
+    def test_events_update_the_index_and_its_cached_results(self):
+        index = search.UsernameIndex()
+        index.load([_match("octocat", 3)])
+
+        assert [match.username for match in index.search("oc", 5, "-total_reactions")] == [
+            "octocat"
+        ]
+
+        index.apply(
+            "user.created",
+            {
+                "id": "1",
+                "username": "octopus",
+                "total_reactions": 7,
+                "sentiment_score": 7,
+                "last_reaction_at": "None",
+            },
+        )
+        index.apply("user.deleted", {"id": "2", "username": "octocat"})
+        index.apply("user.deleted", {"id": "3", "username": "unknown"})
+
+        [match] = index.search("oc", 5, "-total_reactions")
+
+        assert match == _match("octopus", 7, 7)
+        assert len(index) == 1